@@ -0,0 +1,338 @@
+import csv
+import os
+import struct
+import time
+import zlib
+from array import array
+
+try:
+    import numpy as np
+except ImportError: # Only this command needs it, not the games
+    np = None
+
+from event_log import DONE, GUESS, GUESS_FORMATS, GUESS_MADE, RECORD, RESULT_CODES, ROUND, ROUND_START, STRING, read_version
+
+LETTERS = 'abcdefghijklmnopqrstuvwxyz'
+HINT = len(LETTERS)                   # Letter code of a hint request
+OTHER = HINT + 1                      # Anything else (symbols, whole words)
+MAX_ORDER = 32                        # Guesses past this rank share the last row
+DIFFICULTIES = {8: 'Facile', 6: 'Moyen', 4: 'Difficile'}
+LENGTH = struct.Struct('<xH')         # Payload length, read from a record header
+GUESS_RESULT, GUESS_LENGTH = 12, 14   # Byte offsets in a GUESS payload
+HINT_BYTES = int.from_bytes(b'hint', 'little')
+CORRECT, INCORRECT, HINT_USED = RESULT_CODES['correct'], RESULT_CODES['incorrect'], RESULT_CODES['hint_used']
+
+
+def grow(counts, size):
+    if len(counts) >= size:
+        return counts
+    return np.concatenate([counts, np.zeros(size - len(counts), counts.dtype)])
+
+
+class Summary:
+    # Totals over every finished round; each chunk of rounds is folded in
+    # with bincount, so memory depends on the vocabulary, not the history.
+    def __init__(self):
+        self.words = {}               # (category, word) -> word id
+        self.word_category = []       # word id -> category id
+        self.categories = {}          # category -> id
+        self.word_plays = np.zeros(0, np.int64)
+        self.word_wins = np.zeros(0, np.int64)
+        self.word_misses = np.zeros(0, np.int64)
+        self.group_plays = np.zeros(0, np.int64) # Index: category id * 256 + max guesses
+        self.group_wins = np.zeros(0, np.int64)
+        self.group_abandoned = np.zeros(0, np.int64)
+        self.first_plays = np.zeros(OTHER + 1, np.int64)
+        self.first_wins = np.zeros(OTHER + 1, np.int64)
+        self.order_guesses = np.zeros((MAX_ORDER, OTHER + 1), np.int64)
+        self.order_hits = np.zeros((MAX_ORDER, OTHER + 1), np.int64)
+        self.rounds = 0
+        self.guesses = 0
+
+    def word_id(self, category, word):
+        key = (category, word)
+        word_id = self.words.get(key)
+        if word_id is None:
+            word_id = self.words[key] = len(self.words)
+            if category not in self.categories:
+                self.categories[category] = len(self.categories)
+            self.word_category.append(self.categories[category])
+        return word_id
+
+    def add(self, rounds, guesses):
+        # rounds: word, group and state columns (0 open, 1 won, 2 lost,
+        # 3 abandoned); guesses: round, order, letter, result and key
+        # columns, the key telling repeated guesses apart (see guess_keys).
+        word, group, state = rounds
+        g_round, g_order, g_letter, g_result, g_key = guesses
+        n = len(word)
+        finished = (state == 1) | (state == 2)
+        won = state == 1
+        # A guess missed again costs no life, so each counts once per round
+        missed = np.unique((g_round[g_result == INCORRECT] << 33) | g_key[g_result == INCORRECT])
+        misses = np.bincount(missed >> 33, minlength=n)
+
+        self.word_plays = grow(self.word_plays, len(self.words))
+        self.word_wins = grow(self.word_wins, len(self.words))
+        self.word_misses = grow(self.word_misses, len(self.words))
+        size = len(self.words)
+        self.word_plays += np.bincount(word[finished], minlength=size)
+        self.word_wins += np.bincount(word[won], minlength=size)
+        self.word_misses += np.bincount(word[finished], weights=misses[finished], minlength=size).astype(np.int64)
+
+        size = len(self.categories) * 256
+        self.group_plays = grow(self.group_plays, size)
+        self.group_wins = grow(self.group_wins, size)
+        self.group_abandoned = grow(self.group_abandoned, size)
+        self.group_plays += np.bincount(group[finished], minlength=size)
+        self.group_wins += np.bincount(group[won], minlength=size)
+        self.group_abandoned += np.bincount(group[state == 3], minlength=size)
+
+        counted = finished[g_round]
+        first = counted & (g_order == 0)
+        self.first_plays += np.bincount(g_letter[first], minlength=OTHER + 1)
+        self.first_wins += np.bincount(g_letter[first & won[g_round]], minlength=OTHER + 1)
+        cell = np.minimum(g_order[counted], MAX_ORDER - 1) * (OTHER + 1) + g_letter[counted]
+        hits = (g_result[counted] == CORRECT) | (g_result[counted] == HINT_USED)
+        self.order_guesses += np.bincount(cell, minlength=MAX_ORDER * (OTHER + 1)).reshape(MAX_ORDER, OTHER + 1)
+        self.order_hits += np.bincount(cell[hits], minlength=MAX_ORDER * (OTHER + 1)).reshape(MAX_ORDER, OTHER + 1)
+        self.rounds += int(finished.sum())
+        self.guesses += int(counted.sum())
+
+
+class ChunkReader:
+    # Reads the log chunk_size bytes at a time. The only per-record Python
+    # step is finding where each record starts; fields are then gathered for
+    # the whole chunk with NumPy indexing and guesses are matched to their
+    # round with a sorted search. Rounds still being played at the end of a
+    # chunk (interleaved server sessions) are carried over with their
+    # guesses to the next chunk or log file; finish marks those still open
+    # after the last one as abandoned.
+    def __init__(self, summary, chunk_size=16 * 1024 * 1024):
+        self.summary = summary
+        self.chunk_size = chunk_size
+        self.words = {}               # (category, word) as raw bytes -> word id
+        empty = np.zeros(0, np.uint64)
+        self.rounds = (empty, empty, np.zeros(0, np.int64), np.zeros(0, np.int64)) # id, game, word, group
+        self.guesses = (empty, *(np.zeros(0, np.int64) for _ in range(3)))      # round id, letter, result, key
+        self.guess_format = GUESS
+
+    def read(self, path):
+        with open(path, 'rb') as f:
+            if not os.fstat(f.fileno()).st_size:
+                return
+            self.guess_format = GUESS_FORMATS[read_version(f, path)]
+            data = b''
+            while True:
+                chunk = f.read(self.chunk_size)
+                if not chunk:
+                    break # Anything left is a record cut short by a crash
+                data += chunk
+                offsets, end = record_offsets(data)
+                self.process(data, offsets)
+                data = data[end:]
+
+    def finish(self):
+        self.process(b'', array('q'), final=True)
+
+    def process(self, data, offsets, final=False):
+        buffer = np.frombuffer(data, np.uint8)
+        offsets = np.frombuffer(offsets, np.int64)
+        types = buffer[offsets]
+
+        starts = offsets[types == ROUND_START] + RECORD.size
+        round_id = gather(buffer, starts, 0, '<u8')
+        game_id = gather(buffer, starts, 8, '<u8')
+        max_guesses = buffer[starts + ROUND.size - 1].astype(np.int64)
+        word = np.fromiter((self.word_id(data, start) for start in starts.tolist()), np.int64, len(starts))
+        group = np.asarray(self.summary.word_category, np.int64)[word] * 256 + np.minimum(max_guesses, 255)
+
+        starts = offsets[types == GUESS_MADE] + RECORD.size
+        guess_round = gather(buffer, starts, 0, '<u8')
+        result = buffer[starts + GUESS_RESULT].astype(np.int64)
+        guess_size = self.guess_format.size # The length field is its last one
+        length = gather(buffer, starts, GUESS_LENGTH, f'<u{guess_size - GUESS_LENGTH}')
+        first = buffer[np.minimum(starts + guess_size, max(len(buffer) - 1, 0))].astype(np.int64)
+        letter = np.where((length == 1) & (first >= ord('a')) & (first <= ord('z')), first - ord('a'), OTHER)
+        hint = (length == 4) & (gather(buffer, starts, guess_size, '<u4', length >= 4) == HINT_BYTES)
+        letter[hint] = HINT
+        key = guess_keys(data, letter, starts + guess_size, length)
+
+        # Carried rounds and guesses come first, so both stay in log order
+        round_id, game_id, word, group = (np.concatenate(pair) for pair in
+                                          zip(self.rounds, (round_id, game_id, word, group)))
+        guess_round, letter, result, key = (np.concatenate(pair) for pair in
+                                            zip(self.guesses, (guess_round, letter, result, key)))
+
+        by_id = np.argsort(round_id, kind='stable')
+        position = np.minimum(np.searchsorted(round_id[by_id], guess_round), max(len(by_id) - 1, 0))
+        known = round_id[by_id][position] == guess_round if len(by_id) else np.zeros(len(guess_round), bool)
+        guess_round, letter, result, key = guess_round[known], letter[known], result[known], key[known]
+        local = by_id[position[known]]
+
+        state = np.zeros(len(round_id), np.int8)
+        done = (result & DONE) != 0
+        state[local[done]] = np.where(result[done] & ~DONE != INCORRECT, 1, 2)
+        result = result & ~DONE
+        # A round left unfinished when its game started another was abandoned
+        by_game = np.lexsort((np.arange(len(game_id)), game_id))
+        later = np.zeros(len(game_id), bool)
+        later[by_game[:-1]] = game_id[by_game[:-1]] == game_id[by_game[1:]]
+        state[(state == 0) & (later | final)] = 3
+
+        # Rank of each guess within its round
+        by_round = np.argsort(local, kind='stable')
+        sorted_local = local[by_round]
+        group_start = np.flatnonzero(np.r_[True, sorted_local[1:] != sorted_local[:-1]]) if len(local) else local
+        rank = np.arange(len(local)) - np.repeat(group_start, np.diff(np.r_[group_start, len(local)]))
+        order = np.empty(len(local), np.int64)
+        order[by_round] = rank
+
+        self.summary.add((word, group, state), (local, order, letter, result, key))
+
+        carried = state == 0
+        kept = carried[local]
+        self.rounds = (round_id[carried], game_id[carried], word[carried], group[carried])
+        self.guesses = (guess_round[kept], letter[kept], result[kept], key[kept]) # Unfinished, so never DONE
+
+    def word_id(self, data, start):
+        # Category and displayed word, skipping the normalized one
+        offset = start + ROUND.size
+        category_end = offset + STRING.size + STRING.unpack_from(data, offset)[0]
+        offset = category_end + STRING.size + STRING.unpack_from(data, category_end)[0]
+        key = (data[start + ROUND.size + STRING.size:category_end],
+               data[offset + STRING.size:offset + STRING.size + STRING.unpack_from(data, offset)[0]])
+        word_id = self.words.get(key)
+        if word_id is None:
+            word_id = self.words[key] = self.summary.word_id(key[0].decode('utf-8'), key[1].decode('utf-8'))
+        return word_id
+
+
+def record_offsets(data):
+    # Start of every complete record in data, and where the complete ones end
+    offsets = array('q')
+    append = offsets.append
+    unpack_length = LENGTH.unpack_from
+    offset, size = 0, len(data)
+    try:
+        while True:
+            end = offset + RECORD.size + unpack_length(data, offset)[0]
+            if end > size:
+                break
+            append(offset)
+            offset = end
+    except struct.error: # Not even a record header left
+        pass
+    return offsets, offset
+
+
+def guess_keys(data, letter, starts, length):
+    # The letter code, or past it a checksum of the guess for whole words,
+    # which are few enough for a Python step each
+    key = letter.copy()
+    other = np.flatnonzero(letter == OTHER)
+    key[other] = OTHER + 1 + np.fromiter((zlib.crc32(data[start:start + size]) for start, size in
+                                          zip(starts[other].tolist(), length[other].tolist())), np.int64, len(other))
+    return key
+
+
+def gather(buffer, starts, field_offset, dtype, mask=None):
+    # One little-endian field at the same offset in every record
+    dtype = np.dtype(dtype)
+    if mask is not None:
+        values = np.zeros(len(starts), dtype)
+        values[mask] = gather(buffer, starts[mask], field_offset, dtype)
+        return values
+    indexes = (starts + field_offset)[:, None] + np.arange(dtype.itemsize)
+    return buffer[indexes].reshape(-1).view(dtype)
+
+
+def ratio(numerator, denominator):
+    return np.divide(numerator, denominator, out=np.zeros(len(numerator)), where=denominator > 0)
+
+
+def write_table(path, header, rows):
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        writer.writerows(rows)
+
+
+def write_tables(summary, directory):
+    os.makedirs(directory, exist_ok=True)
+    words = list(summary.words)
+    solve_rate = ratio(summary.word_wins, summary.word_plays)
+    avg_misses = ratio(summary.word_misses, summary.word_plays)
+    order = np.lexsort((-summary.word_plays, solve_rate))
+    write_table(os.path.join(directory, 'words.csv'), ['categorie', 'mot', 'parties', 'victoires', 'taux', 'erreurs_moy'],
+                ((*words[i], summary.word_plays[i], summary.word_wins[i], f'{solve_rate[i]:.4f}',
+                  f'{avg_misses[i]:.3f}') for i in order if summary.word_plays[i]))
+
+    names = {code: name for name, code in summary.categories.items()}
+    groups = np.flatnonzero(summary.group_plays + summary.group_abandoned)
+    win_rate = ratio(summary.group_wins, summary.group_plays)
+    write_table(os.path.join(directory, 'categories.csv'),
+                ['categorie', 'difficulte', 'parties', 'victoires', 'taux', 'abandons'],
+                ((names[group // 256], DIFFICULTIES.get(group % 256, f'{group % 256} essais'),
+                  summary.group_plays[group], summary.group_wins[group], f'{win_rate[group]:.4f}',
+                  summary.group_abandoned[group]) for group in groups))
+
+    labels = [*LETTERS, 'hint', 'autre']
+    first_rate = ratio(summary.first_wins, summary.first_plays)
+    write_table(os.path.join(directory, 'first_guesses.csv'), ['lettre', 'parties', 'victoires', 'taux'],
+                ((labels[i], summary.first_plays[i], summary.first_wins[i], f'{first_rate[i]:.4f}')
+                 for i in np.argsort(-first_rate) if summary.first_plays[i]))
+
+    ranks, letters = np.nonzero(summary.order_guesses)
+    write_table(os.path.join(directory, 'letters_by_rank.csv'), ['rang', 'lettre', 'essais', 'trouvees'],
+                ((rank + 1, labels[letter], summary.order_guesses[rank, letter], summary.order_hits[rank, letter])
+                 for rank, letter in zip(ranks, letters)))
+    return solve_rate, avg_misses
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Statistiques des parties enregistrées (voir event_log.py).")
+    parser.add_argument('logs', nargs='+', help="Journaux de parties.")
+    parser.add_argument('--output', default='analytics', help="Répertoire des tables CSV.")
+    parser.add_argument('--chunk-size', type=int, default=16, help="Taille des blocs lus (Mo).")
+    parser.add_argument('--min-plays', type=int, default=20, help="Parties minimum pour juger un mot.")
+    parser.add_argument('--top', type=int, default=10)
+    args = parser.parse_args()
+    if np is None:
+        raise SystemExit("analytics.py a besoin de NumPy (pip install numpy).")
+
+    start = time.perf_counter()
+    summary = Summary()
+    reader = ChunkReader(summary, args.chunk_size << 20)
+    for path in args.logs:
+        reader.read(path)
+    reader.finish()
+    solve_rate, avg_misses = write_tables(summary, args.output)
+    elapsed = time.perf_counter() - start
+
+    print(f"{summary.rounds:,} parties terminées et {summary.guesses:,} coups en {elapsed:.1f} s "
+          f"-> tables dans {args.output}/")
+    words = list(summary.words)
+    judged = np.flatnonzero(summary.word_plays >= args.min_plays)
+    if len(judged):
+        by_rate = judged[np.argsort(solve_rate[judged], kind='stable')]
+        for title, selection in (("Mots les plus durs", by_rate[:args.top]),
+                                 ("Mots les plus faciles", by_rate[::-1][:args.top])):
+            print(f"\n{title} (au moins {args.min_plays} parties) :")
+            for i in selection:
+                category, word = words[i]
+                print(f"  {word:<20} {category:<12} {solve_rate[i]:6.1%} réussies, "
+                      f"{avg_misses[i]:.2f} erreurs en moyenne ({summary.word_plays[i]} parties)")
+    first_rate = ratio(summary.first_wins, summary.first_plays)
+    best = [i for i in np.argsort(-first_rate) if summary.first_plays[i] >= args.min_plays][:args.top]
+    if best:
+        print("\nPremiers coups les plus gagnants :")
+        for i in best:
+            label = LETTERS[i] if i < HINT else ('hint' if i == HINT else 'autre')
+            print(f"  {label:<6} {first_rate[i]:6.1%} ({summary.first_plays[i]} parties)")
+
+
+if __name__ == '__main__':
+    main()
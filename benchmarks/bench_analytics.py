@@ -0,0 +1,59 @@
+import argparse
+import os
+import random
+import tempfile
+import time
+from collections import Counter
+
+from analytics import ChunkReader, Summary, write_tables
+from benchmarks.bench_event_log import new_game, play
+from event_log import EventLog, read_rounds
+
+
+def per_row(path):
+    # The same per-word totals with one Python step per round and guess
+    plays, wins, misses = Counter(), Counter(), Counter()
+    for logged in read_rounds(path):
+        if not logged.done:
+            continue
+        key = (logged.category, logged.secret_display)
+        plays[key] += 1
+        wins[key] += logged.guesses[-1][2] != 'incorrect'
+        misses[key] += len({guess[1] for guess in logged.guesses if guess[2] == 'incorrect'})
+    return plays, wins, misses
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Débit de analytics.py sur un journal de parties synthétique.")
+    parser.add_argument('--rounds', type=int, default=500000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'events.log')
+        event_log = EventLog(path)
+        play(new_game(7, event_log), args.rounds, random.Random(7))
+        event_log.close()
+        size = os.path.getsize(path)
+
+        start = time.perf_counter()
+        summary = Summary()
+        reader = ChunkReader(summary)
+        reader.read(path)
+        reader.finish()
+        write_tables(summary, os.path.join(directory, 'tables'))
+        chunked = time.perf_counter() - start
+
+        start = time.perf_counter()
+        plays, wins, misses = per_row(path)
+        looped = time.perf_counter() - start
+        for key, word_id in summary.words.items():
+            assert (summary.word_plays[word_id], summary.word_wins[word_id], summary.word_misses[word_id]) == \
+                (plays[key], wins[key], misses[key])
+
+    for name, elapsed in (('colonnes + NumPy', chunked), ('boucle par partie', looped)):
+        print(f"{name:<18} {args.rounds / elapsed:>9,.0f} parties/s, {size / elapsed / 1e6:5.1f} Mo/s, "
+              f"10 M parties en {10e6 / (args.rounds / elapsed) / 60:4.1f} min")
+
+
+if __name__ == '__main__':
+    main()
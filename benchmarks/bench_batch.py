@@ -0,0 +1,99 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import tempfile
+import time
+
+from game_logic import HangmanGame
+from persistence import GameStore
+from server import HangmanServer
+
+ORDER = 'esaitnrulodcpmvqfbghjxyzwk' # French letter frequency
+
+
+def new_round(game):
+    game.start_new_round('1', game.rng.choice(game.categories()))
+
+
+def one_by_one(game):
+    # What a bot does today: one call per letter, then reads the state
+    for letter in ORDER:
+        if game.game_is_done:
+            break
+        game.guess_letter(letter)
+    return game.state()
+
+
+def batched(game):
+    return game.play_guesses(ORDER)['state']
+
+
+def batched_state_only(game):
+    return game.play_guesses(ORDER, steps=False)['state']
+
+
+def local_rate(play, rounds, store):
+    game = HangmanGame(rng=random.Random(1), store=store)
+    game.stats = {'played': 0, 'wins': 0, 'losses': 0}
+    start = time.perf_counter()
+    for _ in range(rounds):
+        new_round(game)
+        play(game)
+    return rounds / (time.perf_counter() - start)
+
+
+async def server_rate(rounds, batch, store):
+    server = await HangmanServer(port=0, store=store, leaderboard=None).start()
+    reader, writer = await asyncio.open_connection(server.host, server.port)
+    request_id = 0
+
+    async def call(request):
+        nonlocal request_id
+        request_id += 1
+        writer.write(json.dumps(dict(request, id=request_id)).encode() + b'\n')
+        await writer.drain()
+        return json.loads(await reader.readline())
+
+    session = (await call({'cmd': 'new'}))['session']
+    start = time.perf_counter()
+    for _ in range(rounds):
+        await call({'cmd': 'new', 'session': session})
+        if batch:
+            await call({'cmd': 'play', 'session': session, 'guesses': ORDER})
+        else:
+            for letter in ORDER:
+                if (await call({'cmd': 'guess', 'session': session, 'letter': letter}))['state']['done']:
+                    break
+    elapsed = time.perf_counter() - start
+    writer.close()
+    await server.close()
+    return rounds / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parties/s en jouant lettre par lettre ou par lots (play_guesses).")
+    parser.add_argument('--rounds', type=int, default=20000)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--server-rounds', type=int, default=2000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        store = GameStore(os.path.join(directory, 'stats.json'), os.path.join(directory, 'highscore.txt'))
+        # Best of a few interleaved runs: a single one is noisy on a busy machine
+        rates = {play: 0.0 for play in (one_by_one, batched, batched_state_only)}
+        for _ in range(args.repeat):
+            for play in rates:
+                rates[play] = max(rates[play], local_rate(play, args.rounds, store))
+        single, batch, state_only = rates.values()
+        print(f"En mémoire : {single:9,.0f} parties/s lettre par lettre, {batch:9,.0f} par lots ({batch / single:.2f}x), "
+              f"{state_only:9,.0f} sans le détail des coups ({state_only / single:.2f}x)")
+        single = asyncio.run(server_rate(args.server_rounds, False, store))
+        batch = asyncio.run(server_rate(args.server_rounds, True, store))
+        print(f"Serveur    : {single:9,.0f} parties/s lettre par lettre, {batch:9,.0f} par lots ({batch / single:.2f}x)")
+        store.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.bench_batch import ORDER
+from game_logic import HangmanGame
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def commands(rounds, batch, rng):
+    # A round per category in turn: either every letter as its own command
+    # (answered 'Partie terminée' once the round is over) or one 'play'
+    categories = HangmanGame().categories()
+    lines = []
+    for i in range(rounds):
+        lines.append({'id': len(lines), 'cmd': 'new', 'difficulty': rng.choice('123'),
+                      'category': categories[i % len(categories)]})
+        if batch:
+            lines.append({'id': len(lines), 'cmd': 'play', 'guesses': ORDER})
+        else:
+            lines.extend({'id': len(lines) + j, 'cmd': 'guess', 'letter': letter} for j, letter in enumerate(ORDER))
+    return ''.join(json.dumps(line) + '\n' for line in lines).encode()
+
+
+def drive(data, directory):
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, os.path.join(ROOT, 'hangman_console.py'), '--json', '--leaderboard',
+                             os.path.join(directory, 'leaderboard.db')],
+                            input=data, capture_output=True, check=True, cwd=directory)
+    elapsed = time.perf_counter() - start
+    replies = [json.loads(line) for line in result.stdout.splitlines()]
+    return elapsed, replies
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parties/s du mode sans interface (hangman_console.py --json).")
+    parser.add_argument('--rounds', type=int, default=20000)
+    args = parser.parse_args()
+
+    for label, batch in (('une commande par lettre', False), ('une commande play', True)):
+        data = commands(args.rounds, batch, random.Random(0))
+        with tempfile.TemporaryDirectory() as directory:
+            elapsed, replies = drive(data, directory)
+        finished = sum(1 for reply in replies if reply['ok'] and reply['state']['done'])
+        print(f"{label:<24} {args.rounds / elapsed:9,.0f} parties/s, {len(replies) / elapsed:10,.0f} réponses/s "
+              f"({len(data) / 1e6:.1f} Mo lus, {finished} parties terminées)")
+
+
+if __name__ == '__main__':
+    main()
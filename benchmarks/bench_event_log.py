@@ -0,0 +1,80 @@
+import argparse
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+from event_log import EventLog
+from game_logic import HangmanGame
+from solver import FRENCH_LETTER_ORDER
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+READ_PROBE = r'''
+import sys, time
+from event_log import read_rounds, replay_round
+start = time.perf_counter()
+rounds = 0
+game = None
+for logged in read_rounds(sys.argv[1]):
+    if sys.argv[2] == 'replay':
+        game = replay_round(logged, game)
+    rounds += 1
+elapsed = time.perf_counter() - start
+with open('/proc/self/status') as f:
+    peak = next(int(line.split()[1]) for line in f if line.startswith('VmHWM'))
+print(rounds, elapsed, peak)
+'''
+
+
+def play(game, rounds, rng):
+    guesses = 0
+    start = time.perf_counter()
+    for _ in range(rounds):
+        game.set_difficulty(rng.choice('123'))
+        game.start_new_round('1', rng.choice(game.categories()))
+        letters = iter(FRENCH_LETTER_ORDER)
+        while not game.game_is_done:
+            # Hints once the score allows it, so replays have to reproduce them
+            game.guess_letter('hint' if game.score >= 50 and not game.hint_used else next(letters))
+            guesses += 1
+    return guesses, time.perf_counter() - start
+
+
+def new_game(seed, event_log=None):
+    game = HangmanGame(rng=random.Random(seed), event_log=event_log)
+    game.stats = {'played': 0, 'wins': 0, 'losses': 0}
+    game.highscore = 0
+    return game
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Débit d'écriture et de relecture du journal de parties.")
+    parser.add_argument('--rounds', type=int, default=200000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'events.log')
+        guesses, plain = play(new_game(1), args.rounds, random.Random(1))
+        event_log = EventLog(path)
+        _, logged = play(new_game(1, event_log), args.rounds, random.Random(1))
+        event_log.close()
+        size = os.path.getsize(path)
+        print(f"Écriture : {guesses / plain:>10,.0f} coups/s sans journal, {guesses / logged:>10,.0f} avec "
+              f"({(logged - plain) / guesses * 1e6:+.2f} µs/coup)")
+        print(f"Journal  : {size / 1e6:.1f} Mo, {size / args.rounds:.0f} octets/partie, "
+              f"{size / guesses:.1f} octets/coup")
+
+        for mode in ('read', 'replay'):
+            output = subprocess.run([sys.executable, '-c', READ_PROBE, path, mode], capture_output=True,
+                                    text=True, check=True, cwd=ROOT).stdout.split()
+            rounds, elapsed, peak_kb = int(output[0]), float(output[1]), int(output[2])
+            label = 'Lecture ' if mode == 'read' else 'Rejeu   '
+            print(f"{label} : {rounds:,} parties, {size / elapsed / 1e6:6.1f} Mo/s, "
+                  f"{rounds / elapsed:>9,.0f} parties/s, pic mémoire {peak_kb / 1024:.1f} Mo")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,44 @@
+import argparse
+import random
+import string
+import time
+
+from game_logic import HangmanGame
+
+
+def make_word(length, rng):
+    # Every letter appears at least once so a round always runs 26 guesses
+    letters = list(string.ascii_lowercase) + [rng.choice(string.ascii_lowercase) for _ in range(length - 26)]
+    rng.shuffle(letters)
+    return ''.join(letters)
+
+
+def bench_word_length(game, word, rounds):
+    guesses = list(string.ascii_lowercase)
+    elapsed = 0.0
+    for _ in range(rounds):
+        game.set_player_word(word)
+        game.start_new_round('3')
+        start = time.perf_counter()
+        for guess in guesses:
+            game.guess_letter(guess)
+        elapsed += time.perf_counter() - start
+    return elapsed / (rounds * len(guesses))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Coût par lettre de guess_letter en mode deux joueurs.")
+    parser.add_argument('--lengths', type=int, nargs='+', default=[26, 1000, 5000, 20000])
+    parser.add_argument('--rounds', type=int, default=200)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    game = HangmanGame()
+    game.set_difficulty('1')
+    for length in args.lengths:
+        per_guess = bench_word_length(game, make_word(max(length, 26), rng), args.rounds)
+        print(f"{length:>7} lettres : {per_guess * 1e6:8.3f} µs / lettre")
+
+
+if __name__ == '__main__':
+    main()
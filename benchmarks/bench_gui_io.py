@@ -0,0 +1,142 @@
+import argparse
+import heapq
+import itertools
+import os
+import random
+import tempfile
+import threading
+import time
+import types
+
+import hangman_gui
+from benchmarks.suite import CATEGORY, StubWidget, make_gui, synthetic_words
+from game_logic import HangmanGame, WordLists
+from persistence import GameStore, file_lock
+
+
+class StubRoot(StubWidget):
+    # Event loop of the stub GUI: runs root.after callbacks when due and
+    # keeps the longest time the "main thread" spent in one of them
+    def __init__(self):
+        self.timers = []
+        self.order = itertools.count()
+        self.longest = 0.0
+
+    def after(self, delay, function, *args):
+        heapq.heappush(self.timers, (time.monotonic() + delay / 1000, next(self.order), function, args))
+
+    def run_until(self, condition, timeout=30.0):
+        deadline = time.monotonic() + timeout
+        while not condition() and time.monotonic() < deadline:
+            due, _, function, args = heapq.heappop(self.timers)
+            time.sleep(max(0.0, due - time.monotonic()))
+            self.turn(function, *args)
+
+    def turn(self, function, *args):
+        start = time.perf_counter()
+        function(*args)
+        self.longest = max(self.longest, time.perf_counter() - start)
+
+
+class SlowWordSource:
+    # First words arrive after delay seconds, like a cold start on a slow network
+    def __init__(self, delay):
+        self.ready = threading.Event()
+        threading.Timer(delay, self.ready.set).start()
+
+    def get_word(self):
+        return 'ordinateur' if self.ready.is_set() else None
+
+
+class SlowOnlineGame(HangmanGame):
+    network_delay = 1.5
+
+    def prefetch_online_words(self):
+        if self.online_source is None:
+            self.online_source = SlowWordSource(self.network_delay)
+        return self.online_source
+
+
+def hold_lock(path, seconds):
+    started = threading.Event()
+
+    def hold():
+        with file_lock(path):
+            started.set()
+            time.sleep(seconds)
+    threading.Thread(target=hold, daemon=True).start()
+    started.wait()
+
+
+class BenchGUI(hangman_gui.HangmanGUI):
+    # Online games at medium difficulty, none while the window is created
+    game_mode = None
+
+    def choose_game_mode(self):
+        return self.game_mode
+
+    def choose_difficulty(self):
+        return '2'
+
+
+def new_gui(directory, stall_threshold):
+    store = GameStore(os.path.join(directory, 'stats.json'), os.path.join(directory, 'highscore.txt'))
+    game = SlowOnlineGame(rng=random.Random(0), store=store)
+    game.words = WordLists({CATEGORY: ' '.join(synthetic_words(1000, random.Random(0)))})
+    make_gui(game, 'stub') # Swaps hangman_gui's widgets for stubs
+    root = StubRoot()
+    gui = BenchGUI(root, stall_threshold=stall_threshold)
+    gui.game = game
+    gui.game_mode = '2'
+    return gui, game, root
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Temps maximal passé par le thread de l'interface hors de sa boucle d'événements.")
+    parser.add_argument('--network-delay', type=float, default=1.5, help="Arrivée des premiers mots en ligne (s).")
+    parser.add_argument('--lock-hold', type=float, default=0.5, help="Verrou des statistiques tenu ailleurs (s).")
+    parser.add_argument('--stall-threshold', type=float, default=0.1)
+    args = parser.parse_args()
+    hangman_gui.messagebox = types.SimpleNamespace(askyesno=lambda *a: False, showinfo=lambda *a: None)
+
+    with tempfile.TemporaryDirectory() as directory:
+        results = []
+        for label, background in (('synchrone', False), ('arrière-plan', True)):
+            gui, game, root = new_gui(directory, args.stall_threshold)
+            game.network_delay = args.network_delay
+            if background:
+                root.turn(gui.start_new_game)
+                root.run_until(lambda: gui.loading is None)
+            else:
+                # What start_new_game did before: wait for the word on the Tk thread
+                def start():
+                    game.prefetch_online_words().ready.wait(args.network_delay + 1)
+                    gui.begin_round('2')
+                root.turn(start)
+            root.run_until(lambda: False, 0.2)
+            online = root.longest
+            online_ok = game.secret_word == 'ordinateur'
+
+            root.longest = 0.0
+            for letter in game.secret_word:
+                game.guess_letter(letter)
+            hold_lock(game.store.lock_file, args.lock_hold)
+            if background:
+                root.turn(gui.end_game)
+            else:
+                root.turn(lambda: (game.save_stats(), game.save_highscore()))
+            root.run_until(lambda: False, args.lock_hold + 0.2)
+            end = root.longest
+            gui.close() # Waits for the writes
+            game.store.close()
+            results.append((label, online, online_ok, end, gui.stall_monitor.stalls))
+
+        for label, online, online_ok, end, stalls in results:
+            print(f"{label:<13} nouvelle partie en ligne {online * 1e3:8.1f} ms"
+                  f"{'' if online_ok else ' (mot local)'}, fin de partie {end * 1e3:7.1f} ms, "
+                  f"blocages signalés : {stalls}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+import argparse
+import multiprocessing
+import os
+import random
+import sqlite3
+import tempfile
+import time
+
+from leaderboard import Leaderboard
+
+DIFFICULTIES = ('Facile', 'Moyen', 'Difficile')
+CATEGORIES = ('Animaux', 'Fruits', 'Pays')
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+def seed(path, rows, players):
+    rng = random.Random(0)
+    leaderboard = Leaderboard(path, batch_size=100000, flush_interval=3600)
+    for _ in range(rows):
+        leaderboard.record(f'joueur{rng.randrange(players)}', rng.randrange(400), rng.choice(DIFFICULTIES),
+                           rng.choice(CATEGORIES), rng.random() < 0.5)
+    leaderboard.close()
+
+
+def writer(path, rounds, batch_size, index, results):
+    rng = random.Random(index)
+    leaderboard = Leaderboard(path, batch_size=batch_size)
+    latencies = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        leaderboard.record(f'auteur{index}', rng.randrange(400), rng.choice(DIFFICULTIES), rng.choice(CATEGORIES),
+                           True)
+        latencies.append(time.perf_counter() - start)
+    leaderboard.close()
+    results.put(('writer', latencies))
+
+
+def reader(path, stop, results):
+    leaderboard = Leaderboard(path)
+    latencies = []
+    while not stop.is_set():
+        start = time.perf_counter()
+        leaderboard.top(10, 'Moyen')
+        latencies.append(time.perf_counter() - start)
+        time.sleep(0.001)
+    results.put(('reader', latencies))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Classement SQLite : requêtes top-N et écrivains concurrents.")
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--writers', type=int, default=8)
+    parser.add_argument('--rounds', type=int, default=2000, help="Parties enregistrées par écrivain.")
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 64])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'leaderboard.db')
+        start = time.perf_counter()
+        seed(path, args.rows, 10000)
+        print(f"{args.rows:,} parties insérées en {time.perf_counter() - start:.1f} s")
+
+        leaderboard = Leaderboard(path)
+        for label, clear in (('sans cache', True), ('avec cache', False)):
+            latencies = []
+            for _ in range(200):
+                if clear:
+                    leaderboard.cache.clear()
+                start = time.perf_counter()
+                leaderboard.top(10, 'Moyen')
+                latencies.append(time.perf_counter() - start)
+            print(f"top 10 {label:<11}: p50 {percentile(latencies, 0.5) * 1e3:7.3f} ms, "
+                  f"p99 {percentile(latencies, 0.99) * 1e3:7.3f} ms")
+        leaderboard.close()
+
+        for batch_size in args.batch_sizes:
+            results = multiprocessing.Queue()
+            stop = multiprocessing.Event()
+            processes = [multiprocessing.Process(target=reader, args=(path, stop, results))]
+            processes += [multiprocessing.Process(target=writer, args=(path, args.rounds, batch_size, i, results))
+                          for i in range(args.writers)]
+            start = time.perf_counter()
+            for process in processes:
+                process.start()
+            collected = {'writer': [], 'reader': []}
+            for _ in range(args.writers):
+                kind, latencies = results.get()
+                collected[kind] += latencies
+            elapsed = time.perf_counter() - start
+            stop.set()
+            kind, latencies = results.get()
+            collected[kind] += latencies
+            for process in processes:
+                process.join()
+
+            total = args.writers * args.rounds
+            print(f"{args.writers} écrivains, lots de {batch_size:>3} : {total / elapsed:>8,.0f} parties/s, "
+                  f"enregistrement p99 {percentile(collected['writer'], 0.99) * 1e3:6.2f} ms, "
+                  f"top 10 pendant l'écriture p99 {percentile(collected['reader'], 0.99) * 1e3:6.2f} ms")
+
+        connection = sqlite3.connect(path)
+        count, = connection.execute('SELECT COUNT(*) FROM scores').fetchone()
+        expected = args.rows + args.writers * args.rounds * len(args.batch_sizes)
+        print(f"{count:,} lignes au total ({'complet' if count == expected else f'{expected:,} attendues'})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+import argparse
+import os
+import random
+import tempfile
+import time
+
+import metrics
+from benchmarks.suite import CATEGORY, play_round, synthetic_words
+from game_logic import HangmanGame, WordLists
+from persistence import GameStore
+
+
+def per_guess(game, rounds):
+    guesses, elapsed = 0, 0.0
+    for _ in range(rounds):
+        game.start_new_round('1', CATEGORY)
+        start = time.perf_counter()
+        guesses += sum(1 for _ in play_round(game))
+        elapsed += time.perf_counter() - start
+    return elapsed / guesses
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Surcoût des métriques sur guess_letter.")
+    parser.add_argument('--rounds', type=int, default=2000)
+    parser.add_argument('--repeat', type=int, default=7)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        store = GameStore(os.path.join(directory, 'stats.json'), os.path.join(directory, 'highscore.txt'))
+        game = HangmanGame(rng=random.Random(42), store=store)
+        game.words = WordLists({CATEGORY: ' '.join(synthetic_words(10000, random.Random(42)))})
+        original = HangmanGame.guess_letter
+
+        per_guess(game, args.rounds) # Warm-up
+        # Passes alternate so that drift affects both sides alike
+        best = {'désactivées': float('inf'), 'activées': float('inf')}
+        for _ in range(args.repeat):
+            best['désactivées'] = min(best['désactivées'], per_guess(game, args.rounds))
+            metrics.enable()
+            best['activées'] = min(best['activées'], per_guess(game, args.rounds))
+            metrics.disable()
+            assert HangmanGame.guess_letter is original # Nothing left behind once disabled
+        store.close()
+
+    baseline = best['désactivées']
+    for name, seconds in best.items():
+        print(f"{name:<16} {seconds * 1e6:8.3f} µs / lettre  ({(seconds / baseline - 1) * 100:+5.1f} %)")
+
+
+if __name__ == '__main__':
+    main()
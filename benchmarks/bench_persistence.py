@@ -0,0 +1,99 @@
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import tempfile
+import time
+
+from persistence import GameStore
+
+
+def legacy_save(directory, stats, highscore):
+    # What save_stats/save_highscore did before the log: full rewrites
+    with open(os.path.join(directory, 'stats.json'), 'w') as f:
+        json.dump(stats, f, indent=4)
+    with open(os.path.join(directory, 'highscore.txt'), 'w') as f:
+        f.write(str(highscore))
+
+
+def bench_throughput(directory, games):
+    results = {}
+    stats = {'played': 0, 'wins': 0, 'losses': 0}
+    start = time.perf_counter()
+    for i in range(games):
+        stats['played'] += 1
+        legacy_save(directory, stats, i)
+    results['réécriture complète'] = games / (time.perf_counter() - start)
+
+    for fsync_every in (1, 32):
+        store = GameStore(os.path.join(directory, f'stats-{fsync_every}.json'), fsync_every=fsync_every)
+        start = time.perf_counter()
+        for i in range(games):
+            store.record_stats({'played': 1, 'wins': i % 2, 'losses': 1 - i % 2})
+        store.close()
+        results[f'journal, fsync toutes les {fsync_every}'] = games / (time.perf_counter() - start)
+    return results
+
+
+def best_score(seed, games):
+    rng = random.Random(seed)
+    return max(rng.randrange(1000) for _ in range(games))
+
+
+def writer(stats_file, games, seed, crash):
+    rng = random.Random(seed)
+    # A tiny compaction threshold makes writers race with each other's compactions
+    store = GameStore(stats_file, highscore_file=stats_file + '.highscore', compact_size=2048)
+    best = 0
+    for i in range(games):
+        store.record_stats({'played': 1, 'wins': i % 2, 'losses': 1 - i % 2})
+        score = rng.randrange(1000)
+        if score > best:
+            best = score
+            store.record_highscore(score)
+    if crash:
+        os._exit(0) # No close(), no final fsync: the records must survive anyway
+    store.close()
+
+
+def stress(directory, processes, games):
+    stats_file = os.path.join(directory, 'stress.json')
+    workers = [multiprocessing.Process(target=writer, args=(stats_file, games, seed, seed % 3 == 0))
+               for seed in range(processes)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - start
+
+    expected_best = max(best_score(seed, games) for seed in range(processes))
+    totals = GameStore(stats_file, highscore_file=stats_file + '.highscore').load()
+    expected = processes * games
+    ok = totals['played'] == expected and totals['wins'] + totals['losses'] == expected \
+        and totals['highscore'] == expected_best
+    return totals, expected, elapsed, ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Débit du journal de statistiques et test d'écrivains concurrents.")
+    parser.add_argument('--games', type=int, default=5000)
+    parser.add_argument('--processes', type=int, default=16)
+    parser.add_argument('--stress-games', type=int, default=500)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        for name, rate in bench_throughput(directory, args.games).items():
+            print(f"{name:<28} {rate:>10,.0f} parties/s")
+
+        totals, expected, elapsed, ok = stress(directory, args.processes, args.stress_games)
+        print(f"{args.processes} processus x {args.stress_games} parties en {elapsed:.2f} s : "
+              f"{totals['played']}/{expected} parties, meilleur score {totals['highscore']}, "
+              f"génération {totals['generation']} -> {'OK' if ok else 'ÉCHEC'}")
+    if not ok:
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+import argparse
+import os
+import pty
+import sys
+import threading
+import time
+
+from hangman_console import HangmanConsole
+from solver import FRENCH_LETTER_ORDER
+
+
+class PtyDrain:
+    # Reads everything written to the pseudo-terminal so writes never block,
+    # counting the bytes a real terminal would have had to process.
+    def __init__(self, master):
+        self.master = master
+        self.bytes = 0
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def run(self):
+        while True:
+            try:
+                data = os.read(self.master, 65536)
+            except OSError:
+                return
+            if not data:
+                return
+            self.bytes += len(data)
+
+
+def legacy_display_board(console):
+    # The board as it was drawn before: spawn 'clear', then print every line
+    os.system('clear')
+    for line in console.board_lines():
+        print(line)
+    sys.stdout.flush()
+
+
+def bench(console, display, rounds):
+    frames = 0
+    start = time.perf_counter()
+    for _ in range(rounds):
+        console.game.start_new_round('1', 'Animaux')
+        display(console)
+        frames += 1
+        for letter in FRENCH_LETTER_ORDER:
+            if console.game.game_is_done:
+                break
+            console.game.guess_letter(letter)
+            display(console)
+            frames += 1
+    return frames, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Images/s du plateau console vers un pseudo-terminal.")
+    parser.add_argument('--rounds', type=int, default=50)
+    args = parser.parse_args()
+
+    master, slave = pty.openpty()
+    drain = PtyDrain(master)
+    saved_stdout = os.dup(1)
+    os.environ.setdefault('TERM', 'xterm')
+    results = []
+    try:
+        # Both the child 'clear' process and our own prints go to the pty
+        os.dup2(slave, 1)
+        sys.stdout = os.fdopen(os.dup(slave), 'w', buffering=1)
+        console = HangmanConsole()
+        console.game.set_difficulty('1')
+        for name, display in (('clear + print', legacy_display_board), ('rendu différentiel', HangmanConsole.display_board)):
+            console.renderer.invalidate()
+            before = drain.bytes
+            frames, elapsed = bench(console, display, args.rounds)
+            time.sleep(0.2) # Let the drain catch up before reading the byte count
+            results.append((name, frames, elapsed, drain.bytes - before))
+    finally:
+        sys.stdout.flush()
+        os.dup2(saved_stdout, 1)
+        sys.stdout = sys.__stdout__
+
+    for name, frames, elapsed, written in results:
+        print(f"{name:<20} {frames / elapsed:>9,.0f} images/s, {elapsed / frames * 1e3:7.3f} ms/image, "
+              f"{written / frames:7.0f} octets/image")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+import argparse
+import gc
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from game_logic import HangmanGame
+from persistence import GameStore
+
+
+def create(count, store, rounds):
+    games = []
+    for _ in range(count):
+        game = HangmanGame(store=store)
+        if rounds:
+            game.start_new_round('1', 'Animaux')
+        games.append(game)
+    return games
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mémoire et vitesse de création des parties gardées en mémoire.")
+    parser.add_argument('--sessions', type=int, default=100000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        store = GameStore(os.path.join(directory, 'stats.json'), os.path.join(directory, 'highscore.txt'))
+        HangmanGame(store=store).start_new_round('1', 'Animaux') # Shared word data built outside the measure
+        for label, rounds in (('sans partie', False), ('partie en cours', True)):
+            gc.collect()
+            start = time.perf_counter()
+            games = create(args.sessions, store, rounds)
+            rate = args.sessions / (time.perf_counter() - start)
+            shallow = sys.getsizeof(games[0])
+            del games
+            gc.collect()
+
+            tracemalloc.start()
+            before = tracemalloc.get_traced_memory()[0]
+            games = create(args.sessions, store, rounds)
+            used = tracemalloc.get_traced_memory()[0] - before
+            tracemalloc.stop()
+            del games
+            print(f"{label:<16} {used / args.sessions:8.0f} octets/partie (objet seul {shallow} octets), "
+                  f"{rate / 1000:7.1f} k créations/s")
+        store.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+import argparse
+import os
+import random
+import tempfile
+import time
+
+import snapshot
+from game_logic import HangmanGame
+from persistence import GameStore
+
+
+def games_in_play(count, store, own_rng, rng):
+    games = []
+    for i in range(count):
+        game = HangmanGame(rng=random.Random(i) if own_rng else None, store=store, player=f'joueur{i}')
+        game.set_difficulty(rng.choice('123'))
+        game.start_new_round('1', rng.choice(game.categories()))
+        game.stats['played'] += 1
+        for _ in range(rng.randrange(5)):
+            if not game.game_is_done:
+                game.guess_letter(rng.choice('abcdefghijklmnopqrstuvwxyz'))
+        games.append(game)
+    return games
+
+
+def rate(function, items):
+    start = time.perf_counter()
+    for item in items:
+        function(item)
+    return len(items) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sauvegardes et reprises de parties par seconde, taille par partie.")
+    parser.add_argument('--sessions', type=int, default=20000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        store = GameStore(os.path.join(directory, 'stats.json'), os.path.join(directory, 'highscore.txt'))
+        for label, own_rng in (('générateur partagé', False), ('générateur propre', True)):
+            games = games_in_play(args.sessions, store, own_rng, random.Random(42))
+            data = [snapshot.dumps(game) for game in games]
+            size = sum(map(len, data)) / len(data)
+            dumps = rate(snapshot.dumps, games)
+            loads = rate(lambda blob: snapshot.loads(blob, HangmanGame(store=store)), data)
+            target = HangmanGame(store=store)
+            reloads = rate(lambda blob: snapshot.loads(blob, target), data)
+            print(f"{label:<19} {size:7.1f} octets/partie, sauvegarde {dumps / 1000:6.1f} k/s, "
+                  f"reprise {loads / 1000:6.1f} k/s ({reloads / 1000:.1f} k/s dans une partie existante)")
+        store.close()
+
+
+if __name__ == '__main__':
+    main()
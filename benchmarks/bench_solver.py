@@ -0,0 +1,88 @@
+import argparse
+import random
+import re
+import string
+import time
+
+from solver import ALPHABET, WordIndex
+
+# Skewed letter weights so synthetic words look a little like French
+WEIGHTS = [8, 1, 3, 4, 15, 1, 1, 1, 7, 1, 1, 5, 3, 7, 5, 3, 1, 7, 8, 7, 6, 2, 1, 1, 1, 1]
+
+
+def make_words(count, rng):
+    words = set()
+    while len(words) < count:
+        length = rng.randint(4, 14)
+        words.add(''.join(rng.choices(string.ascii_lowercase, WEIGHTS, k=length)))
+    return list(words)
+
+
+def brute_force_suggest(words, pattern, missed):
+    # Reference implementation: regex over the whole dictionary on each guess
+    guessed = set(pattern.replace('_', '')) | set(missed)
+    hidden = '[^' + ''.join(sorted(guessed)) + ']' if guessed else '.'
+    regex = re.compile(''.join(hidden if c == '_' else c for c in pattern) + '$')
+    candidates = [word for word in words if regex.match(word)]
+    counts = {letter: sum(letter in word for word in candidates) for letter in ALPHABET if letter not in guessed}
+    return max(sorted(counts), key=counts.get) if counts else None
+
+
+def play(words, secret, suggest):
+    pattern = ['_'] * len(secret)
+    missed = ''
+    steps = 0
+    while '_' in pattern and steps < 26:
+        letter = suggest(''.join(pattern), missed)
+        steps += 1
+        if letter in secret:
+            for i, c in enumerate(secret):
+                if c == letter:
+                    pattern[i] = c
+        else:
+            missed += letter
+    return steps
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Solveur indexé contre regex sur un grand dictionnaire.")
+    parser.add_argument('--words', type=int, default=100000)
+    parser.add_argument('--games', type=int, default=50)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    words = make_words(args.words, rng)
+    secrets = rng.sample(words, args.games)
+
+    start = time.perf_counter()
+    index = WordIndex(words)
+    print(f"Index de {len(index)} mots construit en {time.perf_counter() - start:.2f} s")
+
+    start = time.perf_counter()
+    steps = 0
+    for secret in secrets:
+        session = index.session(len(secret))
+        pattern = ['_'] * len(secret)
+        while '_' in pattern:
+            letter = session.best_letter()
+            positions = [i for i, c in enumerate(secret) if c == letter]
+            session.update(letter, positions)
+            for i in positions:
+                pattern[i] = letter
+            steps += 1
+    incremental = (time.perf_counter() - start) / steps
+    print(f"Index incrémental : {incremental * 1e3:8.3f} ms / suggestion")
+
+    start = time.perf_counter()
+    steps = sum(play(words, secret, index.suggest) for secret in secrets)
+    rebuilt = (time.perf_counter() - start) / steps
+    print(f"Index, motif complet : {rebuilt * 1e3:8.3f} ms / suggestion")
+
+    start = time.perf_counter()
+    steps = sum(play(words, secret, lambda p, m: brute_force_suggest(words, p, m)) for secret in secrets[:5])
+    brute = (time.perf_counter() - start) / steps
+    print(f"Regex force brute : {brute * 1e3:8.3f} ms / suggestion ({brute / incremental:.0f}x plus lent)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules a local game must not pull in at import time or for its first round
+FORBIDDEN = ('requests', 'urllib3', 'charset_normalizer', 'tkinter', 'solver', 'word_source', 'argparse')
+
+IMPORT_PROBE = r'''
+import json, sys
+import game_logic
+game = game_logic.HangmanGame()
+game.set_difficulty('2')
+game.start_new_round('1', 'Fruits')
+print(json.dumps(sorted(set(sys.argv[1:]) & set(sys.modules))))
+'''
+
+BOARD_PROBE = r'''
+import contextlib, io, time
+start = time.perf_counter()
+from hangman_console import HangmanConsole
+console = HangmanConsole()
+console.game.set_difficulty('2')
+console.game.start_new_round('1', 'Fruits')
+with contextlib.redirect_stdout(io.StringIO()):
+    console.display_board()
+print('BOARD', time.perf_counter() - start)
+'''
+
+
+def run(args):
+    return subprocess.run([sys.executable, *args], capture_output=True, text=True, check=True, cwd=ROOT)
+
+
+def import_time_ms():
+    # Cumulative time reported by -X importtime for game_logic itself
+    output = run(['-X', 'importtime', '-c', 'import game_logic']).stderr
+    for line in output.splitlines():
+        fields = [field.strip() for field in line.split('|')]
+        if len(fields) == 3 and fields[2] == 'game_logic':
+            return int(fields[1]) / 1000
+    raise RuntimeError("game_logic absent de la sortie de -X importtime")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Temps de démarrage de game_logic et du premier plateau console.")
+    parser.add_argument('--runs', type=int, default=7)
+    parser.add_argument('--import-budget-ms', type=float, default=25.0)
+    parser.add_argument('--board-budget-ms', type=float, default=80.0)
+    parser.add_argument('--json', action='store_true', help="Résultats en JSON.")
+    args = parser.parse_args()
+
+    import_ms = min(import_time_ms() for _ in range(args.runs))
+    # clear_screen writes straight to the inherited stdout, ahead of our marker
+    board_ms = min(float(run(['-c', BOARD_PROBE]).stdout.rsplit('BOARD ', 1)[1]) * 1000 for _ in range(args.runs))
+    loaded = json.loads(run(['-c', IMPORT_PROBE, *FORBIDDEN]).stdout)
+
+    failures = []
+    if import_ms > args.import_budget_ms:
+        failures.append(f"import game_logic {import_ms:.1f} ms > {args.import_budget_ms:.1f} ms")
+    if board_ms > args.board_budget_ms:
+        failures.append(f"premier plateau {board_ms:.1f} ms > {args.board_budget_ms:.1f} ms")
+    if loaded:
+        failures.append(f"modules chargés pour une partie locale : {', '.join(loaded)}")
+
+    if args.json:
+        print(json.dumps({'import_ms': import_ms, 'first_board_ms': board_ms, 'unexpected_modules': loaded,
+                          'failures': failures}))
+    else:
+        print(f"import game_logic : {import_ms:6.1f} ms (budget {args.import_budget_ms:.0f} ms)")
+        print(f"premier plateau   : {board_ms:6.1f} ms (budget {args.board_budget_ms:.0f} ms)")
+        for failure in failures:
+            print(f"RÉGRESSION : {failure}")
+    if failures:
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+import argparse
+import random
+import time
+
+from benchmarks.suite import synthetic_words
+from game_logic import HangmanGame
+from word_selector import RecentWords, WordSelector
+
+
+def rate(function, picks):
+    start = time.perf_counter()
+    for _ in range(picks):
+        function()
+    return picks / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tirages/s et reconstruction du sélecteur de mots pondéré.")
+    parser.add_argument('--picks', type=int, default=1000000)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100000, 1000000])
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    sources = {'Animaux': HangmanGame().words['Animaux']}
+    for size in args.sizes:
+        sources[f'{size} mots'] = synthetic_words(size, rng)
+
+    for name, words in sources.items():
+        selector = WordSelector({name: words})
+        start = time.perf_counter()
+        selector.category(name)
+        built = time.perf_counter() - start
+        recent = RecentWords()
+        results = [
+            ('random.choice', rate(lambda: rng.choice(words), args.picks)),
+            ('alias', rate(lambda: selector.pick(name, 'Difficile', rng=rng), args.picks)),
+            ('alias + historique', rate(lambda: selector.pick(name, 'Difficile', recent, rng), args.picks)),
+        ]
+        start = time.perf_counter()
+        selector.pick_many(name, args.picks, 'Difficile', rng)
+        results.append(('alias par lots', args.picks / (time.perf_counter() - start)))
+        print(f"{name} (tables construites en {built * 1e3:.1f} ms) :")
+        for label, picks_per_second in results:
+            print(f"  {label:<20} {picks_per_second / 1e6:5.2f} M tirages/s")
+
+        added = synthetic_words(1000, rng)
+        start = time.perf_counter()
+        selector.add_words(name, added)
+        selector.pick(name, rng=rng) # Rebuilds this category only
+        print(f"  +1000 mots : {(time.perf_counter() - start) * 1e3:.1f} ms, les autres catégories intactes")
+
+
+if __name__ == '__main__':
+    main()
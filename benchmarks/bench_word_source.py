@@ -0,0 +1,76 @@
+import argparse
+import json
+import random
+import string
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from word_source import OnlineWordSource
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    # Mimics random-word-api: /word?lang=fr&number=N, with configurable
+    # latency and failure rate set on the server object.
+    def do_GET(self):
+        server = self.server
+        time.sleep(server.latency)
+        if server.rng.random() < server.failure_rate:
+            self.send_error(503)
+            return
+        number = int(parse_qs(urlparse(self.path).query).get('number', ['1'])[0])
+        words = [''.join(server.rng.choices(string.ascii_lowercase, k=server.rng.randint(4, 10))) for _ in range(number)]
+        body = json.dumps(words).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stub_server(latency, failure_rate):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+    server.latency = latency
+    server.failure_rate = failure_rate
+    server.rng = random.Random(1)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Source de mots en ligne contre un serveur HTTP local.")
+    parser.add_argument('--rounds', type=int, default=2000)
+    parser.add_argument('--latency', type=float, default=0.05, help="Latence simulée du serveur (s).")
+    parser.add_argument('--failure-rate', type=float, default=0.1)
+    parser.add_argument('--round-interval', type=float, default=0.001, help="Pause entre deux parties (s).")
+    args = parser.parse_args()
+
+    server = start_stub_server(args.latency, args.failure_rate)
+    url = f'http://127.0.0.1:{server.server_address[1]}/word'
+    source = OnlineWordSource(url=url, cache_file=None, max_backoff=1, reset_timeout=1).start()
+
+    worst = 0.0
+    start = time.perf_counter()
+    for _ in range(args.rounds):
+        call = time.perf_counter()
+        source.get_word()
+        worst = max(worst, time.perf_counter() - call)
+        time.sleep(args.round_interval)
+    elapsed = time.perf_counter() - start
+
+    source.close()
+    server.shutdown()
+    stats = source.stats()
+    served = stats['hits'] + stats['cache_hits']
+    print(f"{args.rounds} parties en {elapsed:.2f} s, get_word le plus lent : {worst * 1e6:.1f} µs")
+    print(f"Servis : {served} ({stats['hits']} tampon, {stats['cache_hits']} cache), manqués : {stats['misses']}")
+    print(f"Requêtes : {stats['requests']} ({stats['failures']} échecs, disjoncteur ouvert {stats['circuit_opened']} fois), "
+          f"latence moy. {stats['latency_avg'] * 1e3:.1f} ms, max {stats['latency_max'] * 1e3:.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+import argparse
+import json
+import os
+import random
+import string
+import subprocess
+import sys
+import tempfile
+import time
+
+from wordpack import compile_pack
+
+# Run in a fresh interpreter so that RSS only reflects the loading strategy
+PROBE = r'''
+import json, random, resource, sys, time
+start = time.perf_counter()
+if sys.argv[1] == 'pack':
+    from wordpack import WordPack
+    pack = WordPack(sys.argv[2])
+    pick = lambda rng: pack.random_word('Catégorie %d' % rng.randrange(4), rng=rng)
+else:
+    words = {}
+    with open(sys.argv[2], encoding='utf-8') as f:
+        for line in f:
+            category, word = line.rstrip('\n').split('\t')
+            words.setdefault(category, []).append(word)
+    pick = lambda rng: rng.choice(words['Catégorie %d' % rng.randrange(4)])
+ready = time.perf_counter() - start
+rng = random.Random(0)
+start = time.perf_counter()
+for _ in range(100000):
+    pick(rng)
+picks = 100000 / (time.perf_counter() - start)
+try:
+    # ru_maxrss would report the parent's peak, inherited across fork
+    with open('/proc/self/status') as f:
+        rss = next(int(line.split()[1]) for line in f if line.startswith('VmHWM:'))
+except OSError:
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({'startup': ready, 'picks_per_second': picks, 'rss_kb': rss}))
+'''
+
+
+def make_words(count, rng):
+    accents = 'éèêàâîôûç'
+    for _ in range(count):
+        word = ''.join(rng.choices(string.ascii_lowercase + accents, k=rng.randint(4, 12)))
+        yield word if rng.random() > 0.05 else word[:3] + '-' + word[3:]
+
+
+def probe(mode, path):
+    output = subprocess.run([sys.executable, '-c', PROBE, mode, path], capture_output=True, text=True, check=True,
+                            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    return json.loads(output.stdout)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Démarrage et mémoire d'un paquet de mots compilé.")
+    parser.add_argument('--words', type=int, default=1000000)
+    args = parser.parse_args()
+
+    rng = random.Random(3)
+    with tempfile.TemporaryDirectory() as directory:
+        text_path = os.path.join(directory, 'words.tsv')
+        pack_path = os.path.join(directory, 'words.hwp')
+        categories = {f'Catégorie {i}': [] for i in range(4)}
+        with open(text_path, 'w', encoding='utf-8') as f:
+            for i, word in enumerate(make_words(args.words, rng)):
+                category = f'Catégorie {i % 4}'
+                categories[category].append(word)
+                f.write(f'{category}\t{word}\n')
+
+        start = time.perf_counter()
+        compile_pack(categories, pack_path)
+        print(f"Compilation de {args.words} mots : {time.perf_counter() - start:.2f} s, "
+              f"{os.path.getsize(pack_path) / 1e6:.1f} Mo")
+
+        for mode, path in (('text', text_path), ('pack', pack_path)):
+            result = probe(mode, path)
+            print(f"{mode:>5} : démarrage {result['startup'] * 1e3:8.1f} ms, RSS {result['rss_kb'] / 1024:7.1f} Mo, "
+                  f"{result['picks_per_second']:,.0f} tirages/s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,128 @@
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import tempfile
+import time
+
+from persistence import GameStore
+from server import HangmanServer
+from solver import FRENCH_LETTER_ORDER
+
+
+class Client:
+    # One TCP connection shared by many sessions; responses are matched to
+    # their request through the id field.
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.ids = itertools.count()
+        self.pending = {}
+        self.listener = asyncio.create_task(self.listen())
+
+    async def listen(self):
+        while True:
+            line = await self.reader.readline()
+            if not line:
+                break
+            response = json.loads(line)
+            future = self.pending.pop(response.get('id'), None)
+            if future is not None:
+                future.set_result(response)
+
+    async def request(self, **request):
+        request['id'] = next(self.ids)
+        future = asyncio.get_running_loop().create_future()
+        self.pending[request['id']] = future
+        self.writer.write(json.dumps(request).encode() + b'\n')
+        await self.writer.drain()
+        return await future
+
+    async def close(self):
+        self.writer.close()
+        self.listener.cancel()
+
+
+async def play_session(client, deadline, latencies, counters):
+    session = None
+    while time.monotonic() < deadline:
+        start = time.perf_counter()
+        response = await client.request(cmd='new', session=session, mode='1')
+        latencies.append(time.perf_counter() - start)
+        if not response['ok']:
+            counters['errors'] += 1
+            await asyncio.sleep(0.01)
+            continue
+        session = response['session']
+        letters = iter(FRENCH_LETTER_ORDER)
+        state = response['state']
+        while not state['done'] and time.monotonic() < deadline:
+            start = time.perf_counter()
+            response = await client.request(cmd='guess', session=session, letter=next(letters))
+            latencies.append(time.perf_counter() - start)
+            if not response['ok']:
+                counters['errors'] += 1
+                break
+            state = response['state']
+        counters['rounds'] += state['done']
+
+
+async def run_load(host, port, sessions, connections, duration):
+    clients = []
+    for _ in range(connections):
+        reader, writer = await asyncio.open_connection(host, port)
+        clients.append(Client(reader, writer))
+    latencies = []
+    counters = {'rounds': 0, 'errors': 0}
+    deadline = time.monotonic() + duration
+    start = time.perf_counter()
+    await asyncio.gather(*(play_session(clients[i % connections], deadline, latencies, counters)
+                           for i in range(sessions)))
+    elapsed = time.perf_counter() - start
+    for client in clients:
+        await client.close()
+    return latencies, counters, elapsed
+
+
+def percentile(values, fraction):
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+async def main_async(args):
+    server = None
+    host, port = args.host, args.port
+    directory = tempfile.TemporaryDirectory()
+    if port is None:
+        # In-process server with its own stats files so the real ones stay untouched
+        store = GameStore(os.path.join(directory.name, 'stats.json'), os.path.join(directory.name, 'highscore.txt'))
+        server = await HangmanServer(host, 0, store=store).start()
+        port = server.port
+
+    for sessions in args.sessions:
+        latencies, counters, elapsed = await run_load(host, port, sessions, args.connections, args.duration)
+        latencies.sort()
+        print(f"{sessions:>6} sessions : {len(latencies) / elapsed:>9,.0f} req/s, {counters['rounds']:>7} parties, "
+              f"p50 {percentile(latencies, 0.5) * 1e3:7.2f} ms, p99 {percentile(latencies, 0.99) * 1e3:7.2f} ms, "
+              f"{counters['errors']} erreurs")
+
+    if server is not None:
+        print(f"Sessions actives côté serveur : {len(server.sessions)}")
+        await server.close()
+        server.store.close()
+    directory.cleanup()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Générateur de charge pour server.py.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, help="Serveur existant ; par défaut un serveur est lancé dans le processus.")
+    parser.add_argument('--sessions', type=int, nargs='+', default=[1000, 10000])
+    parser.add_argument('--connections', type=int, default=50)
+    parser.add_argument('--duration', type=float, default=10.0)
+    args = parser.parse_args()
+    asyncio.run(main_async(args))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,247 @@
+import argparse
+import io
+import json
+import os
+import platform
+import random
+import string
+import sys
+import tempfile
+import time
+import types
+
+from game_logic import HangmanGame, WordLists
+from hangman_console import HangmanConsole
+from persistence import GameStore
+from solver import FRENCH_LETTER_ORDER
+
+CATEGORY = 'Synthétique'
+
+
+def synthetic_words(count, rng):
+    return [''.join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(4, 14))) for _ in range(count)]
+
+
+def play_round(game):
+    # Guesses in frequency order until the round ends, yielding after each one
+    for letter in FRENCH_LETTER_ORDER:
+        if game.game_is_done:
+            return
+        game.guess_letter(letter)
+        yield letter
+
+
+def bench_guess_letter(env, rounds):
+    game = env.game
+    guesses, elapsed = 0, 0.0
+    for _ in range(rounds):
+        game.start_new_round('1', CATEGORY)
+        start = time.perf_counter()
+        guesses += sum(1 for _ in play_round(game))
+        elapsed += time.perf_counter() - start
+    return guesses, elapsed
+
+
+def bench_check_win(env, rounds):
+    game = env.game
+    game.start_new_round('1', CATEGORY)
+    calls = rounds * 100
+    start = time.perf_counter()
+    for _ in range(calls):
+        game.check_win()
+    return calls, time.perf_counter() - start
+
+
+def bench_start_new_round(env, rounds):
+    game = env.game
+    start = time.perf_counter()
+    for _ in range(rounds):
+        game.start_new_round('1', CATEGORY)
+    return rounds, time.perf_counter() - start
+
+
+def bench_display_board(env, rounds):
+    console = env.console
+    frames, elapsed = 0, 0.0
+    for _ in range(rounds):
+        console.game.start_new_round('1', CATEGORY)
+        console.renderer.stream.seek(0)
+        console.renderer.stream.truncate()
+        for _ in [None, *play_round(console.game)]:
+            start = time.perf_counter()
+            console.display_board()
+            elapsed += time.perf_counter() - start
+            frames += 1
+    return frames, elapsed
+
+
+def bench_update_ui(env, rounds):
+    gui = env.gui
+    updates, elapsed = 0, 0.0
+    for _ in range(rounds):
+        gui.game.start_new_round('1', CATEGORY)
+        for _ in [None, *play_round(gui.game)]:
+            start = time.perf_counter()
+            gui.update_ui()
+            env.paint()
+            elapsed += time.perf_counter() - start
+            updates += 1
+    return updates, elapsed
+
+
+def bench_save_stats(env, rounds):
+    game = env.game
+    start = time.perf_counter()
+    for _ in range(rounds):
+        game.stats['played'] += 1
+        game.save_stats()
+    return rounds, time.perf_counter() - start
+
+
+CASES = {
+    'guess_letter': bench_guess_letter,
+    'check_win': bench_check_win,
+    'start_new_round': bench_start_new_round,
+    'display_board': bench_display_board,
+    'update_ui': bench_update_ui,
+    'save_stats': bench_save_stats,
+}
+
+
+class StubWidget:
+    # Stands in for every Tk widget and variable when there is no display:
+    # any method call is accepted and nothing is drawn.
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: 0
+
+
+def make_gui(game, mode):
+    import tkinter
+    import hangman_gui
+
+    if mode != 'stub':
+        try:
+            root = tkinter.Tk()
+        except tkinter.TclError:
+            if mode == 'tk':
+                raise
+        else:
+            root.withdraw()
+            gui = hangman_gui.HangmanGUI.__new__(hangman_gui.HangmanGUI)
+            gui.root, gui.game = root, game
+            gui.setup_ui() # Dialogs of start_new_game are skipped
+            return gui, root.update_idletasks, 'tk'
+
+    stub_tk = types.SimpleNamespace(**vars(tkinter.constants))
+    for name in ('Frame', 'Label', 'Canvas', 'Button', 'Menu', 'BooleanVar'):
+        setattr(stub_tk, name, StubWidget)
+    hangman_gui.tk = stub_tk
+    gui = hangman_gui.HangmanGUI.__new__(hangman_gui.HangmanGUI)
+    gui.root, gui.game = StubWidget(), game
+    gui.setup_ui()
+    return gui, lambda: None, 'stub'
+
+
+def make_env(directory, words, gui_mode, seed):
+    store = GameStore(os.path.join(directory, 'stats.json'), os.path.join(directory, 'highscore.txt'))
+    game = HangmanGame(rng=random.Random(seed), store=store)
+    game.words = WordLists({CATEGORY: ' '.join(words)})
+    game.set_difficulty('2')
+    game.start_new_round('1', CATEGORY)
+    console = HangmanConsole()
+    console.game = game
+    console.renderer.stream = io.StringIO()
+    gui, paint, gui_backend = make_gui(game, gui_mode)
+    return types.SimpleNamespace(game=game, store=store, console=console, gui=gui, paint=paint,
+                                 gui_backend=gui_backend)
+
+
+def run_suite(args):
+    results = {}
+    gui_backend = None
+    with tempfile.TemporaryDirectory() as directory:
+        for size in args.sizes:
+            words = synthetic_words(size, random.Random(args.seed))
+            for name in args.cases:
+                env = make_env(directory, words, args.gui, args.seed)
+                gui_backend = env.gui_backend
+                best = None
+                for _ in range(args.repeat):
+                    ops, elapsed = CASES[name](env, args.rounds)
+                    per_op = elapsed / ops
+                    best = per_op if best is None else min(best, per_op)
+                env.store.close()
+                if env.gui_backend == 'tk':
+                    env.gui.root.destroy()
+                results[f'{name}[{size}]'] = {'us_per_op': best * 1e6, 'ops': ops}
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'gui_backend': gui_backend,
+        'rounds': args.rounds,
+        'repeat': args.repeat,
+        'results': results,
+    }
+
+
+def compare(report, baseline, threshold):
+    # (case, baseline, current, ratio) for every case present in both
+    regressions = []
+    rows = []
+    for name, current in report['results'].items():
+        previous = baseline['results'].get(name)
+        if previous is None:
+            continue
+        ratio = current['us_per_op'] / previous['us_per_op']
+        rows.append((name, previous['us_per_op'], current['us_per_op'], ratio))
+        if ratio > 1 + threshold:
+            regressions.append(name)
+    return rows, regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Suite de benchmarks du jeu (logique, affichages, statistiques).")
+    parser.add_argument('--cases', nargs='+', choices=list(CASES), default=list(CASES))
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000],
+                        help="Tailles des listes de mots synthétiques.")
+    parser.add_argument('--rounds', type=int, default=200)
+    parser.add_argument('--repeat', type=int, default=5, help="Meilleur temps sur ce nombre de passes.")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--gui', choices=['auto', 'tk', 'stub'], default='auto',
+                        help="Tk réel (affichage requis) ou widgets factices.")
+    parser.add_argument('--output', help="Écrit les résultats JSON dans ce fichier.")
+    parser.add_argument('--baseline', help="Résultats JSON de référence à comparer.")
+    parser.add_argument('--threshold', type=float, default=0.15,
+                        help="Ralentissement toléré avant de signaler une régression (0.15 = 15 %%).")
+    parser.add_argument('--json', action='store_true', help="Résultats JSON sur la sortie standard.")
+    args = parser.parse_args()
+
+    report = run_suite(args)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=4)
+    if args.json:
+        print(json.dumps(report, indent=4))
+    else:
+        print(f"Python {report['python']}, interface graphique : {report['gui_backend']}")
+        for name, result in report['results'].items():
+            print(f"{name:<26} {result['us_per_op']:10.3f} µs/op")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        rows, regressions = compare(report, baseline, args.threshold)
+        out = sys.stderr if args.json else sys.stdout
+        print(f"\nComparaison avec {args.baseline} (seuil +{args.threshold:.0%}) :", file=out)
+        for name, previous, current, ratio in rows:
+            flag = '  RÉGRESSION' if name in regressions else ''
+            print(f"{name:<26} {previous:10.3f} -> {current:10.3f} µs/op  x{ratio:5.2f}{flag}", file=out)
+        if regressions:
+            raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+# The JSON commands of a round, shared by server.py (which adds sessions)
+# and the headless console (hangman_console.py --json):
+#   {"cmd": "new", "mode": "1", "difficulty": "2", "category": "Fruits", "player": "alice"}
+#   {"cmd": "new", "mode": "3", "word": "crapaud"}
+#   {"cmd": "guess", "letter": "e"}
+#   {"cmd": "hint"}
+#   {"cmd": "word", "word": "crapaud"}
+#   {"cmd": "play", "guesses": ["e", "a", "hint", "crapaud"]}
+#   {"cmd": "state"}
+# "play" takes "steps": false for the final state only, without
+# [guess, result, score, lives] per guess. A malformed request raises one of
+# REQUEST_ERRORS, for the caller to answer with an error.
+
+REQUEST_ERRORS = (KeyError, ValueError, TypeError, AttributeError)
+
+
+def request_mode(request):
+    return str(request.get('mode', '1'))
+
+
+def start_round(game, request):
+    # Online words come from game.online_source, set up by the caller
+    return begin_round(game, *prepare_round(game, request))
+
+
+def prepare_round(game, request):
+    # Checks a "new" request and sets the game up for it, without starting
+    # the round: the mode and category are for begin_round
+    game.player = request.get('player') or game.player
+    mode = request_mode(request)
+    game.set_difficulty(str(request.get('difficulty', '2')))
+    category = None
+    if mode == '1':
+        category = request.get('category') or game.rng.choice(game.categories())
+        if category not in game.categories():
+            raise ValueError(f'catégorie {category!r}')
+    elif mode == '3':
+        game.set_player_word(request['word'])
+    elif mode != '2':
+        raise ValueError(f'mode {mode!r}')
+    return mode, category
+
+
+def begin_round(game, mode, category):
+    game.start_new_round(mode, category)
+    game.stats['played'] += 1
+    return {'ok': True, 'state': game.state()}
+
+
+def play(game, request):
+    # The reply, and whether this request ended the round: the caller then
+    # saves it with finish_round, wherever it does its I/O
+    command = request['cmd']
+    if command == 'state':
+        return {'ok': True, 'state': game.state()}, False
+    if not game.secret_word:
+        return {'ok': False, 'error': 'Aucune partie en cours'}, False
+    if game.game_is_done:
+        return {'ok': False, 'error': 'Partie terminée'}, False
+    if command == 'guess':
+        letter = request['letter'].lower()
+        if len(letter) != 1 or not 'a' <= letter <= 'z':
+            raise ValueError(f'lettre {letter!r}')
+        reply = {'result': game.guess_letter(letter)}
+    elif command == 'hint':
+        reply = {'result': game.use_hint()}
+    elif command == 'word':
+        reply = {'result': game.guess_word(request['word'])} # Checked before the round changes
+    elif command == 'play':
+        reply = game.play_guesses(request['guesses'], request.get('steps', True))
+    else:
+        raise ValueError(f'commande {command!r}')
+    if 'state' not in reply:
+        reply['state'] = game.state()
+    return {'ok': True, **reply}, game.game_is_done
+
+
+def finish_round(game, save_stats=True):
+    if game.score > game.highscore:
+        game.highscore = game.score
+        game.store.record_highscore(game.score) # save_highscore would print
+    if save_stats:
+        game.save_stats()
+    game.save_score()
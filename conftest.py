@@ -0,0 +1,2 @@
+# pytest puts this directory on sys.path, so tests/ imports the game's
+# modules as they are, without installing anything.
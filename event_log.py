@@ -0,0 +1,271 @@
+import atexit
+import os
+import random
+import struct
+import threading
+import time
+
+MAGIC = b'HGEV'
+VERSION = 2                           # 2 widens the guess length for whole words
+HEADER = struct.Struct('<4sH')        # magic, version
+RECORD = struct.Struct('<BH')         # record type, payload length
+ROUND = struct.Struct('<QQdcB')       # round id, game id, start time, game mode, max guesses
+GUESS = struct.Struct('<QIBcH')       # round id, ms since round start, result, hint letter, guess length
+GUESS_FORMATS = {1: struct.Struct('<QIBcB'), 2: GUESS}
+STRING = struct.Struct('<H')
+
+ROUND_START = 1
+GUESS_MADE = 2
+
+RESULTS = ('correct', 'incorrect', 'hint_used', 'no_hint')
+RESULT_CODES = {result: code for code, result in enumerate(RESULTS)}
+DONE = 0x80                           # Set on the result of the guess that ended the round
+DIFFICULTY_CHOICES = {8: '1', 6: '2', 4: '3'}
+
+# Round and game ids must not come from a game's rng, or logging would
+# change the words and hints it draws
+ids = random.SystemRandom()
+
+
+def pack_string(text):
+    data = text.encode('utf-8')
+    return STRING.pack(len(data)) + data
+
+
+def unpack_string(payload, offset):
+    length, = STRING.unpack_from(payload, offset)
+    offset += STRING.size
+    return payload[offset:offset + length].decode('utf-8'), offset + length
+
+
+def read_version(f, path):
+    header = f.read(HEADER.size)
+    magic, version = HEADER.unpack(header) if len(header) == HEADER.size else (None, None)
+    if magic != MAGIC or version not in GUESS_FORMATS:
+        raise ValueError(f"{path} n'est pas un journal de parties (version {VERSION})")
+    return version
+
+
+class EventLog:
+    # Append-only binary log of every round and guess. Records are
+    # length-prefixed ("type, length, payload") and accumulate in memory;
+    # they reach the file in one write once buffer_size bytes are pending or
+    # flush_interval seconds have passed, so a guess only pays for a
+    # struct.pack. A crash loses at most that pending buffer, and a record cut
+    # short at the end of the file is ignored by the reader. The server and
+    # the GUI record from worker threads as well, hence the lock. A log
+    # written by an older version keeps its own format.
+    def __init__(self, path, buffer_size=64 * 1024, flush_interval=1.0):
+        self.path = path
+        self.buffer_size = buffer_size
+        self.flush_interval = flush_interval
+        self.lock = threading.Lock()
+        self.buffer = bytearray()
+        self.last_flush = time.monotonic()
+        self.file = open(path, 'ab')
+        self.guess_format = GUESS
+        if self.file.tell() == 0:
+            self.buffer += HEADER.pack(MAGIC, VERSION)
+        else:
+            with open(path, 'rb') as f:
+                self.guess_format = GUESS_FORMATS[read_version(f, path)]
+        atexit.register(self.close)
+
+    def append(self, record_type, payload):
+        with self.lock:
+            self.buffer += RECORD.pack(record_type, len(payload))
+            self.buffer += payload
+            if len(self.buffer) >= self.buffer_size or time.monotonic() - self.last_flush >= self.flush_interval:
+                self.flush_locked()
+
+    def record_round(self, game):
+        if getattr(game, 'event_game_id', None) is None:
+            game.event_game_id = ids.getrandbits(64)
+        round_id = ids.getrandbits(64)
+        started = time.time()
+        game.event_round = (round_id, started)
+        self.append(ROUND_START, ROUND.pack(round_id, game.event_game_id, started, game.game_mode.encode(),
+                                            game.max_guesses)
+                    + pack_string(game.secret_category or '') + pack_string(game.secret_word)
+                    + pack_string(game.secret_display))
+
+    def record_guess(self, game, guess, result, hint_letter=None):
+        round_id, started = game.event_round
+        data = guess.encode('utf-8')
+        code = RESULT_CODES[result] | (DONE if game.game_is_done else 0)
+        elapsed_ms = min(int((time.time() - started) * 1000), 0xFFFFFFFF)
+        self.append(GUESS_MADE, self.guess_format.pack(round_id, elapsed_ms, code, (hint_letter or '\0').encode(), len(data))
+                    + data)
+
+    def flush(self):
+        with self.lock:
+            self.flush_locked()
+
+    def flush_locked(self):
+        if self.buffer:
+            self.file.write(self.buffer)
+            self.file.flush()
+            self.buffer.clear()
+        self.last_flush = time.monotonic()
+
+    def close(self):
+        with self.lock:
+            if not self.file.closed:
+                self.flush_locked()
+                self.file.close()
+
+
+class LoggedRound:
+    def __init__(self, round_id, game_id, started, game_mode, max_guesses, category, secret_word, secret_display):
+        self.id = round_id
+        self.game_id = game_id
+        self.started = started
+        self.game_mode = game_mode
+        self.max_guesses = max_guesses
+        self.category = category
+        self.secret_word = secret_word
+        self.secret_display = secret_display
+        self.guesses = [] # (ms since start, guess, result, hint letter or None)
+        self.done = False
+
+
+def read_records(path, chunk_size=1024 * 1024):
+    # Yields (type, payload) while holding at most one chunk plus one record.
+    # Guesses of older logs come in the current format.
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size < HEADER.size:
+            return
+        old_guess = GUESS_FORMATS[read_version(f, path)]
+        if old_guess is GUESS:
+            old_guess = None
+        data = f.read(chunk_size)
+        offset = 0
+        while True:
+            while offset + RECORD.size <= len(data):
+                record_type, length = RECORD.unpack_from(data, offset)
+                end = offset + RECORD.size + length
+                if end > len(data):
+                    break
+                payload = data[offset + RECORD.size:end]
+                if old_guess is not None and record_type == GUESS_MADE:
+                    payload = GUESS.pack(*old_guess.unpack_from(payload)) + payload[old_guess.size:]
+                yield record_type, payload
+                offset = end
+            chunk = f.read(chunk_size)
+            if not chunk:
+                return # Anything left is a record cut short by a crash
+            data = data[offset:] + chunk
+            offset = 0
+
+
+def read_rounds(path, max_open=100000):
+    # Rounds in the order they finish. Rounds of different games may
+    # interleave, so only the open round of each game is kept in memory; one
+    # left open when its game starts another, or at the end of the log, is
+    # yielded as abandoned (done is False). So is the oldest open round once
+    # more than max_open are, e.g. server sessions that expired mid-round.
+    open_rounds = {}
+    by_game = {}
+    for record_type, payload in read_records(path):
+        if record_type == ROUND_START:
+            round_id, game_id, started, game_mode, max_guesses = ROUND.unpack_from(payload)
+            category, offset = unpack_string(payload, ROUND.size)
+            secret_word, offset = unpack_string(payload, offset)
+            secret_display, offset = unpack_string(payload, offset)
+            previous = by_game.pop(game_id, None)
+            if previous is not None and open_rounds.pop(previous.id, None) is not None:
+                yield previous
+            logged = LoggedRound(round_id, game_id, started, game_mode.decode(), max_guesses, category,
+                                 secret_word, secret_display)
+            open_rounds[round_id] = logged
+            by_game[game_id] = logged
+            if len(open_rounds) > max_open:
+                oldest = open_rounds.pop(next(iter(open_rounds)))
+                if by_game.get(oldest.game_id) is oldest:
+                    del by_game[oldest.game_id]
+                yield oldest
+        elif record_type == GUESS_MADE:
+            round_id, elapsed_ms, code, hint_letter, length = GUESS.unpack_from(payload)
+            logged = open_rounds.get(round_id)
+            if logged is None:
+                continue # Its round started in a part of the log that was lost
+            guess = payload[GUESS.size:GUESS.size + length].decode('utf-8')
+            hint_letter = hint_letter.decode() if hint_letter != b'\0' else None
+            logged.guesses.append((elapsed_ms, guess, RESULTS[code & ~DONE], hint_letter))
+            if code & DONE:
+                logged.done = True
+                del open_rounds[round_id]
+                if by_game.get(logged.game_id) is logged:
+                    del by_game[logged.game_id]
+                yield logged
+    yield from open_rounds.values()
+
+
+def replay_round(logged, game=None):
+    # Plays the round again through HangmanGame, with the logged hint letters
+    # instead of random ones, and checks every result against the log.
+    if game is None:
+        from game_logic import HangmanGame
+        game = HangmanGame()
+        game.stats = {'played': 0, 'wins': 0, 'losses': 0} # Never the player's own stats
+        game.highscore = 0
+    choice = DIFFICULTY_CHOICES.get(logged.max_guesses)
+    if choice:
+        game.set_difficulty(choice)
+    else:
+        game.max_guesses = logged.max_guesses
+    game.secret_word = logged.secret_word
+    game.secret_display = logged.secret_display
+    game.secret_category = logged.category
+    event_log, game.event_log = game.event_log, None
+    try:
+        game.start_new_round('3') # Keeps the word set above
+        game.game_mode = logged.game_mode
+        for _, guess, result, hint_letter in logged.guesses:
+            replayed = game.use_hint(hint_letter) if guess == 'hint' else game.guess(guess)
+            if replayed != result:
+                raise ValueError(f"partie {logged.id:016x} : {guess!r} donne {replayed!r} au lieu de {result!r}")
+    finally:
+        game.event_log = event_log
+    if game.game_is_done != logged.done:
+        raise ValueError(f"partie {logged.id:016x} : fin de partie différente du journal")
+    return game
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Lit ou rejoue un journal de parties.")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    show = subparsers.add_parser('show', help="Affiche les parties du journal.")
+    show.add_argument('log')
+    show.add_argument('--limit', type=int, default=20)
+    replay = subparsers.add_parser('replay', help="Rejoue toutes les parties et vérifie les résultats.")
+    replay.add_argument('log')
+    for subparser in (show, replay):
+        subparser.add_argument('--max-open', type=int, default=100000,
+                               help="Parties en cours gardées en mémoire au plus.")
+    args = parser.parse_args()
+
+    if args.command == 'show':
+        for index, logged in enumerate(read_rounds(args.log, args.max_open)):
+            if index >= args.limit:
+                break
+            guesses = ' '.join(guess if not hint else f'{guess}:{hint}' for _, guess, _, hint in logged.guesses)
+            status = 'terminée' if logged.done else 'abandonnée'
+            print(f"{time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(logged.started))} "
+                  f"{logged.category:<12} {logged.secret_display:<16} {status:<10} {guesses}")
+    else:
+        start = time.perf_counter()
+        rounds = guesses = 0
+        game = None
+        for logged in read_rounds(args.log, args.max_open):
+            game = replay_round(logged, game)
+            rounds += 1
+            guesses += len(logged.guesses)
+        elapsed = time.perf_counter() - start
+        print(f"{rounds} parties et {guesses} coups rejoués sans écart en {elapsed:.2f} s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,43 @@
+import sys
+
+CLEAR_SCREEN = '\x1b[H\x1b[2J'
+CLEAR_LINE_END = '\x1b[K'
+CLEAR_BELOW = '\x1b[J'
+
+
+def move_to(row):
+    return f'\x1b[{row};1H'
+
+
+class FrameRenderer:
+    # Keeps the last frame drawn from the top of the screen and, for the next
+    # one, only rewrites the lines that changed, in a single write. Whatever
+    # was printed below the frame (prompts, messages) is cleared each time.
+    def __init__(self, stream=None):
+        self.stream = stream
+        self.lines = None
+
+    def invalidate(self):
+        self.lines = None
+
+    def clear(self):
+        self.write(CLEAR_SCREEN)
+        self.lines = []
+
+    def render(self, lines):
+        previous = self.lines
+        parts = []
+        if previous is None:
+            parts.append(CLEAR_SCREEN)
+            previous = []
+        for row, line in enumerate(lines):
+            if row >= len(previous) or line != previous[row]:
+                parts.append(move_to(row + 1) + line + CLEAR_LINE_END)
+        parts.append(move_to(len(lines) + 1) + CLEAR_BELOW)
+        self.lines = list(lines)
+        self.write(''.join(parts))
+
+    def write(self, data):
+        stream = self.stream or sys.stdout
+        stream.write(data)
+        stream.flush()
@@ -1,134 +1,296 @@
 import random
-import os
-import json
-import sys
-import time
-import getpass
-import requests
-
-try:
-    from colorama import Fore, Style, init
-    init(autoreset=True)
-except ImportError:
-    class Dummy:
-        def __getattr__(self, name): return ""
-    Fore, Style = Dummy(), Dummy()
-
-HIGHSCORE_FILE = 'highscore.txt'
-STATS_FILE = 'stats.json'
+from collections.abc import Mapping
+from wordpack import ALLOWED_SYMBOLS, MAX_WORD_LENGTH, WordPack, is_playable, normalize_word
+from persistence import GameStore, HIGHSCORE_FILE, STATS_FILE
 
-class HangmanGame:
-    def __init__(self):
-        self.hangman_pics = [
-            '''
+ALPHABET = 'abcdefghijklmnopqrstuvwxyz'
+LETTER_BITS = {letter: 1 << i for i, letter in enumerate(ALPHABET)}
+LETTER_INDEX = {letter: i for i, letter in enumerate(ALPHABET)}
+LETTERS = frozenset(LETTER_BITS)
+NO_POSITIONS = (0,) * len(ALPHABET) # Position table of a game whose first round has not started
+# Per letter, maps its byte to '1' and any other to '0', so that a reversed
+# word read in base 2 gives the letter's positions as a bitmask
+POSITION_TABLES = [bytes(ord('1') if byte == ord(letter) else ord('0') for byte in range(256)) for letter in ALPHABET]
+
+
+def check_guess(guess):
+    # A letter, 'hint' or a whole word, lowercased; ValueError for anything else
+    guess = guess.lower()
+    if guess == 'hint' or guess in LETTER_BITS:
+        return guess
+    return check_word(guess)
+
+
+def check_word(word):
+    # A whole word only: never a single character or 'hint', which a replay
+    # would take for a letter guess or a hint request
+    if len(word) > MAX_WORD_LENGTH:
+        raise ValueError(f'mot de plus de {MAX_WORD_LENGTH} lettres')
+    word = word.lower()
+    if len(word) > 1 and word != 'hint' and all(c in LETTER_BITS or c in ALLOWED_SYMBOLS for c in normalize_word(word)):
+        return word
+    raise ValueError(f'mot {word!r}')
+
+
+def load_colors():
+    # colorama is only imported once something actually prints in colour
+    global Fore, Style
+    if 'Fore' in globals():
+        return Fore, Style
+    try:
+        from colorama import Fore, Style, init
+        init(autoreset=True)
+    except ImportError:
+        class Dummy:
+            def __getattr__(self, name): return ""
+        Fore, Style = Dummy(), Dummy()
+    return Fore, Style
+
+
+def __getattr__(name):
+    if name in ('Fore', 'Style'):
+        return load_colors()[name == 'Style']
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+class WordLists(Mapping):
+    # Category -> word list, each list split from its source string on first
+    # use. Games playing the same lists share them, and the word selector and
+    # solver indexes built from them.
+    def __init__(self, sources):
+        self.sources = sources
+        self.lists = {}
+        self.word_selector = None
+        self.indexes = {}
+
+    def selector(self):
+        if self.word_selector is None:
+            from word_selector import WordSelector
+            self.word_selector = WordSelector(self)
+        return self.word_selector
+
+    def __getitem__(self, category):
+        words = self.lists.get(category)
+        if words is None:
+            words = self.lists[category] = self.sources[category].split()
+        return words
+
+    def __iter__(self):
+        return iter(self.sources)
+
+    def __len__(self):
+        return len(self.sources)
+
+
+HANGMAN_PICS = (
+    '''
                +---+
                    |
                    |
                    |
                   ===''', 
-            '''
+    '''
                +---+
                O   |
                    |
                    |
                   ===''', 
-            '''
+    '''
                +---+
                O   |
                |   |
                    |
                   ===''', 
-            '''
+    '''
                +---+
                O   |
               /|   |
                    |
                   ===''', 
-            '''
+    '''
                +---+
                O   |
               /|\  |
                    |
                   ===''', 
-            '''
+    '''
                +---+
                O   |
               /|\  |
               /    |
                   ===''', 
-            '''
+    '''
                +---+
                O   |
               /|\  |
               / \  |
                   ==='''
-        ]
-        self.words = {
-            'Animaux': 'fourmi babouin blaireau chauve-souris ours castor chameau chat palourde cobra couguar coyote corbeau cerf chien âne canard aigle furet renard grenouille chèvre oie faucon lion lézard lama taupe singe orignal souris mulet triton loutre hibou panda perroquet pigeon python lapin bélier rat corbeau rhinocéros saumon phoque requin mouton mouffette paresseux serpent araignée cigogne cygne tigre crapaud truite dinde tortue belette baleine loup wombat zèbre'.split(),
-            'Fruits': 'pomme banane orange fraise raisin ananas mangue myrtille framboise pastèque cerise pêche poire prune citron vert'.split(),
-            'Pays': 'france allemagne italie espagne portugal belgique suisse autriche pologne russie chine japon inde brésil argentine canada mexique égypte nigéria australie'.split()
-        }
+)
+
+WORDS = WordLists({
+    'Animaux': 'fourmi babouin blaireau chauve-souris ours castor chameau chat palourde cobra couguar coyote corbeau cerf chien âne canard aigle furet renard grenouille chèvre oie faucon lion lézard lama taupe singe orignal souris mulet triton loutre hibou panda perroquet pigeon python lapin bélier rat corbeau rhinocéros saumon phoque requin mouton mouffette paresseux serpent araignée cigogne cygne tigre crapaud truite dinde tortue belette baleine loup wombat zèbre',
+    'Fruits': 'pomme banane orange fraise raisin ananas mangue myrtille framboise pastèque cerise pêche poire prune citron vert',
+    'Pays': 'france allemagne italie espagne portugal belgique suisse autriche pologne russie chine japon inde brésil argentine canada mexique égypte nigéria australie'
+})
+
+
+shared_store = None
+
+
+def default_store():
+    # One handle on the stats files for every game not given its own
+    global shared_store
+    if shared_store is None:
+        shared_store = GameStore()
+    return shared_store
+
+
+class HangmanGame:
+    # One player's state only: word lists, gallows art and the persistence
+    # handle are shared, so a server can keep many games for a few hundred
+    # bytes each.
+    __slots__ = (
+        'game_mode', 'missed_letters', 'missed_words', 'correct_letters', 'secret_word', 'secret_display', 'secret_category',
+        'word_mask', 'position_masks', 'guessed_mask', 'remaining_mask', 'remaining_letters',
+        'game_is_done', 'score', 'store', '_highscore', '_stats', 'saved_stats', 'difficulty', 'max_guesses',
+        'hint_used', 'rng', 'words', 'recent_words', 'solver_session', 'online_source', 'word_pack',
+        'event_log', 'event_game_id', 'event_round', 'leaderboard', 'player',
+    )
+    hangman_pics = HANGMAN_PICS
+
+    def __init__(self, rng=None, word_pack=None, store=None, event_log=None, leaderboard=None, player=None):
+        self.words = WORDS
         self.game_mode = ''
         self.missed_letters = ''
+        self.missed_words = ()
         self.correct_letters = ''
         self.secret_word = ''
+        self.secret_display = ''
         self.secret_category = ''
+        self.word_mask = 0
+        self.position_masks = NO_POSITIONS
+        self.guessed_mask = 0
+        self.remaining_mask = 0
+        self.remaining_letters = 0
         self.game_is_done = False
         self.score = 0
-        self.highscore = self.load_highscore()
-        self.stats = self.load_stats()
+        self.store = store or default_store()
+        self._highscore = None # Both read from disk on first access
+        self._stats = None
+        self.saved_stats = {}
         self.difficulty = 'Moyen'
         self.max_guesses = 6
         self.hint_used = False
+        self.rng = rng or random # The module's generator unless the game needs its own sequence
+        self.recent_words = None
+        self.solver_session = None
+        self.online_source = None
+        self.word_pack = WordPack(word_pack) if isinstance(word_pack, str) else word_pack
+        self.event_log = event_log
+        self.event_game_id = None
+        self.event_round = None
+        self.leaderboard = leaderboard
+        self.player = player
+
+    @property
+    def highscore(self):
+        if self._highscore is None:
+            self._highscore = self.load_highscore()
+        return self._highscore
+
+    @highscore.setter
+    def highscore(self, value):
+        self._highscore = value
+
+    @property
+    def stats(self):
+        if self._stats is None:
+            self._stats = self.load_stats()
+        return self._stats
+
+    @stats.setter
+    def stats(self, value):
+        self._stats = value
+        self.saved_stats = dict(value) # Counts given from outside are the baseline, not unsaved changes
 
     def load_highscore(self):
-        if os.path.exists(HIGHSCORE_FILE):
-            with open(HIGHSCORE_FILE, 'r') as f:
-                try: return int(f.read())
-                except (ValueError, TypeError): return 0
-        return 0
+        return self.store.load_highscore()
 
     def save_highscore(self):
         if self.score > self.highscore:
+            Fore, Style = load_colors()
             print(f"{Fore.YELLOW}Nouveau meilleur score ! {self.score}{Style.RESET_ALL}")
             self.highscore = self.score
-            with open(HIGHSCORE_FILE, 'w') as f:
-                f.write(str(self.highscore))
+            self.store.record_highscore(self.highscore)
 
     def load_stats(self):
-        if os.path.exists(STATS_FILE):
-            with open(STATS_FILE, 'r') as f:
-                try: return json.load(f)
-                except json.JSONDecodeError: return {'played': 0, 'wins': 0, 'losses': 0}
-        return {'played': 0, 'wins': 0, 'losses': 0}
+        stats = self.store.load_stats()
+        self.saved_stats = dict(stats)
+        return stats
 
     def save_stats(self):
-        with open(STATS_FILE, 'w') as f:
-            json.dump(self.stats, f, indent=4)
+        self.store.record_stats(self.stats_delta())
+
+    def stats_delta(self):
+        # Only what changed since the last save goes to the log, so counters
+        # from other running games are added to rather than overwritten.
+        delta = self.unsaved_stats()
+        self.saved_stats = dict(self.stats)
+        return delta
+
+    def unsaved_stats(self):
+        if self._stats is None: # Never loaded, so never changed
+            return {}
+        return {key: self._stats[key] - self.saved_stats.get(key, 0) for key in self._stats}
+
+    def save_score(self):
+        if self.leaderboard is not None:
+            self.leaderboard.record(*self.score_entry())
+
+    def score_entry(self):
+        return self.player, self.score, self.difficulty, self.secret_category, self.remaining_letters == 0
 
     def get_random_word(self, word_list):
-        return random.choice(word_list)
+        return self.rng.choice(word_list)
+
+    def categories(self):
+        return self.word_pack.categories() if self.word_pack else list(self.words.keys())
+
+    def choose_local_word(self, category):
+        self.secret_category = category
+        if self.word_pack:
+            self.secret_display, self.secret_word = self.word_pack.random_word(category, rng=self.rng)
+        else:
+            if self.recent_words is None:
+                from word_selector import RecentWords
+                self.recent_words = RecentWords()
+            self.secret_display = self.words.selector().pick(category, self.difficulty, self.recent_words, self.rng)
+            self.secret_word = normalize_word(self.secret_display)
+
+    def prefetch_online_words(self):
+        if self.online_source is None:
+            from word_source import OnlineWordSource # Keeps requests out of local-only games
+            # Its own generator: its thread draws backoff jitter at network pace,
+            # which must not shift the game's sequence
+            self.online_source = OnlineWordSource().start()
+        return self.online_source
 
     def fetch_online_word(self):
-        try:
-            print(f"{Fore.CYAN}Récupération d'un mot en ligne...{Style.RESET_ALL}")
-            response = requests.get("https://random-word-api.herokuapp.com/word?lang=fr&number=1")
-            response.raise_for_status()
-            word = response.json()[0].lower()
-            if all('a' <= c <= 'z' for c in word):
-                self.secret_word = word
-                self.secret_category = 'En Ligne'
-                return True
-        except requests.exceptions.RequestException as e:
-            print(f"{Fore.RED}Erreur réseau : {e}. Utilisation des mots locaux.{Style.RESET_ALL}")
-        except (ValueError, IndexError):
-            print(f"{Fore.RED}Erreur de l'API. Utilisation des mots locaux.{Style.RESET_ALL}")
-        
-        time.sleep(2)
+        word = self.prefetch_online_words().get_word()
+        if word:
+            self.secret_word = self.secret_display = word
+            self.secret_category = 'En Ligne'
+            return True
+        Fore, Style = load_colors()
+        print(f"{Fore.RED}Aucun mot en ligne disponible. Utilisation des mots locaux.{Style.RESET_ALL}")
         return False
 
     def set_player_word(self, word):
-        self.secret_word = word.lower()
+        secret_word = normalize_word(word)
+        if not is_playable(secret_word, max_length=None):
+            raise ValueError(f'mot {word!r}')
+        self.secret_display = word.lower()
+        self.secret_word = secret_word
         self.secret_category = 'Deux Joueurs'
 
     def set_difficulty(self, choice):
@@ -144,59 +306,214 @@ class HangmanGame:
 
     def start_new_round(self, game_mode, category=None):
         self.missed_letters = ''
+        self.missed_words = ()
         self.correct_letters = ''
+        self.guessed_mask = 0
+        self.remaining_mask = 0
+        self.solver_session = None
         self.game_is_done = False
         self.hint_used = False
         self.score = 0
         self.game_mode = game_mode
 
         if self.game_mode == '1': # Local
-            self.secret_category = category
-            self.secret_word = self.get_random_word(self.words[self.secret_category])
+            self.choose_local_word(category)
         elif self.game_mode == '2': # Online
             if not self.fetch_online_word():
-                # Fallback to local words
-                self.secret_category = 'Animaux' # Default category
-                self.secret_word = self.get_random_word(self.words[self.secret_category])
+                # Fallback to local words, 'Animaux' unless a word pack lacks it
+                categories = self.categories()
+                self.choose_local_word('Animaux' if 'Animaux' in categories else categories[0])
         # Mode 3 (Two Player) is handled by set_player_word
+        self.index_secret_word()
+        if self.event_log is not None:
+            self.event_log.record_round(self)
+
+    def index_secret_word(self):
+        # The word's letters as a bitmask and a 26-entry table of position
+        # bitmasks, built once per round so that guesses, hints, the solver
+        # and win detection never rescan the secret word. Absent letters
+        # share the cached 0, so a round costs one tuple and a few ints.
+        word = self.secret_word
+        for letter in dict.fromkeys(word):
+            bit = LETTER_BITS.get(letter)
+            if bit is None: # Hyphens, apostrophes... are shown from the start
+                self.correct_letters += letter
+            else:
+                self.remaining_mask |= bit
+        masks = list(NO_POSITIONS)
+        if len(word) <= MAX_WORD_LENGTH:
+            for position, letter in enumerate(word):
+                index = LETTER_INDEX.get(letter)
+                if index is not None:
+                    masks[index] |= 1 << position
+        else: # Long two-player words: one pass in C per letter
+            reversed_word = word[::-1].encode('ascii', 'replace') # One byte per character
+            for letter in self.hidden_letters():
+                index = LETTER_INDEX[letter]
+                masks[index] = int(reversed_word.translate(POSITION_TABLES[index]), 2)
+        self.word_mask = self.remaining_mask
+        self.position_masks = tuple(masks)
+        self.remaining_letters = self.remaining_mask.bit_count()
+
+    def hidden_letters(self):
+        return [letter for letter in ALPHABET if self.remaining_mask & LETTER_BITS[letter]]
+
+    def letter_positions(self, letter):
+        mask = self.position_masks[LETTER_INDEX[letter]]
+        positions = []
+        while mask:
+            low = mask & -mask
+            positions.append(low.bit_length() - 1)
+            mask ^= low
+        return positions
+
+    def reveal_letter(self, letter):
+        bit = LETTER_BITS[letter]
+        self.guessed_mask |= bit
+        if not self.remaining_mask & bit:
+            return False
+        self.remaining_mask &= ~bit
+        self.remaining_letters -= 1
+        self.correct_letters += letter
+        if self.solver_session is not None:
+            self.solver_session.update(letter, self.letter_positions(letter))
+        return True
 
     def guess_letter(self, guess):
         if guess == 'hint':
             return self.use_hint()
-        
-        if guess in self.secret_word:
-            if guess not in self.correct_letters:
-                self.correct_letters += guess
+
+        if LETTER_BITS.get(guess, 0) & self.word_mask:
+            if self.reveal_letter(guess):
                 self.score += 10
                 self.check_win()
-            return 'correct'
+            result = 'correct'
         else:
             if guess not in self.missed_letters:
+                self.guessed_mask |= LETTER_BITS.get(guess, 0)
                 self.missed_letters += guess
+                if self.solver_session is not None:
+                    self.solver_session.update(guess, ())
                 self.check_loss()
-            return 'incorrect'
-
-    def use_hint(self):
-        if self.hint_used or self.score < 50:
-            return 'no_hint'
-        
-        self.score -= 50
-        self.hint_used = True
-        unguessed_letters = [letter for letter in self.secret_word if letter not in self.correct_letters]
-        if unguessed_letters:
-            hint_letter = random.choice(unguessed_letters)
-            self.correct_letters += hint_letter
+            result = 'incorrect'
+        if self.event_log is not None:
+            self.event_log.record_guess(self, guess, result)
+        return result
+
+    def normalized_words(self, category=None):
+        categories = [category] if category else self.categories()
+        for category in categories:
+            if self.word_pack:
+                yield from (normalized for _, normalized in self.word_pack.iter_words(category))
+            else:
+                yield from (normalize_word(word) for word in self.words[category])
+
+    def suggest_letter(self, rank='frequency'):
+        if self.solver_session is None:
+            # Candidates are the round's category, or every local word otherwise
+            key = self.secret_category if self.secret_category in self.categories() else None
+            indexes = (self.word_pack or self.words).indexes
+            if key not in indexes:
+                from solver import WordIndex
+                indexes[key] = WordIndex(self.normalized_words(key))
+            self.solver_session = indexes[key].session(len(self.secret_word))
+            for letter in self.correct_letters:
+                self.solver_session.update(letter, self.letter_positions(letter))
+            for letter in self.missed_letters:
+                self.solver_session.update(letter, ())
+        return self.solver_session.best_letter(rank)
+
+    def use_hint(self, hint_letter=None):
+        # hint_letter forces the revealed letter, for replays
+        result = 'no_hint'
+        if not self.hint_used and self.score >= 50:
+            self.score -= 50
+            self.hint_used = True
+            if self.remaining_letters:
+                if hint_letter is None:
+                    # Weighted by occurrences, like picking a random hidden position
+                    unguessed_letters = self.hidden_letters()
+                    weights = [self.position_masks[LETTER_INDEX[letter]].bit_count() for letter in unguessed_letters]
+                    hint_letter = self.rng.choices(unguessed_letters, weights)[0]
+                self.reveal_letter(hint_letter)
+                self.check_win()
+                result = 'hint_used'
+        if self.event_log is not None:
+            self.event_log.record_guess(self, 'hint', result, hint_letter if result == 'hint_used' else None)
+        return result
+
+    def guess_word(self, word):
+        # The whole word at once: right, it reveals the letters still hidden
+        # and scores them as if guessed one by one; wrong, it costs a life
+        # like a missed letter.
+        guess = normalize_word(check_word(word))
+        if guess == self.secret_word:
+            for letter in self.hidden_letters():
+                self.reveal_letter(letter)
+                self.score += 10
             self.check_win()
-            return 'hint_used'
-        return 'no_hint'
+            result = 'correct'
+        else:
+            if guess not in self.missed_words:
+                self.missed_words += (guess,)
+                self.check_loss()
+            result = 'incorrect'
+        if self.event_log is not None:
+            self.event_log.record_guess(self, guess, result)
+        return result
+
+    def guess(self, guess):
+        # A letter, 'hint' or a whole word
+        if len(guess) > 1 and guess != 'hint':
+            return self.guess_word(guess)
+        return self.guess_letter(guess)
+
+    def play_guesses(self, guesses, steps=True):
+        # Several guesses in one call, e.g. from a bot, played in order until
+        # the round ends. All are checked first, so an invalid one plays none.
+        # With steps, each played guess as (guess, result, score, lives).
+        if not LETTERS.issuperset(guesses): # Letters only need no further check
+            guesses = [check_guess(guess) for guess in guesses]
+        guess_letter, guess_word = self.guess_letter, self.guess_word
+        played = []
+        for guess in guesses:
+            if self.game_is_done:
+                break
+            result = guess_letter(guess) if len(guess) == 1 or guess == 'hint' else guess_word(guess)
+            if steps:
+                played.append((guess, result, self.score, self.max_guesses - self.misses))
+        reply = {'state': self.state()}
+        if steps:
+            reply['steps'] = played
+        return reply
+
+    @property
+    def misses(self):
+        return len(self.missed_letters) + len(self.missed_words)
+
+    def state(self):
+        state = {
+            'pattern': ''.join(c if c in self.correct_letters else '_' for c in self.secret_word),
+            'category': self.secret_category,
+            'difficulty': self.difficulty,
+            'missed': self.missed_letters,
+            'missed_words': list(self.missed_words),
+            'lives': self.max_guesses - self.misses,
+            'score': self.score,
+            'done': self.game_is_done,
+        }
+        if self.game_is_done:
+            state['won'] = self.remaining_letters == 0
+            state['word'] = self.secret_display
+        return state
 
     def check_win(self):
-        if all(c in self.correct_letters for c in self.secret_word):
+        if self.remaining_letters == 0:
             self.score += 100
             self.stats['wins'] += 1
             self.game_is_done = True
 
     def check_loss(self):
-        if len(self.missed_letters) >= self.max_guesses:
+        if self.misses >= self.max_guesses:
             self.stats['losses'] += 1
             self.game_is_done = True
@@ -1,12 +1,25 @@
+import argparse
+import contextlib
+import json
 import os
 import sys
 import time
 import getpass
-from game_logic import HangmanGame, Fore, Style
+import commands
+from game_logic import HangmanGame, Fore, Style, check_word
+from frame_renderer import FrameRenderer
+
+encode_reply = json.JSONEncoder(separators=(',', ':')).encode
 
 class HangmanConsole:
-    def __init__(self):
-        self.game = HangmanGame()
+    def __init__(self, word_pack=None, event_log=None, leaderboard=None, player=None, save_file=None):
+        self.game = HangmanGame(word_pack=word_pack, event_log=event_log, leaderboard=leaderboard, player=player)
+        self.save_file = save_file # Where an interrupted round waits for the next launch
+        self.renderer = FrameRenderer()
+        # Each gallows stage as ready-to-draw lines, coloured line by line so
+        # that any single line can be redrawn on its own.
+        self.gallows_frames = [[f'{Fore.YELLOW}{line}{Style.RESET_ALL}' for line in pic.split('\n')]
+                               for pic in self.game.hangman_pics]
 
     def play(self):
         self.clear_screen()
@@ -18,73 +31,165 @@ class HangmanConsole:
         self.play_animation(welcome_frames, 0.3)
         time.sleep(1)
         
+        resumed = self.resume_round()
         while True:
-            game_mode = self.choose_game_mode()
-            difficulty = self.choose_difficulty()
-            self.game.set_difficulty(difficulty)
-
-            if game_mode == '1': # Local
-                category = self.choose_category()
-                self.game.start_new_round(game_mode, category)
-            elif game_mode == '2': # Online
-                self.game.start_new_round(game_mode)
-            elif game_mode == '3': # Two Player
-                self.get_player_word()
-                self.game.start_new_round(game_mode)
-
-            self.game.stats['played'] += 1
-            while not self.game.game_is_done:
-                self.display_board()
-                guess = self.get_guess()
-                result = self.game.guess_letter(guess)
-                if result == 'incorrect':
-                    print('\a', end='') # Bell sound
-                elif result == 'no_hint':
-                    print(f"{Fore.YELLOW}Indice non disponible.{Style.RESET_ALL}")
-                    time.sleep(2)
-                elif result == 'hint_used':
-                    print(f"{Fore.CYAN}Indice utilisé!{Style.RESET_ALL}")
-                    time.sleep(2)
+            if not resumed:
+                self.start_round()
+            resumed = False
+            try:
+                self.play_round()
+            except (KeyboardInterrupt, EOFError):
+                self.suspend_round()
+                raise
 
             self.display_board() # Show final state
             if self.game.score > self.game.highscore:
                 self.game.save_highscore()
 
             self.game.save_stats()
+            self.game.save_score()
+            self.show_leaderboard()
 
             if not self.play_again():
                 print(f"{Fore.CYAN}Merci d'avoir joué! À bientôt!{Style.RESET_ALL}")
                 break
 
-    def display_board(self):
+    def start_round(self):
+        game_mode = self.choose_game_mode()
+        if game_mode == '2':
+            self.game.prefetch_online_words() # Fills while the player picks a difficulty
+        difficulty = self.choose_difficulty()
+        self.game.set_difficulty(difficulty)
+
+        if game_mode == '1': # Local
+            category = self.choose_category()
+            self.game.start_new_round(game_mode, category)
+        elif game_mode == '2': # Online
+            self.game.start_new_round(game_mode)
+        elif game_mode == '3': # Two Player
+            self.get_player_word()
+            self.game.start_new_round(game_mode)
+
+        self.game.stats['played'] += 1
+
+    def play_round(self):
+        while not self.game.game_is_done:
+            self.display_board()
+            guess = self.get_guess()
+            result = self.game.guess(guess)
+            if result == 'incorrect':
+                print('\a', end='') # Bell sound
+            elif result == 'no_hint':
+                print(f"{Fore.YELLOW}Indice non disponible.{Style.RESET_ALL}")
+                time.sleep(2)
+            elif result == 'hint_used':
+                print(f"{Fore.CYAN}Indice utilisé!{Style.RESET_ALL}")
+                time.sleep(2)
+
+    def drive(self, stdin=None, stdout=None, batch_size=65536):
+        # Headless mode: one JSON command per line in, one JSON reply per line
+        # out, with no prompt, pause, animation or colour. Commands are those
+        # of commands.py, as on the server but without sessions. Input is
+        # handled as it arrives, up to batch_size bytes at a time, and each
+        # batch's replies are written together; stats are saved once per
+        # batch rather than per round.
+        stdin = stdin or sys.stdin.buffer
+        stdout = stdout or sys.stdout.buffer
+        with contextlib.redirect_stdout(sys.stderr): # Messages from the game stay out of the replies
+            for lines in read_batches(stdin, batch_size):
+                replies = [encode_reply(self.drive_line(line)) for line in lines]
+                if replies:
+                    stdout.write(('\n'.join(replies) + '\n').encode())
+                    stdout.flush()
+                self.game.save_stats()
+
+    def drive_line(self, line):
+        try:
+            request = json.loads(line)
+        except json.JSONDecodeError:
+            return {'ok': False, 'error': 'JSON invalide'}
+        response = {'id': request.get('id')} if isinstance(request, dict) else {}
+        try:
+            response.update(self.drive_command(request))
+        except commands.REQUEST_ERRORS as e:
+            response.update(ok=False, error=f'Requête invalide : {e}')
+        return response
+
+    def drive_command(self, request):
+        if request['cmd'] == 'new':
+            return commands.start_round(self.game, request)
+        reply, finished = commands.play(self.game, request)
+        if finished:
+            commands.finish_round(self.game, save_stats=False) # Saved with the batch
+        return reply
+
+    def suspend_round(self):
+        if self.save_file and self.game.secret_word and not self.game.game_is_done:
+            import snapshot
+            snapshot.save(self.game, self.save_file)
+            print(f"\n{Fore.CYAN}Partie sauvegardée, elle reprendra au prochain lancement.{Style.RESET_ALL}", end='')
+
+    def resume_round(self):
+        if not self.save_file or not os.path.exists(self.save_file):
+            return False
+        import snapshot
+        with open(self.save_file, 'rb') as f:
+            data = f.read()
         self.clear_screen()
+        print('Reprendre la partie interrompue? (oui ou non)')
+        answer = input('> ').lower()
+        os.remove(self.save_file) # Resumed or declined, never offered twice
+        if not answer.startswith('o'):
+            return False
+        try:
+            snapshot.loads(data, self.game)
+        except ValueError as e:
+            print(f"{Fore.RED}Sauvegarde illisible : {e}{Style.RESET_ALL}")
+            return False
+        return True
+
+    def display_board(self):
+        self.renderer.render(self.board_lines())
+
+    def board_lines(self):
         border = f"{Fore.BLUE}{'=' * 70}{Style.RESET_ALL}"
-        print(border)
         stats_line = f"{Fore.CYAN}Parties: {self.game.stats['played']} | Victoires: {self.game.stats['wins']} | Défaites: {self.game.stats['losses']}{Style.RESET_ALL}"
         header = f"{Fore.CYAN}Score: {self.game.score}  |  Meilleur Score: {self.game.highscore}  |  Difficulté: {self.game.difficulty}{Style.RESET_ALL}"
-        print(stats_line.center(78))
-        print(header.center(78))
-        print(border)
-
-        print(Fore.YELLOW + self.game.hangman_pics[min(len(self.game.missed_letters), self.game.max_guesses - 1)])
-        print(f'La catégorie est : {Fore.MAGENTA}{self.game.secret_category}{Style.RESET_ALL}')
-        print(f'{Fore.RED}Lettres manquées:', ' '.join(self.game.missed_letters))
-        print()
-        blanks = ''.join([f'{Fore.GREEN}{c}{Style.RESET_ALL} ' if c in self.game.correct_letters else '_ ' for c in self.game.secret_word])
-        print(blanks)
-        print(border)
+        lines = [border, stats_line.center(78), header.center(78), border]
+
+        # Facile allows more misses than there are drawings: stay on the last one
+        lines += self.gallows_frames[min(self.game.misses, self.game.max_guesses - 1, len(self.gallows_frames) - 1)]
+        lines.append(f'La catégorie est : {Fore.MAGENTA}{self.game.secret_category}{Style.RESET_ALL}')
+        lines.append(f"{Fore.RED}Lettres manquées: {' '.join(self.game.missed_letters)}{Style.RESET_ALL}")
+        if self.game.missed_words:
+            lines.append(f"{Fore.RED}Mots manqués: {', '.join(self.game.missed_words)}{Style.RESET_ALL}")
+        lines.append('')
+        lines.append(''.join([f'{Fore.GREEN}{c}{Style.RESET_ALL} ' if c in self.game.correct_letters else '_ ' for c in self.game.secret_word]))
+        lines.append(border)
         if self.game.game_is_done:
-            if len(self.game.missed_letters) >= self.game.max_guesses:
-                print(f'{Fore.RED}Vous avez perdu! Le mot était "{self.game.secret_word}".{Style.RESET_ALL}')
+            if self.game.misses >= self.game.max_guesses:
+                lines.append(f'{Fore.RED}Vous avez perdu! Le mot était "{self.game.secret_display}".{Style.RESET_ALL}')
             else:
-                print(f'{Fore.GREEN}Gagné! Le mot était "{self.game.secret_word}"{Style.RESET_ALL}')
+                lines.append(f'{Fore.GREEN}Gagné! Le mot était "{self.game.secret_display}"{Style.RESET_ALL}')
+        return lines
 
     def get_guess(self):
         while True:
-            print(f"Devinez une lettre ou tapez '{Fore.YELLOW}hint{Style.RESET_ALL}' pour un indice.")
+            print(f"Devinez une lettre ou tapez '{Fore.YELLOW}hint{Style.RESET_ALL}' pour un indice "
+                  f"('{Fore.YELLOW}suggestion{Style.RESET_ALL}' pour une lettre conseillée, "
+                  f"'{Fore.YELLOW}mot{Style.RESET_ALL}' pour proposer le mot entier).")
             guess = input('> ').lower()
             if guess == 'hint':
                 return 'hint'
+            if guess == 'suggestion':
+                print(f"{Fore.CYAN}Lettre conseillée : {self.game.suggest_letter()}{Style.RESET_ALL}")
+                continue
+            if guess == 'mot':
+                try:
+                    return check_word(input('Le mot (une erreur coûte une vie) : ').strip())
+                except ValueError:
+                    print(f'{Fore.RED}Veuillez entrer un mot.')
+                    continue
             if len(guess) != 1:
                 print(f'{Fore.RED}Veuillez entrer une seule lettre.')
             elif guess in self.game.missed_letters + self.game.correct_letters:
@@ -111,7 +216,7 @@ class HangmanConsole:
 
     def choose_category(self):
         print('Choisissez une catégorie :')
-        categories = list(self.game.words.keys())
+        categories = self.game.categories()
         for i, category in enumerate(categories):
             print(f'{i + 1}. {category}')
         while True:
@@ -147,24 +252,80 @@ class HangmanConsole:
             else:
                 print(f'{Fore.RED}Choix invalide.')
 
+    def show_leaderboard(self, n=5):
+        if self.game.leaderboard is None:
+            return
+        import sqlite3 # Already loaded by the leaderboard
+        try:
+            rows = self.game.leaderboard.top(n, self.game.difficulty)
+        except sqlite3.OperationalError as e: # Locked or unreadable: the game goes on without it
+            print(f"{Fore.RED}Classement indisponible : {e}{Style.RESET_ALL}")
+            return
+        print(f"{Fore.CYAN}Classement ({self.game.difficulty}) :{Style.RESET_ALL}")
+        for rank, (player, score, *_) in enumerate(rows, 1):
+            print(f"  {rank}. {player:<16} {score:>5}")
+
     def play_again(self):
         print('Voulez-vous rejouer? (oui ou non)')
         return input('> ').lower().startswith('o')
 
     def play_animation(self, frames, delay=0.1):
         for frame in frames:
-            self.clear_screen()
-            print(frame)
+            self.renderer.render([f'{frame}{Style.RESET_ALL}'])
             time.sleep(delay)
 
-    @staticmethod
-    def clear_screen():
-        os.system('cls' if os.name == 'nt' else 'clear')
+    def clear_screen(self):
+        # Escape codes rather than spawning 'clear'; colorama translates them on Windows
+        self.renderer.clear()
+
+def read_batches(stream, size):
+    # Lists of the complete lines read so far; a line cut by the end of a
+    # read waits for the next one. read1 returns what is already there, so a
+    # client waiting for each reply is not held up by a full batch.
+    rest = b''
+    while True:
+        data = stream.read1(size)
+        if not data:
+            if rest.strip():
+                yield [rest]
+            return
+        lines = (rest + data).split(b'\n')
+        rest = lines.pop()
+        yield [line for line in lines if line.strip()]
+
 
 if __name__ == '__main__':
+    import metrics
+
+    parser = argparse.ArgumentParser(description="Le jeu du pendu en console.")
+    parser.add_argument('--pack', help="Paquet de mots compilé avec wordpack.py.")
+    parser.add_argument('--events', help="Enregistre chaque partie dans ce journal (voir event_log.py).")
+    parser.add_argument('--player', default=getpass.getuser(), help="Nom affiché dans le classement.")
+    parser.add_argument('--leaderboard', default='leaderboard.db', help="Base du classement ('' pour aucune).")
+    parser.add_argument('--save', default='saved_round.bin',
+                        help="Partie interrompue, reprise au lancement suivant ('' pour aucune).")
+    parser.add_argument('--json', action='store_true',
+                        help="Sans interface : commandes JSON ligne par ligne sur l'entrée standard (voir drive()).")
+    metrics.add_arguments(parser)
+    args = parser.parse_args()
+    finish = metrics.setup(args)
     try:
-        console_game = HangmanConsole()
-        console_game.play()
-    except KeyboardInterrupt:
+        event_log = None
+        if args.events:
+            from event_log import EventLog
+            event_log = EventLog(args.events)
+        leaderboard = None
+        if args.leaderboard:
+            from leaderboard import Leaderboard
+            # One round at a time so it shows at once, except for scripted games
+            leaderboard = Leaderboard(args.leaderboard, batch_size=64 if args.json else 1)
+        console_game = HangmanConsole(args.pack, event_log, leaderboard, args.player, args.save)
+        if args.json:
+            console_game.drive()
+        else:
+            console_game.play()
+    except (KeyboardInterrupt, EOFError):
         print(f"\n{Fore.CYAN}Partie interrompue. À bientôt!{Style.RESET_ALL}")
         sys.exit(0)
+    finally:
+        finish()
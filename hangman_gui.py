@@ -1,15 +1,96 @@
+import argparse
+import getpass
+import logging
+import queue
+import sys
+import threading
+import time
 import tkinter as tk
+import traceback
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from tkinter import messagebox, simpledialog
 from game_logic import HangmanGame
 
+logger = logging.getLogger(__name__)
+
+POLL_INTERVAL = 20 # ms between two checks for finished background work
+ONLINE_TIMEOUT = 5.0 # Seconds to wait for a first online word before falling back to local words
+
+# Drawn once per window, in the order the parts appear; draw_hangman only
+# toggles their state
+GALLOWS_PARTS = (
+    ('line', (10, 230, 150, 230)), # Base
+    ('line', (80, 230, 80, 20)), # Pole
+    ('line', (80, 20, 200, 20)), # Beam
+    ('line', (200, 20, 200, 50)), # Rope
+    ('oval', (180, 50, 220, 90)), # Head
+    ('line', (200, 90, 200, 150)), # Body
+    ('line', (200, 110, 170, 140)), # Left Arm
+    ('line', (200, 110, 230, 140)), # Right Arm
+    ('line', (200, 150, 170, 180)), # Left Leg
+    ('line', (200, 150, 230, 180)), # Right Leg
+)
+
+
+class StallMonitor:
+    # Logs whenever the Tk main thread has not come back to its event loop
+    # for more than threshold seconds, with the stack it was stuck in. The
+    # loop calls beat() every POLL_INTERVAL.
+    def __init__(self, threshold=0.2):
+        self.threshold = threshold
+        self.heartbeat = time.monotonic()
+        self.stalls = 0
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.run, name='hangman-stall-monitor', daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def beat(self):
+        self.heartbeat = time.monotonic()
+
+    def run(self):
+        main_thread = threading.main_thread().ident
+        stalled_since = None
+        while not self.stopped.wait(self.threshold / 4):
+            heartbeat = self.heartbeat
+            if time.monotonic() - heartbeat > self.threshold:
+                if stalled_since != heartbeat: # Once per stall
+                    stalled_since = heartbeat
+                    stack = ''.join(traceback.format_stack(sys._current_frames().get(main_thread)))
+                    logger.warning("Interface bloquée depuis plus de %.0f ms :\n%s", self.threshold * 1000, stack)
+            elif stalled_since is not None:
+                self.stalls += 1
+                logger.warning("Interface débloquée après %.0f ms", (heartbeat - stalled_since) * 1000)
+                stalled_since = None
+
+    def stop(self):
+        self.stopped.set()
+        self.thread.join()
+
+
 class HangmanGUI:
-    def __init__(self, root):
+    def __init__(self, root, word_pack=None, event_log=None, leaderboard=None, player=None, stall_threshold=0.2):
         self.root = root
         self.root.title("Le Jeu du Pendu")
         self.root.geometry("800x600")
-        self.game = HangmanGame()
+        self.game = HangmanGame(word_pack=word_pack, event_log=event_log, leaderboard=leaderboard, player=player)
+
+        # Blocking work (network, files, database) runs on these threads;
+        # results come back through self.results, drained from the Tk loop.
+        # Results of a game the player has since replaced carry an older
+        # generation and are dropped.
+        self.executor = ThreadPoolExecutor(2, thread_name_prefix='hangman-gui')
+        self.results = queue.SimpleQueue()
+        self.generation = 0
+        self.loading = None # (future, cancelled event) of the word being loaded
+        self.online_lock = threading.Lock()
+        self.stall_monitor = StallMonitor(stall_threshold).start() if stall_threshold else None
 
         self.setup_ui()
+        self.poll_results()
         self.start_new_game()
 
     def setup_ui(self):
@@ -35,13 +116,26 @@ class HangmanGUI:
         # Canvas for hangman drawing
         self.canvas = tk.Canvas(self.canvas_frame, width=400, height=250, bg="white")
         self.canvas.pack()
+        self.gallows_items = [getattr(self.canvas, 'create_' + kind)(*coords, width=2, state=tk.HIDDEN)
+                              for kind, coords in GALLOWS_PARTS]
+        self.visible_parts = [False] * len(GALLOWS_PARTS)
+
+        # Event-to-paint latency of the last guesses, shown on demand
+        self.show_frame_time = tk.BooleanVar(value=False)
+        self.frame_times = deque(maxlen=50)
+        self.frame_time_item = self.canvas.create_text(395, 5, anchor=tk.NE, text="", fill="grey",
+                                                       font=("Helvetica", 9), state=tk.HIDDEN)
 
         # Word Label
         self.word_label = tk.Label(self.word_frame, text="", font=("Courier", 24))
         self.word_label.pack()
 
+        # Values currently displayed, so update_ui only touches what changed
+        self.shown = {}
+
         # Keyboard Buttons
         self.keyboard_buttons = {}
+        self.disabled_keys = set()
         self.create_keyboard()
 
         # Menu
@@ -50,13 +144,14 @@ class HangmanGUI:
         game_menu = tk.Menu(menubar, tearoff=0)
         menubar.add_cascade(label="Jeu", menu=game_menu)
         game_menu.add_command(label="Nouvelle Partie", command=self.start_new_game)
+        game_menu.add_checkbutton(label="Temps de rendu", variable=self.show_frame_time,
+                                  command=self.toggle_frame_time)
+        if self.game.leaderboard is not None:
+            game_menu.add_command(label="Classement", command=self.show_leaderboard)
         game_menu.add_separator()
         game_menu.add_command(label="Quitter", command=self.root.quit)
 
     def create_keyboard(self):
-        for frame in self.keyboard_frame.winfo_children():
-            frame.destroy()
-
         keys = 'abcdefghijklmnopqrstuvwxyz'
         for i, key in enumerate(keys):
             row = i // 9
@@ -66,31 +161,105 @@ class HangmanGUI:
             button.grid(row=row, column=col, padx=2, pady=2)
             self.keyboard_buttons[key] = button
 
+    def submit(self, function, *args, callback=None):
+        # Runs function on a worker thread, then callback(future) on the Tk
+        # thread unless another game was started in between
+        future = self.executor.submit(function, *args)
+        if callback is None:
+            future.add_done_callback(log_failure)
+        else:
+            self.when_done(future, callback)
+        return future
+
+    def when_done(self, future, callback):
+        generation = self.generation
+        future.add_done_callback(lambda done: self.results.put((generation, done, callback)))
+
+    def poll_results(self):
+        self.root.after(POLL_INTERVAL, self.poll_results) # First, so a failing callback does not stop the loop
+        if self.stall_monitor is not None:
+            self.stall_monitor.beat()
+        while True:
+            try:
+                generation, future, callback = self.results.get_nowait()
+            except queue.Empty:
+                return
+            if generation == self.generation and not future.cancelled():
+                callback(future)
+
+    def cancel_loading(self):
+        self.generation += 1
+        if self.loading is not None:
+            future, cancelled = self.loading
+            cancelled.set()
+            future.cancel()
+            self.loading = None
+            self.root.config(cursor='')
+
+    def load_online_words(self, cancelled):
+        with self.online_lock:
+            source = self.game.prefetch_online_words()
+        deadline = time.monotonic() + ONLINE_TIMEOUT
+        while not source.ready.wait(0.05) and not cancelled.is_set() and time.monotonic() < deadline:
+            pass
+
     def start_new_game(self):
+        self.cancel_loading()
         game_mode = self.choose_game_mode()
         if not game_mode: return
+        if game_mode == '2':
+            # Fills while the player picks a difficulty
+            cancelled = threading.Event()
+            self.loading = (self.submit(self.load_online_words, cancelled), cancelled)
 
         difficulty = self.choose_difficulty()
-        if not difficulty: return
+        if not difficulty:
+            self.cancel_loading()
+            return
 
         self.game.set_difficulty(difficulty)
 
         if game_mode == '1': # Local
             category = self.choose_category()
             if not category: return
-            self.game.start_new_round(game_mode, category)
+            self.begin_round(game_mode, category)
         elif game_mode == '2': # Online
-            self.game.start_new_round(game_mode)
+            self.show_loading()
+            self.when_done(self.loading[0], self.online_words_loaded)
         elif game_mode == '3': # Two Player
-            word = self.get_player_word()
-            if not word: return
-            self.game.set_player_word(word)
-            self.game.start_new_round(game_mode)
+            while True:
+                word = self.get_player_word()
+                if not word: return
+                try:
+                    self.game.set_player_word(word)
+                    break
+                except ValueError: # No letter to guess: asked again
+                    messagebox.showerror("Mot Secret", "Mot invalide. Veuillez utiliser des lettres.")
+            self.begin_round(game_mode)
+
+    def show_loading(self):
+        self.root.config(cursor='watch')
+        self.word_label.config(text="Chargement du mot en ligne…")
+        self.shown.pop('word', None)
+        for key, button in self.keyboard_buttons.items():
+            if key not in self.disabled_keys:
+                button.config(state=tk.DISABLED)
+                self.disabled_keys.add(key)
 
+    def online_words_loaded(self, future):
+        self.loading = None
+        self.root.config(cursor='')
+        if future.exception() is not None:
+            logger.warning("Mots en ligne indisponibles : %s", future.exception())
+        self.begin_round('2') # Falls back to local words if none arrived
+
+    def begin_round(self, game_mode, category=None):
+        self.game.start_new_round(game_mode, category)
         self.game.stats['played'] += 1
         self.update_ui()
-        for btn in self.keyboard_buttons.values():
-            btn.config(state=tk.NORMAL)
+        for key in self.disabled_keys:
+            self.keyboard_buttons[key].config(state=tk.NORMAL)
+        self.disabled_keys.clear()
 
     def choose_game_mode(self):
         return simpledialog.askstring("Mode de Jeu", "Choisissez un mode :\n1. Solo (Mots locaux)\n2. Solo (Mots en ligne)\n3. Deux Joueurs", parent=self.root)
@@ -99,7 +268,7 @@ class HangmanGUI:
         return simpledialog.askstring("Difficulté", "Choisissez une difficulté :\n1. Facile\n2. Moyen\n3. Difficile", parent=self.root)
 
     def choose_category(self):
-        categories = list(self.game.words.keys())
+        categories = self.game.categories()
         cat_string = "\n".join([f"{i+1}. {cat}" for i, cat in enumerate(categories)])
         choice = simpledialog.askstring("Catégorie", f"Choisissez une catégorie :\n{cat_string}", parent=self.root)
         if choice and choice.isdigit() and 1 <= int(choice) <= len(categories):
@@ -110,57 +279,128 @@ class HangmanGUI:
         return simpledialog.askstring("Mot Secret", "Joueur 1, entrez le mot secret :", show='*', parent=self.root)
 
     def handle_guess(self, key):
-        if self.game.game_is_done: return
+        if self.game.game_is_done or self.loading is not None: return
 
+        start = time.perf_counter()
         self.keyboard_buttons[key].config(state=tk.DISABLED)
+        self.disabled_keys.add(key)
         result = self.game.guess_letter(key)
         self.update_ui()
+        if self.show_frame_time.get():
+            # Queued behind the redraws the changes above scheduled
+            self.root.after_idle(self.record_frame_time, start)
 
         if self.game.game_is_done:
             self.end_game()
 
+    def changed(self, name, values):
+        if self.shown.get(name) == values:
+            return False
+        self.shown[name] = values
+        return True
+
     def update_ui(self):
         # Update stats
-        stats_text = f"Parties: {self.game.stats['played']} | Victoires: {self.game.stats['wins']} | Défaites: {self.game.stats['losses']}"
-        score_text = f"Score: {self.game.score} | Meilleur Score: {self.game.highscore} | Difficulté: {self.game.difficulty}"
-        self.stats_label.config(text=stats_text)
-        self.score_label.config(text=score_text)
+        stats = self.game.stats
+        if self.changed('stats', (stats['played'], stats['wins'], stats['losses'])):
+            self.stats_label.config(text=f"Parties: {stats['played']} | Victoires: {stats['wins']} | Défaites: {stats['losses']}")
+        if self.changed('score', (self.game.score, self.game.highscore, self.game.difficulty)):
+            self.score_label.config(text=f"Score: {self.game.score} | Meilleur Score: {self.game.highscore} | Difficulté: {self.game.difficulty}")
 
         # Update word display
-        blanks = ' '.join([c.upper() if c in self.game.correct_letters else '_' for c in self.game.secret_word])
-        self.word_label.config(text=blanks)
+        if self.changed('word', (self.game.secret_word, len(self.game.correct_letters))):
+            blanks = ' '.join([c.upper() if c in self.game.correct_letters else '_' for c in self.game.secret_word])
+            self.word_label.config(text=blanks)
 
         # Update hangman drawing
-        self.draw_hangman(len(self.game.missed_letters))
+        self.draw_hangman(self.game.misses)
 
     def draw_hangman(self, stage):
-        self.canvas.delete("all")
-        self.canvas.create_line(10, 230, 150, 230, width=2) # Base
-        if stage > 0: self.canvas.create_line(80, 230, 80, 20, width=2) # Pole
-        if stage > 1: self.canvas.create_line(80, 20, 200, 20, width=2) # Beam
-        if stage > 2: self.canvas.create_line(200, 20, 200, 50, width=2) # Rope
-        if stage > 3: self.canvas.create_oval(180, 50, 220, 90, width=2) # Head
-        if stage > 4: self.canvas.create_line(200, 90, 200, 150, width=2) # Body
-        if stage > 5: self.canvas.create_line(200, 110, 170, 140, width=2) # Left Arm
-        if stage > 6: self.canvas.create_line(200, 110, 230, 140, width=2) # Right Arm
-        if stage > 7: self.canvas.create_line(200, 150, 170, 180, width=2) # Left Leg
-        if stage > 8 and self.game.max_guesses > 8: self.canvas.create_line(200, 150, 230, 180, width=2) # Right Leg
-        elif stage > 6 and self.game.max_guesses <= 6: self.canvas.create_line(200, 150, 230, 180, width=2) # Right Leg
+        visible = [stage >= part for part in range(len(GALLOWS_PARTS) - 1)] # Base to Left Leg
+        visible.append((stage > 8 and self.game.max_guesses > 8) or (stage > 6 and self.game.max_guesses <= 6)) # Right Leg
+        for item, shown, was_shown in zip(self.gallows_items, visible, self.visible_parts):
+            if shown != was_shown:
+                self.canvas.itemconfigure(item, state=tk.NORMAL if shown else tk.HIDDEN)
+        self.visible_parts = visible
+
+    def toggle_frame_time(self):
+        self.frame_times.clear()
+        self.canvas.itemconfigure(self.frame_time_item, text="",
+                                  state=tk.NORMAL if self.show_frame_time.get() else tk.HIDDEN)
+
+    def record_frame_time(self, start):
+        self.frame_times.append((time.perf_counter() - start) * 1000)
+        average = sum(self.frame_times) / len(self.frame_times)
+        self.canvas.itemconfigure(self.frame_time_item,
+                                  text=f"{self.frame_times[-1]:.1f} ms (moy. {average:.1f} ms)")
+
+    def show_leaderboard(self):
+        difficulty = self.game.difficulty
+        self.submit(self.game.leaderboard.top, 10, difficulty,
+                    callback=lambda future: self.leaderboard_loaded(difficulty, future))
+
+    def leaderboard_loaded(self, difficulty, future):
+        if future.exception() is not None:
+            messagebox.showerror("Classement", f"Classement indisponible : {future.exception()}")
+            return
+        lines = [f"{rank}. {player} : {score}" for rank, (player, score, *_) in enumerate(future.result(), 1)]
+        messagebox.showinfo(f"Classement ({difficulty})", '\n'.join(lines) or "Aucune partie enregistrée.")
 
     def end_game(self):
-        self.game.save_stats()
-        if self.game.score > self.game.highscore:
-            self.game.save_highscore()
-        
-        won = len(self.game.missed_letters) < self.game.max_guesses
-        message = f"Vous avez gagné! Le mot était '{self.game.secret_word}'." if won else f"Vous avez perdu! Le mot était '{self.game.secret_word}'."
+        # The round's records are taken here; only the writes run in the background
+        game = self.game
+        self.submit(game.store.record_stats, game.stats_delta())
+        if game.leaderboard is not None:
+            self.submit(game.leaderboard.record, *game.score_entry())
+        if game.score > game.highscore:
+            game.highscore = game.score
+            self.submit(game.store.record_highscore, game.score)
+
+        won = self.game.misses < self.game.max_guesses
+        message = f"Vous avez gagné! Le mot était '{self.game.secret_display}'." if won else f"Vous avez perdu! Le mot était '{self.game.secret_display}'."
         
         if messagebox.askyesno("Fin de partie", f"{message}\nVoulez-vous rejouer?"):
             self.start_new_game()
         else:
             self.root.quit()
 
+    def close(self):
+        # Waits for pending writes
+        self.cancel_loading()
+        self.executor.shutdown(wait=True)
+        if self.stall_monitor is not None:
+            self.stall_monitor.stop()
+
+
+def log_failure(future):
+    if not future.cancelled() and future.exception() is not None:
+        exception = future.exception()
+        logger.error("Échec d'une tâche en arrière-plan", exc_info=(type(exception), exception, exception.__traceback__))
+
 if __name__ == '__main__':
+    import metrics
+
+    parser = argparse.ArgumentParser(description="Le jeu du pendu.")
+    parser.add_argument('--pack', help="Paquet de mots compilé avec wordpack.py.")
+    parser.add_argument('--events', help="Enregistre chaque partie dans ce journal (voir event_log.py).")
+    parser.add_argument('--player', default=getpass.getuser(), help="Nom affiché dans le classement.")
+    parser.add_argument('--leaderboard', default='leaderboard.db', help="Base du classement ('' pour aucune).")
+    parser.add_argument('--stall-threshold', type=float, default=0.2,
+                        help="Signale tout blocage de l'interface plus long que ce délai en secondes (0 pour aucun).")
+    metrics.add_arguments(parser)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    finish = metrics.setup(args)
     root = tk.Tk()
-    app = HangmanGUI(root)
+    event_log = None
+    if args.events:
+        from event_log import EventLog
+        event_log = EventLog(args.events)
+    leaderboard = None
+    if args.leaderboard:
+        from leaderboard import Leaderboard
+        leaderboard = Leaderboard(args.leaderboard, batch_size=1) # One round at a time: visible at once
+    app = HangmanGUI(root, args.pack, event_log, leaderboard, args.player, args.stall_threshold)
     root.mainloop()
+    app.close()
+    finish()
@@ -0,0 +1,151 @@
+import atexit
+import sqlite3
+import threading
+import time
+
+LEADERBOARD_FILE = 'leaderboard.db'
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS players (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS scores (
+    id INTEGER PRIMARY KEY,
+    player_id INTEGER NOT NULL REFERENCES players(id),
+    score INTEGER NOT NULL,
+    difficulty TEXT NOT NULL,
+    category TEXT NOT NULL,
+    won INTEGER NOT NULL,
+    played_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS scores_by_score ON scores (score DESC, id);
+CREATE INDEX IF NOT EXISTS scores_by_difficulty ON scores (difficulty, score DESC, id);
+'''
+
+TOP_QUERY = '''
+SELECT players.name, scores.score, scores.difficulty, scores.category, scores.played_at
+FROM scores JOIN players ON players.id = scores.player_id
+{where} ORDER BY scores.score DESC, scores.id LIMIT ?
+'''
+
+
+class Leaderboard:
+    # Scores of every finished round, shared by all games through SQLite in
+    # WAL mode: writers from several processes queue on the database lock
+    # (busy_timeout) while readers keep reading the last committed state.
+    # Rounds are inserted batch_size at a time, or once the oldest pending
+    # one is flush_interval seconds old, in a single transaction. Top-N
+    # results are cached until PRAGMA data_version reports a commit from
+    # another connection, or this one writes.
+    def __init__(self, path=LEADERBOARD_FILE, batch_size=64, flush_interval=1.0, timeout=10.0):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.timeout = timeout
+        self.lock = threading.Lock() # The server records from its executor threads
+        self.connection = None
+        self.pending = []
+        self.pending_since = None
+        self.player_ids = {}
+        self.cache = {}
+        self.data_version = None
+        atexit.register(self.close)
+
+    def connect(self):
+        if self.connection is None:
+            connection = sqlite3.connect(self.path, timeout=self.timeout, check_same_thread=False,
+                                         isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL') # Durable at checkpoints, never corrupted
+            connection.executescript(SCHEMA)
+            self.connection = connection
+        return self.connection
+
+    def record(self, player, score, difficulty, category, won):
+        with self.lock:
+            if not self.pending:
+                self.pending_since = time.monotonic()
+            self.pending.append((player or 'anonyme', score, difficulty, category or '', int(won), time.time()))
+            if len(self.pending) >= self.batch_size or time.monotonic() - self.pending_since >= self.flush_interval:
+                try:
+                    self.flush_locked()
+                except sqlite3.OperationalError: # Still locked after timeout: kept for the next flush
+                    pass
+
+    def flush(self):
+        with self.lock:
+            self.flush_locked()
+
+    def flush_locked(self):
+        if not self.pending:
+            return
+        connection = self.connect()
+        connection.execute('BEGIN IMMEDIATE') # Takes the write lock now rather than midway
+        try:
+            rows = []
+            for name, *values in self.pending:
+                rows.append((self.player_id(connection, name), *values))
+            connection.executemany('INSERT INTO scores (player_id, score, difficulty, category, won, played_at) '
+                                   'VALUES (?, ?, ?, ?, ?, ?)', rows)
+            connection.execute('COMMIT')
+        except BaseException:
+            connection.execute('ROLLBACK')
+            self.player_ids.clear() # Ids assigned in the rolled back transaction are gone
+            raise
+        self.pending.clear()
+        self.cache.clear()
+
+    def player_id(self, connection, name):
+        player_id = self.player_ids.get(name)
+        if player_id is None:
+            connection.execute('INSERT OR IGNORE INTO players (name) VALUES (?)', (name,))
+            player_id, = connection.execute('SELECT id FROM players WHERE name = ?', (name,)).fetchone()
+            self.player_ids[name] = player_id
+        return player_id
+
+    def top(self, n=10, difficulty=None):
+        # [(player, score, difficulty, category, played_at)], best first
+        with self.lock:
+            self.flush_locked()
+            connection = self.connect()
+            data_version, = connection.execute('PRAGMA data_version').fetchone()
+            if data_version != self.data_version:
+                self.cache.clear()
+                self.data_version = data_version
+            key = (n, difficulty)
+            rows = self.cache.get(key)
+            if rows is None:
+                if difficulty is None:
+                    rows = connection.execute(TOP_QUERY.format(where=''), (n,)).fetchall()
+                else:
+                    rows = connection.execute(TOP_QUERY.format(where='WHERE scores.difficulty = ?'),
+                                              (difficulty, n)).fetchall()
+                self.cache[key] = rows
+            return rows
+
+    def close(self):
+        with self.lock:
+            self.flush_locked()
+            if self.connection is not None:
+                self.connection.close()
+                self.connection = None
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Classement des parties.")
+    parser.add_argument('--file', default=LEADERBOARD_FILE)
+    parser.add_argument('-n', type=int, default=10)
+    parser.add_argument('--difficulty', choices=['Facile', 'Moyen', 'Difficile'])
+    args = parser.parse_args()
+
+    leaderboard = Leaderboard(args.file)
+    for rank, (player, score, difficulty, category, played_at) in enumerate(leaderboard.top(args.n, args.difficulty), 1):
+        print(f"{rank:>3}. {player:<16} {score:>5}  {difficulty:<10} {category:<12} "
+              f"{time.strftime('%Y-%m-%d %H:%M', time.localtime(played_at))}")
+
+
+if __name__ == '__main__':
+    main()
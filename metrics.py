@@ -0,0 +1,264 @@
+import bisect
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+from persistence import atomic_write
+
+# Upper bounds in seconds, from a fast guess to a slow online fetch
+BUCKETS = (0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+ONLINE_REQUEST = (('op', 'online_request'),) # Recorded by word_source itself, see fetch_batch
+
+# (module, class, method, operation). Only modules already imported get
+# instrumented, so enabling metrics never pulls in tkinter or requests.
+TARGETS = (
+    ('game_logic', 'HangmanGame', 'guess_letter', 'guess'),
+    ('game_logic', 'HangmanGame', 'fetch_online_word', 'online_fetch'),
+    # The store rather than the game: the GUI, the server and the headless
+    # console write stats and highscores from other threads or without the
+    # game's save methods
+    ('persistence', 'GameStore', 'record_stats', 'save_stats'),
+    ('persistence', 'GameStore', 'record_highscore', 'save_highscore'),
+    ('hangman_console', 'HangmanConsole', 'display_board', 'render_console'),
+    ('hangman_gui', 'HangmanGUI', 'update_ui', 'render_gui'),
+)
+
+
+class Histogram:
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        # (upper bound, observations at or below it), ending with +Inf
+        total = 0
+        for bound, count in zip((*self.buckets, float('inf')), self.counts):
+            total += count
+            yield bound, total
+
+
+class Registry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.counters = Counter()
+        self.histograms = {}
+
+    def inc(self, name, labels=(), value=1):
+        with self.lock:
+            self.counters[name, labels] += value
+
+    def observe(self, name, labels, value):
+        with self.lock:
+            histogram = self.histograms.get((name, labels))
+            if histogram is None:
+                histogram = self.histograms[name, labels] = Histogram()
+            histogram.observe(value)
+
+    def record(self, operation, seconds, result=None):
+        # One lock round-trip per instrumented call
+        with self.lock:
+            histogram = self.histograms.get(('hangman_operation_seconds', operation))
+            if histogram is None:
+                histogram = self.histograms['hangman_operation_seconds', operation] = Histogram()
+            histogram.observe(seconds)
+            if result is not None:
+                self.counters['hangman_results_total', (*operation, ('result', result))] += 1
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                'counters': [{'name': name, 'labels': dict(labels), 'value': value}
+                             for (name, labels), value in sorted(self.counters.items())],
+                'histograms': [{'name': name, 'labels': dict(labels), 'count': histogram.count,
+                                'sum': histogram.sum, 'buckets': [[bound, count] for bound, count in
+                                                                  histogram.cumulative()][:-1]}
+                               for (name, labels), histogram in sorted(self.histograms.items())],
+            }
+
+    def prometheus(self):
+        lines = []
+        with self.lock:
+            seen = set()
+            for (name, labels), value in sorted(self.counters.items()):
+                if name not in seen:
+                    seen.add(name)
+                    lines.append(f'# TYPE {name} counter')
+                lines.append(f'{name}{format_labels(labels)} {value}')
+            for (name, labels), histogram in sorted(self.histograms.items()):
+                if name not in seen:
+                    seen.add(name)
+                    lines.append(f'# TYPE {name} histogram')
+                for bound, count in histogram.cumulative():
+                    le = '+Inf' if bound == float('inf') else repr(bound)
+                    lines.append(f'{name}_bucket{format_labels((*labels, ("le", le)))} {count}')
+                lines.append(f'{name}_sum{format_labels(labels)} {histogram.sum!r}')
+                lines.append(f'{name}_count{format_labels(labels)} {histogram.count}')
+        return '\n'.join(lines) + '\n'
+
+
+def format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{value}"' for key, value in labels) + '}'
+
+
+registry = Registry()
+originals = {}
+
+
+def timed(method, operation):
+    labels = (('op', operation),)
+
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            result = method(*args, **kwargs)
+        except BaseException:
+            registry.record(labels, time.perf_counter() - start)
+            registry.inc('hangman_errors_total', labels)
+            raise
+        # guess_letter's 'correct', 'incorrect', 'hint_used'... are counted too
+        registry.record(labels, time.perf_counter() - start, result if isinstance(result, str) else None)
+        return result
+    return wrapper
+
+
+def find_module(name):
+    # The game scripts are usually run directly and then live as __main__
+    module = sys.modules.get(name)
+    if module is None:
+        main = sys.modules.get('__main__')
+        main_file = getattr(main, '__file__', None) or ''
+        if os.path.splitext(os.path.basename(main_file))[0] == name:
+            module = main
+    return module
+
+
+def enable():
+    # Wraps the target methods in place; while disabled the classes hold
+    # their own functions and calls cost exactly what they did before.
+    for module_name, class_name, method_name, operation in TARGETS:
+        module = find_module(module_name)
+        if module is None or (module_name, class_name, method_name) in originals:
+            continue
+        cls = getattr(module, class_name)
+        method = cls.__dict__[method_name]
+        originals[module_name, class_name, method_name] = method
+        setattr(cls, method_name, timed(method, operation))
+
+
+def disable():
+    for (module_name, class_name, method_name), method in originals.items():
+        setattr(getattr(find_module(module_name), class_name), method_name, method)
+    originals.clear()
+
+
+def enabled():
+    return bool(originals)
+
+
+def write_snapshot(path):
+    # Prometheus text format unless the file name asks for JSON
+    if path.endswith('.json'):
+        atomic_write(path, json.dumps(registry.snapshot(), indent=4))
+    else:
+        atomic_write(path, registry.prometheus())
+
+
+class Sampler:
+    # Statistical profiler: a thread records the target thread's stack every
+    # interval, written as collapsed stacks ("a;b;c count") for flame graphs.
+    def __init__(self, interval=0.005, thread_id=None):
+        self.interval = interval
+        self.thread_id = thread_id or threading.main_thread().ident
+        self.stacks = Counter()
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.run, name='hangman-sampler', daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f'{code.co_name} ({code.co_filename}:{code.co_firstlineno})')
+                frame = frame.f_back
+            if stack:
+                self.stacks[';'.join(reversed(stack))] += 1
+
+    def stop(self):
+        self.stopped.set()
+        self.thread.join()
+
+    def dump(self, path):
+        with open(path, 'w') as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f'{stack} {count}\n')
+
+
+class Profiler:
+    # 'cprofile' traces every call (pstats file); 'sample' is cheap enough
+    # to leave on for a whole session.
+    def __init__(self, mode='sample', interval=0.005):
+        self.mode = mode
+        self.interval = interval
+        self.profiler = None
+
+    def start(self):
+        if self.mode == 'cprofile':
+            import cProfile
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+        else:
+            self.profiler = Sampler(self.interval).start()
+        return self
+
+    def stop(self, path):
+        if self.mode == 'cprofile':
+            self.profiler.disable()
+            self.profiler.dump_stats(path)
+        else:
+            self.profiler.stop()
+            self.profiler.dump(path)
+        self.profiler = None
+
+
+def add_arguments(parser):
+    parser.add_argument('--metrics', help="Active les métriques et les écrit à la sortie "
+                                          "(format Prometheus, ou JSON si le fichier finit par .json).")
+    parser.add_argument('--profile', choices=['cprofile', 'sample'], help="Profile la session.")
+    parser.add_argument('--profile-output', default='hangman.prof', help="Fichier du profil.")
+
+
+def setup(args):
+    # For the game entry points: returns the function to call on exit
+    profiler = Profiler(args.profile).start() if args.profile else None
+    if args.metrics:
+        enable()
+
+    def finish():
+        if profiler is not None:
+            profiler.stop(args.profile_output)
+        if args.metrics:
+            write_snapshot(args.metrics)
+    return finish
@@ -0,0 +1,206 @@
+import atexit
+import glob
+import json
+import os
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError: # Windows
+    fcntl = None
+    import msvcrt
+
+HIGHSCORE_FILE = 'highscore.txt'
+STATS_FILE = 'stats.json'
+STAT_KEYS = ('played', 'wins', 'losses')
+
+
+@contextmanager
+def file_lock(path):
+    with open(path, 'a+') as f:
+        if fcntl:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def atomic_write(path, data):
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'wb' if isinstance(data, bytes) else 'w') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class GameStore:
+    # stats.json is a snapshot tagged with a generation; every game result
+    # since is appended to stats.json.<generation>.log as one short line
+    # ("s <played> <wins> <losses>" deltas or "h <score>"). Compaction writes
+    # the snapshot of the next generation, which atomically retires the old
+    # log, so a crash at any point neither loses nor double-counts a record.
+    def __init__(self, stats_file=STATS_FILE, highscore_file=HIGHSCORE_FILE,
+                 fsync_every=32, fsync_interval=1.0, compact_size=64 * 1024):
+        self.stats_file = stats_file
+        self.highscore_file = highscore_file
+        self.lock_file = f'{stats_file}.lock'
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self.compact_size = compact_size
+        self.log_fd = None
+        self.log_snapshot_id = None
+        self.loaded = None
+        self.unsynced = 0
+        self.last_sync = time.monotonic()
+        atexit.register(self.close)
+
+    def read_snapshot(self):
+        snapshot = {key: 0 for key in STAT_KEYS}
+        snapshot.update(highscore=0, generation=0)
+        if os.path.exists(self.stats_file):
+            with open(self.stats_file, 'r') as f:
+                try: snapshot.update(json.load(f))
+                except json.JSONDecodeError: pass
+        if os.path.exists(self.highscore_file): # Highscore from before the log existed
+            with open(self.highscore_file, 'r') as f:
+                try: snapshot['highscore'] = max(snapshot['highscore'], int(f.read()))
+                except (ValueError, TypeError): pass
+        return snapshot
+
+    def log_path(self, generation):
+        return f'{self.stats_file}.{generation}.log'
+
+    def replay_log(self, totals, offset=0):
+        # Returns the offset just past the last complete record, so that the
+        # next load only has to read what was appended since.
+        log_file = self.log_path(totals['generation'])
+        if not os.path.exists(log_file):
+            return offset
+        with open(log_file, 'rb') as f:
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b'\n'): # Torn write from a crash
+                    break
+                offset += len(line)
+                fields = line.split()
+                try:
+                    if fields[0] == b's':
+                        for key, value in zip(STAT_KEYS, fields[1:]):
+                            totals[key] += int(value)
+                    elif fields[0] == b'h':
+                        totals['highscore'] = max(totals['highscore'], int(fields[1]))
+                except (IndexError, ValueError):
+                    continue
+        return offset
+
+    def snapshot_id(self):
+        try:
+            snapshot = os.stat(self.stats_file)
+            return snapshot.st_ino, snapshot.st_mtime_ns # Inodes alone get reused
+        except FileNotFoundError:
+            return None
+
+    def load(self):
+        with file_lock(self.lock_file):
+            snapshot_id = self.snapshot_id()
+            if self.loaded is not None and self.loaded[0] == snapshot_id:
+                offset, totals = self.loaded[1], dict(self.loaded[2])
+            else:
+                offset, totals = 0, self.read_snapshot()
+            offset = self.replay_log(totals, offset)
+            self.loaded = (snapshot_id, offset, dict(totals))
+        return totals
+
+    def load_stats(self):
+        totals = self.load()
+        return {key: totals[key] for key in STAT_KEYS}
+
+    def load_highscore(self):
+        return self.load()['highscore']
+
+    def record_stats(self, delta):
+        if any(delta.get(key) for key in STAT_KEYS):
+            self.append('s ' + ' '.join(str(delta.get(key, 0)) for key in STAT_KEYS))
+
+    def record_highscore(self, score):
+        self.append(f'h {score}')
+
+    def open_log(self):
+        # Another process may have compacted since we opened our log: the
+        # snapshot was replaced, so records now belong to the next generation.
+        snapshot_id = self.snapshot_id()
+        if self.log_fd is not None and snapshot_id == self.log_snapshot_id:
+            return
+        if self.log_fd is not None:
+            os.close(self.log_fd)
+        generation = self.read_snapshot()['generation']
+        self.log_fd = os.open(self.log_path(generation), os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        self.log_snapshot_id = snapshot_id
+
+    def append(self, record):
+        with file_lock(self.lock_file):
+            self.open_log()
+            os.write(self.log_fd, (record + '\n').encode())
+            self.unsynced += 1
+            if self.unsynced >= self.fsync_every or time.monotonic() - self.last_sync >= self.fsync_interval:
+                self.sync()
+            if self.compact_size and os.fstat(self.log_fd).st_size > self.compact_size:
+                self.compact_locked()
+
+    def sync(self):
+        if self.log_fd is not None and self.unsynced:
+            os.fsync(self.log_fd)
+        self.unsynced = 0
+        self.last_sync = time.monotonic()
+
+    def compact(self):
+        with file_lock(self.lock_file):
+            self.compact_locked()
+
+    def compact_locked(self):
+        totals = self.read_snapshot()
+        self.replay_log(totals)
+        totals['generation'] += 1
+        atomic_write(self.stats_file, json.dumps(totals))
+        for log_file in glob.glob(glob.escape(self.stats_file) + '.*.log'):
+            if log_file != self.log_path(totals['generation']):
+                os.remove(log_file)
+        self.unsynced = 0
+        self.open_log()
+
+    def close(self):
+        if self.log_fd is not None:
+            with file_lock(self.lock_file):
+                self.sync()
+            os.close(self.log_fd)
+            self.log_fd = None
+
+
+def main():
+    import argparse # Only the command line needs it, not the game importing this module
+
+    parser = argparse.ArgumentParser(description="Statistiques et meilleur score du pendu.")
+    parser.add_argument('command', choices=['show', 'compact'])
+    parser.add_argument('--stats-file', default=STATS_FILE)
+    args = parser.parse_args()
+
+    store = GameStore(args.stats_file)
+    if args.command == 'compact':
+        store.compact()
+    totals = store.load()
+    print(f"Parties: {totals['played']} | Victoires: {totals['wins']} | Défaites: {totals['losses']} | "
+          f"Meilleur Score: {totals['highscore']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,377 @@
+import argparse
+import asyncio
+import json
+import logging
+import os
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import commands
+import snapshot
+from game_logic import HangmanGame
+from persistence import GameStore
+
+logger = logging.getLogger(__name__)
+
+
+class Session:
+    def __init__(self, session_id, game):
+        self.id = session_id
+        self.game = game
+        self.last_seen = time.monotonic()
+        self.lock = asyncio.Lock()
+
+
+class SessionManager:
+    # Sessions kept in LRU order; idle ones expire after ttl seconds, and the
+    # least recently used one makes room when max_sessions is reached. With
+    # spill_dir, those are not lost but snapshotted: kept in spilled until
+    # the server writes them to spill_dir, one file per session, and brought
+    # back on their next request. A spilled session not resumed within ttl
+    # seconds of being written is dropped as well.
+    def __init__(self, max_sessions=100000, ttl=600, spill_dir=None):
+        self.sessions = OrderedDict()
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self.evicted = 0
+        self.restored = 0
+        self.spill_dir = spill_dir
+        self.spilled = {}
+        if spill_dir:
+            os.makedirs(spill_dir, exist_ok=True)
+
+    def __len__(self):
+        return len(self.sessions)
+
+    def get(self, session_id):
+        session = self.sessions.get(session_id)
+        if session is not None:
+            session.last_seen = time.monotonic()
+            self.sessions.move_to_end(session_id)
+        return session
+
+    def add(self, game, session_id=None):
+        if len(self.sessions) >= self.max_sessions:
+            oldest = next(iter(self.sessions.values()))
+            if oldest.lock.locked():
+                return None
+            self.remove(oldest.id)
+        session = Session(session_id or uuid.uuid4().hex, game)
+        self.sessions[session.id] = session
+        return session
+
+    def remove(self, session_id):
+        session = self.sessions.pop(session_id, None)
+        if session is not None:
+            self.evicted += 1
+            if self.spill_dir:
+                self.spilled[session_id] = snapshot.dumps(session.game)
+
+    def spill_path(self, session_id):
+        if not session_id.isalnum(): # Ids come from clients: never a path
+            raise ValueError(f'session {session_id!r}')
+        return os.path.join(self.spill_dir, session_id)
+
+    def write_spilled(self, spilled):
+        for session_id, data in spilled:
+            with open(self.spill_path(session_id), 'wb') as f:
+                f.write(data)
+
+    def read_spilled(self, session_id):
+        # The snapshot, removed from disk as the session is live again
+        path = self.spill_path(session_id)
+        try:
+            with open(path, 'rb') as f:
+                expired = os.fstat(f.fileno()).st_mtime < time.time() - self.ttl
+                data = f.read()
+        except FileNotFoundError:
+            return None
+        os.remove(path)
+        return None if expired else data # Expired but not swept yet
+
+    def discard_spilled(self, session_ids):
+        removed = 0
+        for session_id in session_ids:
+            try:
+                os.remove(self.spill_path(session_id))
+                removed += 1
+            except FileNotFoundError:
+                pass
+        return removed
+
+    def expire_spilled(self):
+        deadline = time.time() - self.ttl
+        with os.scandir(self.spill_dir) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_file() and entry.stat().st_mtime < deadline:
+                        os.remove(entry.path)
+                except FileNotFoundError: # Resumed meanwhile
+                    pass
+
+    def expire(self):
+        deadline = time.monotonic() - self.ttl
+        while self.sessions:
+            session = next(iter(self.sessions.values()))
+            if session.last_seen > deadline:
+                break
+            self.remove(session.id)
+
+
+class HangmanServer:
+    # Line-oriented JSON over TCP: one request object per line, e.g.
+    #   {"id": 1, "cmd": "new", "mode": "1", "difficulty": "2", "category": "Fruits", "player": "alice"}
+    #   {"id": 2, "cmd": "guess", "session": "...", "letter": "e"}
+    #   {"id": 3, "cmd": "close", "session": "..."}
+    # that is, the commands of commands.py with a session ("new" without one
+    # starts a session), and one response object per line carrying the same
+    # id. Requests of a connection run concurrently up to max_inflight; past
+    # that the server stops reading, which pushes back on the client through
+    # TCP.
+    def __init__(self, host='127.0.0.1', port=8765, max_sessions=100000, ttl=600,
+                 max_inflight=256, io_workers=8, store=None, event_log=None, leaderboard=None, spill_dir=None):
+        self.host = host
+        self.port = port
+        self.sessions = SessionManager(max_sessions, ttl, spill_dir)
+        self.max_inflight = max_inflight
+        self.executor = ThreadPoolExecutor(io_workers, thread_name_prefix='hangman-io')
+        self.store = store or GameStore()
+        self.event_log = event_log
+        self.leaderboard = leaderboard
+        self.online_source = None
+        self.restoring = {}
+        self.server = None
+        self.sweeper = None
+
+    async def start(self):
+        self.server = await asyncio.start_server(self.handle_connection, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        self.sweeper = asyncio.create_task(self.sweep())
+        return self
+
+    async def close(self):
+        self.sweeper.cancel()
+        self.server.close()
+        await self.server.wait_closed()
+        if self.sessions.spill_dir:
+            # Every session survives a restart with the same spill_dir
+            for session_id in list(self.sessions.sessions):
+                self.sessions.remove(session_id)
+            await self.write_spilled()
+        self.executor.shutdown(wait=True)
+        if self.online_source is not None:
+            self.online_source.close()
+        if self.event_log is not None:
+            self.event_log.flush()
+        if self.leaderboard is not None:
+            self.leaderboard.flush()
+
+    async def sweep(self):
+        while True:
+            await asyncio.sleep(max(1.0, self.sessions.ttl / 4))
+            self.sessions.expire()
+            await self.write_spilled()
+            if self.sessions.spill_dir:
+                await asyncio.get_running_loop().run_in_executor(self.executor, self.sessions.expire_spilled)
+
+    async def write_spilled(self):
+        spilled = list(self.sessions.spilled.items())
+        if not spilled:
+            return
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self.executor, self.sessions.write_spilled, spilled)
+        stale = []
+        for session_id, data in spilled:
+            if self.sessions.spilled.get(session_id) is data:
+                del self.sessions.spilled[session_id]
+            elif session_id not in self.sessions.spilled: # Restored while being written
+                stale.append(session_id)
+        if stale:
+            await loop.run_in_executor(self.executor, self.sessions.discard_spilled, stale)
+
+    async def get_session(self, session_id):
+        session = self.sessions.get(session_id)
+        if session is not None or not self.sessions.spill_dir:
+            return session
+        # Requests arriving while the session is read back wait for the same restore
+        restoring = self.restoring.get(session_id)
+        if restoring is None:
+            restoring = self.restoring[session_id] = asyncio.ensure_future(self.restore_session(session_id))
+        return await asyncio.shield(restoring)
+
+    async def restore_session(self, session_id):
+        try:
+            data = self.sessions.spilled.pop(session_id, None)
+            game = await asyncio.get_running_loop().run_in_executor(self.executor, self.restore_game, session_id, data)
+        finally:
+            del self.restoring[session_id]
+        if game is None:
+            return None
+        session = self.sessions.add(game, session_id)
+        if session is None: # Full of busy sessions: back to the spill
+            self.sessions.spilled[session_id] = snapshot.dumps(game)
+        else:
+            self.sessions.restored += 1
+        return session
+
+    def restore_game(self, session_id, data):
+        if data is None:
+            data = self.sessions.read_spilled(session_id)
+            if data is None:
+                return None
+        return snapshot.loads(data, self.new_game())
+
+    async def handle_connection(self, reader, writer):
+        slots = asyncio.Semaphore(self.max_inflight)
+        tasks = set()
+
+        async def respond(line):
+            try:
+                response = await self.handle_line(line)
+                writer.write(json.dumps(response, separators=(',', ':')).encode() + b'\n')
+                await writer.drain()
+            except ConnectionError:
+                pass
+            finally:
+                slots.release()
+
+        try:
+            while True:
+                await slots.acquire()
+                line = await reader.readline()
+                if not line:
+                    slots.release()
+                    break
+                task = asyncio.create_task(respond(line))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+        except (ConnectionError, asyncio.LimitOverrunError, ValueError) as e:
+            logger.info("Connexion fermée : %s", e)
+        except asyncio.CancelledError: # Server shutting down
+            for task in tasks:
+                task.cancel()
+        finally:
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+            writer.close()
+
+    async def handle_line(self, line):
+        try:
+            request = json.loads(line)
+        except json.JSONDecodeError:
+            return {'ok': False, 'error': 'JSON invalide'}
+        response = {'id': request.get('id')} if isinstance(request, dict) else {}
+        try:
+            response.update(await self.handle_request(request))
+        except commands.REQUEST_ERRORS as e:
+            response.update(ok=False, error=f'Requête invalide : {e}')
+        return response
+
+    async def handle_request(self, request):
+        command = request['cmd']
+        if command == 'new':
+            return await self.new_round(request)
+        if command == 'close':
+            return await self.close_session(request['session'])
+
+        session = await self.get_session(request['session'])
+        if session is None:
+            return {'ok': False, 'error': 'Session inconnue ou expirée'}
+        async with session.lock:
+            reply, finished = commands.play(session.game, request)
+            if finished:
+                # Persisting happens off the loop; the session stays locked until done
+                await asyncio.get_running_loop().run_in_executor(self.executor, commands.finish_round, session.game)
+            reply['session'] = session.id
+            return reply
+
+    async def close_session(self, session_id):
+        # Dropped wherever it is, without reading a spilled one back
+        restoring = self.restoring.get(session_id)
+        if restoring is not None:
+            await asyncio.shield(restoring)
+        session = self.sessions.get(session_id)
+        if session is not None:
+            async with session.lock: # After any request still running on it
+                self.sessions.sessions.pop(session_id, None)
+        found = session is not None
+        if self.sessions.spill_dir:
+            found = self.sessions.spilled.pop(session_id, None) is not None or found
+            removed = await asyncio.get_running_loop().run_in_executor(
+                self.executor, self.sessions.discard_spilled, [session_id])
+            found = found or removed > 0
+        if not found:
+            return {'ok': False, 'error': 'Session inconnue ou expirée'}
+        return {'ok': True, 'session': session_id}
+
+    async def new_round(self, request):
+        session = await self.get_session(request['session']) if request.get('session') else None
+        round_options = None
+        if session is None:
+            game = await asyncio.get_running_loop().run_in_executor(self.executor, self.new_game)
+            # Checked before the game takes a slot, which may evict another session
+            round_options = commands.prepare_round(game, request)
+            session = self.sessions.add(game)
+            if session is None:
+                return {'ok': False, 'error': 'Serveur saturé, réessayez plus tard'}
+
+        game = session.game
+        async with session.lock:
+            if round_options is None:
+                round_options = commands.prepare_round(game, request)
+            if round_options[0] == '2':
+                if self.online_source is None:
+                    from word_source import OnlineWordSource
+                    self.online_source = OnlineWordSource().start()
+                game.online_source = self.online_source
+            reply = commands.begin_round(game, *round_options)
+            reply['session'] = session.id
+            return reply
+
+    def new_game(self):
+        game = HangmanGame(store=self.store, event_log=self.event_log, leaderboard=self.leaderboard)
+        game.stats, game.highscore # Read here rather than lazily on the event loop
+        return game
+
+
+async def serve(host, port, **options):
+    server = await HangmanServer(host, port, **options).start()
+    print(f"Serveur du pendu sur {server.host}:{server.port}")
+    try:
+        await server.server.serve_forever()
+    finally:
+        await server.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serveur de parties de pendu (JSON ligne par ligne sur TCP).")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--max-sessions', type=int, default=100000)
+    parser.add_argument('--ttl', type=float, default=600, help="Durée d'inactivité avant expiration (s).")
+    parser.add_argument('--max-inflight', type=int, default=256, help="Requêtes simultanées par connexion.")
+    parser.add_argument('--events', help="Enregistre chaque partie dans ce journal (voir event_log.py).")
+    parser.add_argument('--leaderboard', default='leaderboard.db', help="Base du classement ('' pour aucune).")
+    parser.add_argument('--spill-dir', help="Les sessions évincées ou expirées y sont écrites et reprises à la demande.")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    event_log = None
+    if args.events:
+        from event_log import EventLog
+        event_log = EventLog(args.events)
+    leaderboard = None
+    if args.leaderboard:
+        from leaderboard import Leaderboard
+        leaderboard = Leaderboard(args.leaderboard)
+    try:
+        asyncio.run(serve(args.host, args.port, max_sessions=args.max_sessions, ttl=args.ttl,
+                          max_inflight=args.max_inflight, event_log=event_log, leaderboard=leaderboard,
+                          spill_dir=args.spill_dir))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,173 @@
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import time
+from collections import Counter
+
+from game_logic import HangmanGame, LETTER_BITS
+from solver import FRENCH_LETTER_ORDER
+
+DIFFICULTIES = ['1', '2', '3']
+
+
+def random_strategy(game, rng):
+    unguessed = [letter for letter, bit in LETTER_BITS.items() if not game.guessed_mask & bit]
+    return rng.choice(unguessed) if unguessed else None
+
+
+def frequency_strategy(game, rng):
+    for letter in FRENCH_LETTER_ORDER:
+        if not game.guessed_mask & LETTER_BITS[letter]:
+            return letter
+    return None
+
+
+def solver_strategy(game, rng):
+    return game.suggest_letter()
+
+
+STRATEGIES = {
+    'random': random_strategy,
+    'frequency': frequency_strategy,
+    'solver': solver_strategy,
+}
+
+
+def register_strategy(name, strategy):
+    # Strategies are looked up by name in the workers, so register them at
+    # import time of a module the workers also import.
+    STRATEGIES[name] = strategy
+
+
+def new_bucket():
+    return {'rounds': 0, 'wins': 0, 'misses': 0, 'scores': Counter()}
+
+
+def merge_results(total, partial):
+    for key, bucket in partial.items():
+        merged = total.setdefault(key, new_bucket())
+        merged['rounds'] += bucket['rounds']
+        merged['wins'] += bucket['wins']
+        merged['misses'] += bucket['misses']
+        merged['scores'].update(bucket['scores'])
+    return total
+
+
+def play_round(game, strategy, rng):
+    while not game.game_is_done:
+        guess = strategy(game, rng)
+        if guess is None: # Alphabet exhausted, the word cannot be found
+            return False
+        game.guess_letter(guess)
+    return game.misses < game.max_guesses
+
+
+def run_shard(shard):
+    shard_id, rounds, seed, strategy_name, categories, difficulties = shard
+    rng = random.Random(seed + shard_id)
+    strategy = STRATEGIES[strategy_name]
+    game = HangmanGame(rng=rng)
+    combos = [(category, difficulty) for category in categories for difficulty in difficulties]
+    results = {}
+
+    for i in range(rounds):
+        category, difficulty = combos[(shard_id + i) % len(combos)]
+        game.set_difficulty(difficulty)
+        game.start_new_round('1', category)
+        won = play_round(game, strategy, rng)
+
+        bucket = results.setdefault(f'{category}/{game.difficulty}', new_bucket())
+        bucket['rounds'] += 1
+        bucket['wins'] += won
+        bucket['misses'] += game.misses
+        bucket['scores'][game.score] += 1
+    return rounds, results
+
+
+def percentile(scores, fraction):
+    target = fraction * sum(scores.values())
+    seen = 0
+    for score in sorted(scores):
+        seen += scores[score]
+        if seen >= target:
+            return score
+    return 0
+
+
+def summarize(results):
+    summary = {}
+    for key in sorted(results):
+        bucket = results[key]
+        summary[key] = {
+            'rounds': bucket['rounds'],
+            'win_rate': bucket['wins'] / bucket['rounds'],
+            'avg_misses': bucket['misses'] / bucket['rounds'],
+            'score_p50': percentile(bucket['scores'], 0.5),
+            'score_p90': percentile(bucket['scores'], 0.9),
+            'scores': {str(score): count for score, count in sorted(bucket['scores'].items())},
+        }
+    return summary
+
+
+def simulate(rounds, strategy='frequency', categories=None, difficulties=None,
+             processes=None, shard_size=10000, seed=0, progress=None):
+    categories = categories or HangmanGame().categories()
+    difficulties = difficulties or DIFFICULTIES
+    shards = []
+    for shard_id, start in enumerate(range(0, rounds, shard_size)):
+        shards.append((shard_id, min(shard_size, rounds - start), seed, strategy, categories, difficulties))
+
+    results = {}
+    done = 0
+    start_time = time.perf_counter()
+    with multiprocessing.Pool(processes) as pool:
+        for shard_rounds, partial in pool.imap_unordered(run_shard, shards):
+            merge_results(results, partial)
+            done += shard_rounds
+            if progress:
+                progress(done, rounds, time.perf_counter() - start_time)
+    elapsed = time.perf_counter() - start_time
+    return {
+        'rounds': done,
+        'seconds': elapsed,
+        'rounds_per_second': done / elapsed if elapsed else 0.0,
+        'strategy': strategy,
+        'buckets': summarize(results),
+    }
+
+
+def print_progress(done, total, elapsed):
+    print(f"{done}/{total} parties - {done / elapsed:,.0f} parties/s", flush=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulation de parties de pendu sans interface.")
+    parser.add_argument('--rounds', type=int, default=100000)
+    parser.add_argument('--strategy', choices=sorted(STRATEGIES), default='frequency')
+    parser.add_argument('--category', action='append', dest='categories')
+    parser.add_argument('--difficulty', action='append', dest='difficulties', choices=DIFFICULTIES)
+    parser.add_argument('--processes', type=int, default=os.cpu_count())
+    parser.add_argument('--shard-size', type=int, default=10000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', metavar='FICHIER', help="Écrire le rapport complet en JSON.")
+    args = parser.parse_args()
+
+    report = simulate(args.rounds, args.strategy, args.categories, args.difficulties,
+                      args.processes, args.shard_size, args.seed, print_progress)
+
+    print(f"\n{'Catégorie/Difficulté':<24} {'Parties':>9} {'Victoires':>10} {'Erreurs moy.':>13} {'Score p50':>10} {'Score p90':>10}")
+    for key, bucket in report['buckets'].items():
+        print(f"{key:<24} {bucket['rounds']:>9} {bucket['win_rate']:>10.1%} {bucket['avg_misses']:>13.2f} "
+              f"{bucket['score_p50']:>10} {bucket['score_p90']:>10}")
+    print(f"\n{report['rounds']} parties en {report['seconds']:.2f} s ({report['rounds_per_second']:,.0f} parties/s, "
+          f"{args.processes} processus)")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=4)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,152 @@
+import math
+import random
+import struct
+
+from game_logic import LETTER_BITS, HangmanGame
+from persistence import STAT_KEYS, atomic_write
+
+MAGIC = b'HS'
+VERSION = 2                           # 2 adds the missed words; version 1 is still read
+HEADER = struct.Struct('<2sB')        # magic, version
+STATE = struct.Struct('<BBBiIB3h')    # game mode, difficulty choice, max guesses, score, guessed letters, flags, unsaved stats
+STRING = struct.Struct('<H')
+RNG = struct.Struct('<625Id')         # Mersenne Twister state, next gauss (NaN for none)
+EVENTS = struct.Struct('<QQd')        # event log game id, round id, round start
+
+HINT_USED = 1
+DONE = 2
+OWN_RNG = 4
+LOGGED = 8
+
+DIFFICULTY_CHOICES = {'Facile': 1, 'Moyen': 2, 'Difficile': 3}
+LETTERS_MASK = (1 << len(LETTER_BITS)) - 1
+SNAPSHOT_FILE = 'saved_round.bin'
+
+
+def pack_string(text):
+    data = text.encode('utf-8')
+    return STRING.pack(len(data)) + data
+
+
+def unpack_string(data, offset):
+    length, = STRING.unpack_from(data, offset)
+    offset += STRING.size
+    return data[offset:offset + length].decode('utf-8'), offset + length
+
+
+def dumps(game):
+    # The round as a few dozen bytes: the word itself rather than an index in
+    # lists that may change, the guessed letters as a bitmask, the stats not
+    # yet saved (the round is already counted as played), and the game's own
+    # random generator if it has one.
+    flags = HINT_USED * game.hint_used | DONE * game.game_is_done
+    own_rng = isinstance(game.rng, random.Random)
+    if own_rng:
+        flags |= OWN_RNG
+    if game.event_round is not None:
+        flags |= LOGGED
+    unsaved = game.unsaved_stats()
+    parts = [
+        HEADER.pack(MAGIC, VERSION),
+        STATE.pack(int(game.game_mode or 0), DIFFICULTY_CHOICES.get(game.difficulty, 0), game.max_guesses,
+                   game.score, game.guessed_mask & LETTERS_MASK, flags, *(unsaved.get(key, 0) for key in STAT_KEYS)),
+        pack_string(game.secret_display), pack_string(game.secret_word), pack_string(game.secret_category),
+        pack_string(game.missed_letters), pack_string(game.player or ''), pack_string('\n'.join(game.missed_words)),
+    ]
+    if own_rng:
+        _, state, gauss_next = game.rng.getstate()
+        parts.append(RNG.pack(*state, math.nan if gauss_next is None else gauss_next))
+    if flags & LOGGED:
+        parts.append(EVENTS.pack(game.event_game_id, *game.event_round))
+    return b''.join(parts)
+
+
+def loads(data, game=None):
+    # Puts the round back into game, or a new HangmanGame, as it was when dumped
+    try:
+        magic, version = HEADER.unpack_from(data)
+        if magic != MAGIC or not 1 <= version <= VERSION:
+            raise ValueError("Ce n'est pas une sauvegarde de partie valide.")
+        game_mode, choice, max_guesses, score, guessed, flags, *unsaved = STATE.unpack_from(data, HEADER.size)
+        offset = HEADER.size + STATE.size
+        secret_display, offset = unpack_string(data, offset)
+        secret_word, offset = unpack_string(data, offset)
+        secret_category, offset = unpack_string(data, offset)
+        missed_letters, offset = unpack_string(data, offset)
+        player, offset = unpack_string(data, offset)
+        missed_words = ''
+        if version >= 2:
+            missed_words, offset = unpack_string(data, offset)
+        rng_state = events = None
+        if flags & OWN_RNG:
+            rng_state = RNG.unpack_from(data, offset)
+            offset += RNG.size
+        if flags & LOGGED:
+            events = EVENTS.unpack_from(data, offset)
+    except struct.error:
+        raise ValueError("Sauvegarde de partie tronquée.") from None
+
+    if game is None:
+        game = HangmanGame()
+    if choice:
+        game.set_difficulty(str(choice))
+    game.max_guesses = max_guesses
+    game.secret_display, game.secret_word, game.secret_category = secret_display, secret_word, secret_category
+    event_log, game.event_log = game.event_log, None
+    try:
+        game.start_new_round('3') # Keeps the word set above
+    finally:
+        game.event_log = event_log
+    game.game_mode = str(game_mode) if game_mode else ''
+    for letter in game.hidden_letters():
+        if guessed & LETTER_BITS[letter]:
+            game.reveal_letter(letter)
+    game.missed_letters = missed_letters
+    game.missed_words = tuple(missed_words.split('\n')) if missed_words else ()
+    game.guessed_mask |= guessed
+    game.score = score
+    game.hint_used = bool(flags & HINT_USED)
+    game.game_is_done = bool(flags & DONE)
+    game.player = player or game.player
+    if any(unsaved):
+        for key, count in zip(STAT_KEYS, unsaved):
+            game.stats[key] += count
+
+    if rng_state is not None:
+        *state, gauss_next = rng_state
+        if not isinstance(game.rng, random.Random):
+            game.rng = random.Random()
+        game.rng.setstate((3, tuple(state), None if math.isnan(gauss_next) else gauss_next))
+    if events is not None:
+        game.event_game_id, *event_round = events
+        game.event_round = tuple(event_round)
+    elif game.event_log is not None and game.secret_word and not game.game_is_done:
+        game.event_log.record_round(game) # Logged from here on
+    return game
+
+
+def save(game, path=SNAPSHOT_FILE):
+    atomic_write(path, dumps(game))
+
+
+def load(path=SNAPSHOT_FILE, game=None):
+    with open(path, 'rb') as f:
+        return loads(f.read(), game)
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Affiche une partie sauvegardée.")
+    parser.add_argument('file', nargs='?', default=SNAPSHOT_FILE)
+    args = parser.parse_args()
+
+    game = load(args.file)
+    pattern = ' '.join(c if c in game.correct_letters else '_' for c in game.secret_word)
+    status = 'terminée' if game.game_is_done else 'en cours'
+    print(f"{game.secret_category} ({game.difficulty}, {status}) : {pattern}  "
+          f"manquées : {' '.join([*game.missed_letters, *game.missed_words]) or '-'}  score : {game.score}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,175 @@
+import argparse
+import math
+from collections import Counter
+
+ALPHABET = 'abcdefghijklmnopqrstuvwxyz'
+FRENCH_LETTER_ORDER = 'esaitnrulodcpmvqfbghjxyzwk'
+ENTROPY_LIMIT = 5000 # Above this many candidates, entropy falls back to frequency
+
+
+def bitset_from_indices(indices, size):
+    buffer = bytearray((size + 7) // 8)
+    for i in indices:
+        buffer[i >> 3] |= 1 << (i & 7)
+    return int.from_bytes(buffer, 'little')
+
+
+def iter_bits(bits):
+    data = bits.to_bytes((bits.bit_length() + 7) // 8, 'little')
+    for byte_index, byte in enumerate(data):
+        while byte:
+            low = byte & -byte
+            yield (byte_index << 3) + low.bit_length() - 1
+            byte ^= low
+
+
+class LengthBucket:
+    # Words of one length, with one bitset (a Python int, bit i = word i) per
+    # letter present anywhere and per letter at each position.
+    def __init__(self, words):
+        self.words = words
+        self.length = len(words[0])
+        self.all = (1 << len(words)) - 1
+
+        presence = {}
+        at = [{} for _ in range(self.length)]
+        for i, word in enumerate(words):
+            for position, letter in enumerate(word):
+                at[position].setdefault(letter, []).append(i)
+            for letter in set(word):
+                presence.setdefault(letter, []).append(i)
+
+        size = len(words)
+        self.presence = {letter: bitset_from_indices(indices, size) for letter, indices in presence.items()}
+        self.at = [{letter: bitset_from_indices(indices, size) for letter, indices in column.items()} for column in at]
+
+
+class WordIndex:
+    def __init__(self, words):
+        by_length = {}
+        for word in dict.fromkeys(words):
+            by_length.setdefault(len(word), []).append(word)
+        self.buckets = {length: LengthBucket(bucket) for length, bucket in by_length.items()}
+
+    def __len__(self):
+        return sum(len(bucket.words) for bucket in self.buckets.values())
+
+    def session(self, length):
+        return SolverSession(self.buckets.get(length), length)
+
+    def session_for(self, pattern, missed_letters=''):
+        session = self.session(len(pattern))
+        revealed = {}
+        for position, letter in enumerate(pattern):
+            if letter != '_':
+                revealed.setdefault(letter, []).append(position)
+        for letter, positions in revealed.items():
+            session.update(letter, positions)
+        for letter in missed_letters:
+            session.update(letter, ())
+        return session
+
+    def suggest(self, pattern, missed_letters='', rank='frequency'):
+        return self.session_for(pattern, missed_letters).best_letter(rank)
+
+
+class SolverSession:
+    # Candidate set narrowed in place as each guess lands: a correct letter
+    # keeps the words having it exactly at the revealed positions, a missed
+    # letter drops every word containing it.
+    def __init__(self, bucket, length):
+        self.bucket = bucket
+        self.bits = bucket.all if bucket else 0
+        self.hidden = set(range(length))
+        self.guessed = set()
+
+    def update(self, letter, positions):
+        self.guessed.add(letter)
+        if not self.bits:
+            return
+        bucket = self.bucket
+        if not positions:
+            self.bits &= ~bucket.presence.get(letter, 0)
+            return
+        for position in positions:
+            self.bits &= bucket.at[position].get(letter, 0)
+            self.hidden.discard(position)
+        for position in self.hidden:
+            self.bits &= ~bucket.at[position].get(letter, 0)
+
+    def __len__(self):
+        return self.bits.bit_count()
+
+    def candidates(self):
+        return [self.bucket.words[i] for i in iter_bits(self.bits)] if self.bits else []
+
+    def unguessed(self):
+        return [letter for letter in ALPHABET if letter not in self.guessed]
+
+    def rank(self, rank='frequency'):
+        letters = self.unguessed()
+        if not self.bits:
+            # Word outside the dictionary: plain French letter frequency
+            order = [letter for letter in FRENCH_LETTER_ORDER if letter in letters]
+            return [(letter, float(len(order) - i)) for i, letter in enumerate(order)]
+        presence = self.bucket.presence
+        counts = {letter: (self.bits & presence.get(letter, 0)).bit_count() for letter in letters}
+        letters = [letter for letter in letters if counts[letter]]
+        if rank == 'entropy' and len(self) <= ENTROPY_LIMIT:
+            scores = self.entropy_scores(letters)
+        else:
+            scores = {letter: float(counts[letter]) for letter in letters}
+        # A letter every candidate shares carries no entropy but is a sure hit
+        return sorted(scores.items(), key=lambda item: (-item[1], -counts[item[0]], item[0]))
+
+    def entropy_scores(self, letters):
+        words = self.candidates()
+        total = len(words)
+        groups = {letter: Counter() for letter in letters}
+        for word in words:
+            masks = {}
+            for position, letter in enumerate(word):
+                masks[letter] = masks.get(letter, 0) | (1 << position)
+            for letter in letters:
+                groups[letter][masks.get(letter, 0)] += 1
+        scores = {}
+        for letter, counter in groups.items():
+            scores[letter] = sum(count / total * math.log2(total / count) for count in counter.values())
+        return scores
+
+    def best_letter(self, rank='frequency'):
+        ranking = self.rank(rank)
+        if ranking:
+            return ranking[0][0]
+        letters = self.unguessed()
+        return letters[0] if letters else None
+
+
+def load_words(path):
+    with open(path, encoding='utf-8') as f:
+        return [line.strip().lower() for line in f if line.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Suggère la prochaine lettre pour un motif de pendu.")
+    parser.add_argument('pattern', help="Motif du mot, '_' pour une lettre cachée (ex. b_n_n_).")
+    parser.add_argument('missed', nargs='?', default='', help="Lettres déjà manquées.")
+    parser.add_argument('--words', help="Fichier de mots (un par ligne). Par défaut : tous les mots du jeu.")
+    parser.add_argument('--rank', choices=['frequency', 'entropy'], default='frequency')
+    parser.add_argument('--top', type=int, default=5)
+    args = parser.parse_args()
+
+    if args.words:
+        words = load_words(args.words)
+    else:
+        from game_logic import HangmanGame
+        words = list(HangmanGame().normalized_words())
+
+    session = WordIndex(words).session_for(args.pattern.lower(), args.missed.lower())
+    print(f"{len(session)} mots candidats")
+    for letter, score in session.rank(args.rank)[:args.top]:
+        print(f"{letter} {score:.3f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+import io
+import json
+import random
+
+import pytest
+
+import commands
+from game_logic import HangmanGame
+from hangman_console import HangmanConsole
+from persistence import GameStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = GameStore(str(tmp_path / 'stats.json'), str(tmp_path / 'highscore.txt'))
+    yield store
+    store.close()
+
+
+@pytest.fixture
+def game(store):
+    return HangmanGame(rng=random.Random(0), store=store)
+
+
+def test_round_is_played_to_the_end(game, store):
+    reply = commands.start_round(game, {'cmd': 'new', 'mode': '3', 'word': 'Éclair', 'difficulty': '1'})
+    assert reply['state']['pattern'] == '______' and reply['state']['lives'] == 8
+    reply, finished = commands.play(game, {'cmd': 'guess', 'letter': 'E'})
+    assert reply['result'] == 'correct' and not finished
+    reply, finished = commands.play(game, {'cmd': 'play', 'guesses': ['z', 'clair']})
+    assert [step[:2] for step in reply['steps']] == [('z', 'incorrect'), ('clair', 'incorrect')]
+    reply, finished = commands.play(game, {'cmd': 'word', 'word': 'eclair'})
+    assert finished and reply['state']['won'] and reply['state']['word'] == 'éclair'
+    assert commands.play(game, {'cmd': 'guess', 'letter': 'a'}) == ({'ok': False, 'error': 'Partie terminée'}, False)
+    commands.finish_round(game)
+    assert store.load() == {'played': 1, 'wins': 1, 'losses': 0, 'highscore': game.score, 'generation': 0}
+
+
+def test_play_without_steps_returns_the_state_only(game):
+    commands.start_round(game, {'cmd': 'new', 'mode': '3', 'word': 'loup'})
+    reply, finished = commands.play(game, {'cmd': 'play', 'guesses': list('loup'), 'steps': False})
+    assert finished and 'steps' not in reply and reply['state']['won']
+
+
+@pytest.mark.parametrize('request_', [
+    {'cmd': 'new', 'mode': '3', 'word': ''},
+    {'cmd': 'new', 'mode': '3', 'word': '42'},
+    {'cmd': 'new', 'mode': '3', 'word': '!!'},
+    {'cmd': 'new', 'mode': '3'},
+    {'cmd': 'new', 'mode': '1', 'category': 'Planètes'},
+    {'cmd': 'new', 'mode': '4'},
+])
+def test_invalid_new_requests_are_refused(game, request_):
+    with pytest.raises(commands.REQUEST_ERRORS):
+        commands.start_round(game, request_)
+    assert not game.secret_word
+
+
+@pytest.mark.parametrize('request_', [
+    {'cmd': 'guess', 'letter': 'ab'},
+    {'cmd': 'guess', 'letter': '1'},
+    {'cmd': 'word', 'word': 'hint'},
+    {'cmd': 'word', 'word': 'x'},
+    {'cmd': 'word', 'word': 'a' * 65},
+    {'cmd': 'play', 'guesses': ['a', '?']},
+    {'cmd': 'jouer'},
+])
+def test_invalid_guesses_change_nothing(game, request_):
+    commands.start_round(game, {'cmd': 'new', 'mode': '3', 'word': 'crapaud'})
+    before = game.state()
+    with pytest.raises(commands.REQUEST_ERRORS):
+        commands.play(game, request_)
+    assert game.state() == before
+
+
+def test_two_player_words_have_no_length_limit(game):
+    word = 'ab' * 2500
+    reply = commands.start_round(game, {'cmd': 'new', 'mode': '3', 'word': word})
+    assert len(reply['state']['pattern']) == len(word)
+    reply, finished = commands.play(game, {'cmd': 'play', 'guesses': ['a', 'b'], 'steps': False})
+    assert finished and reply['state']['won']
+
+
+def test_headless_console_answers_each_line(tmp_path, monkeypatch, store):
+    monkeypatch.chdir(tmp_path)
+    console = HangmanConsole(leaderboard=None)
+    console.game.store = store
+    lines = [
+        {'id': 1, 'cmd': 'new', 'mode': '3', 'word': 'chat'},
+        {'id': 2, 'cmd': 'guess', 'letter': 'c'},
+        'pas du JSON',
+        {'id': 3, 'cmd': 'guess', 'letter': '7'},
+        {'id': 4, 'cmd': 'play', 'guesses': ['h', 'a', 't']},
+        {'id': 5, 'cmd': 'new', 'mode': '3', 'word': '!!'},
+        {'id': 6, 'cmd': 'state'},
+    ]
+    stdin = io.BytesIO(b''.join((line if isinstance(line, str) else json.dumps(line)).encode() + b'\n'
+                                for line in lines))
+    stdout = io.BytesIO()
+    console.drive(stdin, stdout, batch_size=40) # Lines cut across reads
+    replies = [json.loads(line) for line in stdout.getvalue().splitlines()]
+    assert [reply.get('id') for reply in replies] == [1, 2, None, 3, 4, 5, 6]
+    assert [reply['ok'] for reply in replies] == [True, True, False, False, True, False, True]
+    assert replies[4]['state']['won'] and replies[6]['state']['pattern'] == 'chat'
+    assert store.load_stats() == {'played': 1, 'wins': 1, 'losses': 0}
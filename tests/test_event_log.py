@@ -0,0 +1,104 @@
+import random
+
+import pytest
+
+from event_log import HEADER, MAGIC, EventLog, read_rounds, replay_round
+from game_logic import HangmanGame
+from persistence import GameStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = GameStore(str(tmp_path / 'stats.json'), str(tmp_path / 'highscore.txt'))
+    yield store
+    store.close()
+
+
+def new_game(store, event_log, seed=0):
+    game = HangmanGame(rng=random.Random(seed), store=store, event_log=event_log)
+    game.stats = {'played': 0, 'wins': 0, 'losses': 0}
+    return game
+
+
+def play_rounds(game, rounds, rng):
+    for _ in range(rounds):
+        game.start_new_round('1', rng.choice(game.categories()))
+        for i, letter in enumerate('esaitnrulodcpmvqfbghjxyzwk'):
+            if game.game_is_done:
+                break
+            if game.score >= 50 and not game.hint_used:
+                game.use_hint()
+            elif i == 3:
+                game.guess_word('mauvais')
+            else:
+                game.guess_letter(letter)
+
+
+def test_logged_rounds_replay_with_the_same_results(tmp_path, store):
+    path = str(tmp_path / 'events.log')
+    event_log = EventLog(path)
+    play_rounds(new_game(store, event_log), 50, random.Random(1))
+    event_log.close()
+    rounds = list(read_rounds(path))
+    assert len(rounds) == 50 and all(logged.done for logged in rounds)
+    assert any(guess == 'hint' for logged in rounds for _, guess, _, _ in logged.guesses)
+    game = None
+    for logged in rounds:
+        game = replay_round(logged, game)
+
+
+def test_interleaved_games_and_abandoned_rounds(tmp_path, store):
+    path = str(tmp_path / 'events.log')
+    event_log = EventLog(path)
+    first, second = new_game(store, event_log, 1), new_game(store, event_log, 2)
+    first.set_player_word('chat')
+    first.start_new_round('3')
+    second.set_player_word('loup')
+    second.start_new_round('3')
+    first.guess_letter('z')
+    second.guess_word('loup')
+    first.set_player_word('chien')
+    first.start_new_round('3') # Leaves 'chat' unfinished
+    event_log.close()
+    rounds = [(logged.secret_word, logged.done, len(logged.guesses)) for logged in read_rounds(path)]
+    assert rounds == [('loup', True, 1), ('chat', False, 1), ('chien', False, 0)]
+
+
+def test_open_rounds_past_max_open_are_abandoned(tmp_path, store):
+    path = str(tmp_path / 'events.log')
+    event_log = EventLog(path)
+    games = [new_game(store, event_log, seed) for seed in range(5)]
+    for game in games:
+        game.set_player_word('chat')
+        game.start_new_round('3')
+    for letter in 'chat':
+        games[-1].guess_letter(letter)
+    event_log.close()
+    rounds = list(read_rounds(path, max_open=2))
+    assert [logged.game_id for logged in rounds] == [game.event_game_id for game in games[:3] + games[4:] + games[3:4]]
+    assert [logged.done for logged in rounds] == [False, False, False, True, False]
+
+
+def test_version_1_log_is_read_and_appended_in_its_own_format(tmp_path, store):
+    path = tmp_path / 'events.log'
+    path.write_bytes(HEADER.pack(MAGIC, 1))
+    event_log = EventLog(str(path))
+    assert event_log.guess_format.size == 15
+    game = new_game(store, event_log)
+    game.set_player_word('chat')
+    game.start_new_round('3')
+    for guess in ('e', 'chien', 'chat'):
+        game.guess(guess)
+    event_log.close()
+    logged, = read_rounds(str(path))
+    assert [guess for _, guess, _, _ in logged.guesses] == ['e', 'chien', 'chat']
+    replay_round(logged)
+
+
+def test_other_files_are_refused(tmp_path):
+    path = tmp_path / 'events.log'
+    path.write_bytes(b'pas un journal')
+    with pytest.raises(ValueError):
+        list(read_rounds(str(path)))
+    with pytest.raises(ValueError):
+        EventLog(str(path))
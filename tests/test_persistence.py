@@ -0,0 +1,69 @@
+import glob
+import multiprocessing
+
+from persistence import GameStore
+
+
+def make_store(tmp_path, **options):
+    return GameStore(str(tmp_path / 'stats.json'), str(tmp_path / 'highscore.txt'), **options)
+
+
+def record_rounds(directory, rounds):
+    store = GameStore(f'{directory}/stats.json', f'{directory}/highscore.txt', compact_size=512)
+    for i in range(rounds):
+        store.record_stats({'played': 1, 'wins': i % 2, 'losses': 1 - i % 2})
+    store.record_highscore(rounds)
+    store.close()
+
+
+def test_records_are_read_back_by_another_store(tmp_path):
+    store = make_store(tmp_path)
+    store.record_stats({'played': 2, 'wins': 1, 'losses': 1})
+    store.record_highscore(70)
+    store.record_highscore(40)
+    store.close()
+    assert make_store(tmp_path).load() == {'played': 2, 'wins': 1, 'losses': 1, 'highscore': 70, 'generation': 0}
+
+
+def test_torn_last_record_is_ignored(tmp_path):
+    store = make_store(tmp_path)
+    store.record_stats({'played': 1, 'wins': 1, 'losses': 0})
+    store.close()
+    with open(tmp_path / 'stats.json.0.log', 'a') as f:
+        f.write('s 5 5') # Crash in the middle of a write
+    assert make_store(tmp_path).load_stats() == {'played': 1, 'wins': 1, 'losses': 0}
+
+
+def test_compaction_keeps_totals_and_one_log(tmp_path):
+    store = make_store(tmp_path, compact_size=64)
+    for _ in range(50):
+        store.record_stats({'played': 1, 'wins': 1, 'losses': 0})
+    store.close()
+    totals = make_store(tmp_path).load()
+    assert totals['played'] == totals['wins'] == 50
+    assert totals['generation'] > 0
+    assert glob.glob(str(tmp_path / 'stats.json.*.log')) == [str(tmp_path / f"stats.json.{totals['generation']}.log")]
+
+
+def test_crash_between_snapshot_and_log_removal(tmp_path):
+    # The new snapshot is written before the old log goes: it must not be counted twice
+    store = make_store(tmp_path)
+    store.record_stats({'played': 3, 'wins': 2, 'losses': 1})
+    store.close()
+    old_log = (tmp_path / 'stats.json.0.log').read_bytes()
+    store = make_store(tmp_path)
+    store.compact()
+    store.close()
+    (tmp_path / 'stats.json.0.log').write_bytes(old_log)
+    assert make_store(tmp_path).load_stats() == {'played': 3, 'wins': 2, 'losses': 1}
+
+
+def test_concurrent_appends_from_processes(tmp_path):
+    workers = [multiprocessing.Process(target=record_rounds, args=(str(tmp_path), 100)) for _ in range(4)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    assert all(worker.exitcode == 0 for worker in workers)
+    totals = make_store(tmp_path).load()
+    assert (totals['played'], totals['wins'], totals['losses'], totals['highscore']) == (400, 200, 200, 100)
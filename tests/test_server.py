@@ -0,0 +1,156 @@
+import asyncio
+import json
+import os
+import time
+
+import pytest
+
+from persistence import GameStore
+from server import HangmanServer
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = GameStore(str(tmp_path / 'stats.json'), str(tmp_path / 'highscore.txt'))
+    yield store
+    store.close()
+
+
+class Client:
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.next_id = 0
+
+    async def send(self, **request):
+        self.next_id += 1
+        request['id'] = self.next_id
+        self.writer.write(json.dumps(request).encode() + b'\n')
+        reply = json.loads(await self.reader.readline())
+        assert reply.pop('id') == self.next_id
+        return reply
+
+
+def serve(server, client):
+    # Runs client(server, Client) against a started server, then closes both
+    async def main():
+        await server.start()
+        reader, writer = await asyncio.open_connection(server.host, server.port)
+        try:
+            return await client(server, Client(reader, writer))
+        finally:
+            writer.close()
+            await server.close()
+    return asyncio.run(main())
+
+
+def test_protocol(store):
+    async def client(server, connection):
+        reply = await connection.send(cmd='new', mode='3', word='chat', difficulty='3')
+        session = reply['session']
+        assert reply['ok'] and reply['state']['lives'] == 4
+        reply = await connection.send(cmd='guess', session=session, letter='x')
+        assert reply == {'ok': True, 'result': 'incorrect', 'session': session, 'state': reply['state']}
+        reply = await connection.send(cmd='play', session=session, guesses=['c', 'h', 'hint', 'chat'])
+        assert [step[:2] for step in reply['steps']] == [['c', 'correct'], ['h', 'correct'], ['hint', 'no_hint'],
+                                                         ['chat', 'correct']]
+        assert reply['state']['won']
+        assert (await connection.send(cmd='hint', session=session)) == {
+            'ok': False, 'error': 'Partie terminée', 'session': session}
+        reply = await connection.send(cmd='new', session=session, mode='1', category='Fruits')
+        assert reply['session'] == session and reply['state']['category'] == 'Fruits'
+        assert (await connection.send(cmd='close', session=session)) == {'ok': True, 'session': session}
+        assert not (await connection.send(cmd='state', session=session))['ok']
+        return len(server.sessions)
+
+    assert serve(HangmanServer(port=0, store=store), client) == 0
+    assert store.load_stats() == {'played': 1, 'wins': 1, 'losses': 0}
+
+
+def test_invalid_requests_take_no_session(store):
+    async def client(server, connection):
+        replies = [await connection.send(cmd='new', mode='3', word=word) for word in ('', '42', '!!')]
+        replies.append(await connection.send(cmd='new', mode='1', category='Planètes'))
+        replies.append(await connection.send(cmd='guess', session='inconnue', letter='a'))
+        replies.append(await connection.send(cmd='jouer'))
+        connection.writer.write(b'{pas du JSON\n')
+        replies.append(json.loads(await connection.reader.readline()))
+        return replies, len(server.sessions)
+
+    replies, sessions = serve(HangmanServer(port=0, store=store, max_sessions=1), client)
+    assert not any(reply['ok'] for reply in replies)
+    assert sessions == 0
+
+
+def test_full_server_keeps_busy_sessions(store):
+    async def client(server, connection):
+        first = (await connection.send(cmd='new', mode='3', word='chat'))['session']
+        async with server.sessions.get(first).lock: # A request still running on it
+            reply = await connection.send(cmd='new', mode='3', word='loup')
+        return reply, list(server.sessions.sessions)
+
+    reply, sessions = serve(HangmanServer(port=0, store=store, max_sessions=1), client)
+    assert not reply['ok'] and len(sessions) == 1
+
+
+def test_evicted_session_is_spilled_and_restored(tmp_path, store):
+    async def client(server, connection):
+        first = (await connection.send(cmd='new', mode='3', word='crapaud'))['session']
+        await connection.send(cmd='guess', session=first, letter='x')
+        second = (await connection.send(cmd='new', mode='3', word='loup'))['session']
+        assert list(server.sessions.sessions) == [second] and first in server.sessions.spilled
+        await server.write_spilled()
+        assert os.listdir(tmp_path / 'spill') == [first]
+        reply = await connection.send(cmd='guess', session=first, letter='a')
+        assert reply['state']['pattern'] == '__a_a__' and reply['state']['missed'] == 'x'
+        assert server.sessions.restored == 1 and second in server.sessions.spilled
+        return first, second
+
+    spill_dir = str(tmp_path / 'spill')
+    first, second = serve(HangmanServer(port=0, store=store, max_sessions=1, spill_dir=spill_dir), client)
+    assert sorted(os.listdir(spill_dir)) == sorted([first, second]) # Written on close
+
+    async def after_restart(server, connection):
+        return await connection.send(cmd='state', session=second), await connection.send(cmd='state', session=first)
+
+    second_state, first_state = serve(HangmanServer(port=0, store=store, spill_dir=spill_dir), after_restart)
+    assert second_state['state']['category'] == 'Deux Joueurs' and first_state['state']['pattern'] == '__a_a__'
+    assert sorted(os.listdir(spill_dir)) == sorted([first, second]) # Spilled again by the second close
+
+
+def test_spilled_sessions_expire(tmp_path, store):
+    spill_dir = tmp_path / 'spill'
+
+    async def client(server, connection):
+        sessions = [(await connection.send(cmd='new', mode='3', word=word))['session'] for word in ('chat', 'loup')]
+        for session in list(server.sessions.sessions):
+            server.sessions.remove(session)
+        await server.write_spilled()
+        old = time.time() - 2 * server.sessions.ttl
+        for session in sessions:
+            os.utime(spill_dir / session, (old, old))
+        expired = await connection.send(cmd='state', session=sessions[0]) # Not swept yet
+        server.sessions.expire_spilled()
+        return expired, os.listdir(spill_dir)
+
+    expired, left = serve(HangmanServer(port=0, store=store, ttl=60, spill_dir=str(spill_dir)), client)
+    assert expired == {'ok': False, 'error': 'Session inconnue ou expirée'}
+    assert left == []
+
+
+def test_idle_sessions_are_spilled_and_closed_ones_dropped(tmp_path, store):
+    spill_dir = tmp_path / 'spill'
+
+    async def client(server, connection):
+        idle = (await connection.send(cmd='new', mode='3', word='chat'))['session']
+        closed = (await connection.send(cmd='new', mode='3', word='loup'))['session']
+        server.sessions.sessions[idle].last_seen -= 2 * server.sessions.ttl
+        server.sessions.expire()
+        await server.write_spilled()
+        assert list(server.sessions.sessions) == [closed] and os.listdir(spill_dir) == [idle]
+        replies = [await connection.send(cmd='close', session=session) for session in (idle, closed, closed)]
+        return replies, len(server.sessions), os.listdir(spill_dir)
+
+    replies, sessions, left = serve(HangmanServer(port=0, store=store, ttl=60, spill_dir=str(spill_dir)), client)
+    assert [reply['ok'] for reply in replies] == [True, True, False]
+    assert sessions == 0 and left == []
@@ -0,0 +1,28 @@
+import random
+import sys
+
+import snapshot
+from game_logic import HangmanGame
+from persistence import GameStore
+
+
+def test_main_shows_saved_round(tmp_path, monkeypatch, capsys):
+    store = GameStore(str(tmp_path / 'stats.json'), str(tmp_path / 'highscore.txt'))
+    game = HangmanGame(rng=random.Random(0), store=store)
+    game.stats = {'played': 0, 'wins': 0, 'losses': 0}
+    game.set_player_word('crapaud')
+    game.start_new_round('3')
+    game.guess_letter('a')
+    game.guess_letter('z')
+    game.guess_word('chameau')
+    path = tmp_path / 'saved_round.bin'
+    snapshot.save(game, str(path))
+
+    monkeypatch.setattr(sys, 'argv', ['snapshot.py', str(path)])
+    monkeypatch.chdir(tmp_path) # load() builds a game on the default stats files
+    snapshot.main()
+    output = capsys.readouterr().out
+    assert '_ _ a _ a _ _' in output
+    assert 'manquées : z chameau' in output
+    assert 'score : 10' in output
+    store.close()
@@ -0,0 +1,85 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from word_source import OnlineWordSource
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            status, body = server.answers[min(server.requests, len(server.answers) - 1)]
+            server.requests += 1
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub():
+    # Answers (status, JSON body) in turn, then the last one for good
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+    server.answers = [(200, ['chat'])]
+    server.requests = 0
+    server.lock = threading.Lock()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def make_source(stub, tmp_path, **options):
+    options.setdefault('max_backoff', 0.01)
+    return OnlineWordSource(f'http://127.0.0.1:{stub.server_port}/word', cache_file=str(tmp_path / 'words.json'),
+                            **options)
+
+
+def test_words_are_buffered_and_cached(stub, tmp_path):
+    stub.answers = [(200, ['Chat', 'chien', 'été', 42])]
+    source = make_source(stub, tmp_path, buffer_size=40).start()
+    try:
+        assert source.ready.wait(5)
+        assert source.get_word() in ('chat', 'chien')
+    finally:
+        source.close()
+    assert set(json.loads((tmp_path / 'words.json').read_text())) == {'chat', 'chien'}
+    assert make_source(stub, tmp_path).get_word() in ('chat', 'chien') # From the cache, without a request
+
+
+@pytest.mark.parametrize('payload', [None, {}, 'chat'])
+def test_payload_other_than_a_list_is_a_failure(stub, tmp_path, payload):
+    stub.answers = [(200, payload), (200, ['chat'])]
+    source = make_source(stub, tmp_path).start()
+    try:
+        assert source.ready.wait(5)
+        assert source.get_word() == 'chat'
+        assert source.stats()['failures'] == 1
+        assert source.thread.is_alive()
+    finally:
+        source.close()
+
+
+def test_circuit_opens_after_repeated_failures(stub, tmp_path):
+    stub.answers = [(503, {'error': 'indisponible'})]
+    source = make_source(stub, tmp_path, failure_threshold=3, reset_timeout=60).start()
+    try:
+        for _ in range(500):
+            if source.stats()['circuit_opened']:
+                break
+            source.stopped.wait(0.01)
+        stats = source.stats()
+        assert stats['circuit_open'] and stats['circuit_opened'] == 1
+        assert stats['failures'] == stub.requests == 3
+        assert source.get_word() is None
+    finally:
+        source.close()
@@ -0,0 +1,200 @@
+import math
+import random
+
+from wordpack import normalize_word
+
+# Letter frequencies of French text (%), accents folded
+LETTER_FREQUENCIES = {
+    'e': 14.7, 's': 7.9, 'a': 7.6, 'i': 7.5, 't': 7.2, 'n': 7.1, 'r': 6.6, 'u': 6.3, 'l': 5.5,
+    'o': 5.4, 'd': 3.7, 'c': 3.3, 'p': 3.0, 'm': 3.0, 'v': 1.8, 'q': 1.4, 'f': 1.1, 'b': 0.9,
+    'g': 0.9, 'h': 0.7, 'j': 0.6, 'x': 0.4, 'y': 0.3, 'z': 0.1, 'w': 0.1, 'k': 0.05,
+}
+RARITY = {letter: -math.log(frequency / 100) for letter, frequency in LETTER_FREQUENCIES.items()}
+MAX_RARITY = max(RARITY.values())
+# Raw scores of the built-in words mostly fall between these two; they are
+# stretched to 0-1 so that the levels below mean the same in every category
+CALIBRATION = (0.4, 0.75)
+
+# Difficulty -> (calibrated score the picks centre on, spread around it)
+LEVELS = {'Facile': (0.2, 0.25), 'Moyen': (0.5, 0.3), 'Difficile': (0.8, 0.25)}
+BLOCK_SIZE = 4096
+
+
+def difficulty_score(normalized):
+    # 0 (easy) to 1 (hard): short words, many distinct letters and rare
+    # letters all leave the player fewer chances to recover from a miss.
+    length = sum(1 for c in normalized if c in RARITY)
+    if not length:
+        return 0.0
+    unique = RARITY.keys() & set(normalized)
+    shortness = 1 - min(max(length - 3, 0), 9) / 9
+    distinct = len(unique) / length
+    rarity = sum(RARITY[c] for c in unique) / len(unique) / MAX_RARITY
+    raw = 0.35 * shortness + 0.25 * distinct + 0.4 * rarity
+    low, high = CALIBRATION
+    return min(max((raw - low) / (high - low), 0.0), 1.0)
+
+
+def level_weights(score):
+    return {level: math.exp(-((score - target) / spread) ** 2) for level, (target, spread) in LEVELS.items()}
+
+
+def alias_table(weights):
+    # Vose's alias method: one uniform draw then one comparison per sample
+    n = len(weights)
+    total = sum(weights)
+    scaled = [weight * n / total for weight in weights]
+    probability = [1.0] * n
+    alias = list(range(n))
+    small = [i for i, weight in enumerate(scaled) if weight < 1.0]
+    large = [i for i, weight in enumerate(scaled) if weight >= 1.0]
+    while small and large:
+        less, more = small.pop(), large.pop()
+        probability[less] = scaled[less]
+        alias[less] = more
+        scaled[more] -= 1.0 - scaled[less]
+        (small if scaled[more] < 1.0 else large).append(more)
+    return probability, alias
+
+
+class RecentWords:
+    # The last maxlen words a player got and when, in O(1) per check. Words
+    # stay in last_seen in the order they were last given, so the oldest is
+    # the first key; no separate queue, whose empty block alone costs more
+    # than the rest of a session.
+    __slots__ = ('last_seen', 'count', 'maxlen')
+
+    def __init__(self, maxlen=50):
+        self.last_seen = {}
+        self.count = 0
+        self.maxlen = maxlen
+
+    def age(self, word):
+        # Picks since word was last given, infinite if not in the history
+        last = self.last_seen.get(word)
+        return self.count - last if last is not None else math.inf
+
+    def add(self, word):
+        self.count += 1
+        self.last_seen.pop(word, None) # Moves it to the end
+        self.last_seen[word] = self.count
+        oldest = next(iter(self.last_seen))
+        if self.count - self.last_seen[oldest] >= self.maxlen:
+            del self.last_seen[oldest]
+
+
+class CategoryTables:
+    # Words in blocks of BLOCK_SIZE, each with an alias table per level, and
+    # a small alias table per level over the blocks' total weights. A pick
+    # draws a block then a word; adding words only rebuilds the last, partly
+    # filled block and the top-level tables.
+    def __init__(self, words=()):
+        self.words = []
+        self.known = set()
+        self.weights = {level: [] for level in LEVELS}
+        self.blocks = {level: [] for level in LEVELS}   # (probability, alias) per block
+        self.totals = {level: [] for level in LEVELS}   # Total weight per block
+        self.top = {}
+        self.samplers = {}
+        self.add(words)
+
+    def add(self, words):
+        first = len(self.words)
+        for word in words:
+            if word in self.known:
+                continue
+            self.known.add(word)
+            self.words.append(word)
+            for level, weight in level_weights(difficulty_score(normalize_word(word))).items():
+                self.weights[level].append(weight)
+        if len(self.words) == first:
+            return 0
+        for level, weights in self.weights.items():
+            blocks, totals = self.blocks[level], self.totals[level]
+            for block in range(first // BLOCK_SIZE, (len(weights) - 1) // BLOCK_SIZE + 1):
+                block_weights = weights[block * BLOCK_SIZE:(block + 1) * BLOCK_SIZE]
+                del blocks[block:], totals[block:]
+                blocks.append(alias_table(block_weights))
+                totals.append(sum(block_weights))
+            self.top[level] = alias_table(totals)
+        self.samplers.clear()
+        return len(self.words) - first
+
+    def sampler(self, level):
+        # Function drawing one word from a uniform() source
+        sampler = self.samplers.get(level)
+        if sampler is not None:
+            return sampler
+        words = self.words
+        top_probability, top_alias = self.top[level]
+        blocks = self.blocks[level]
+        if len(blocks) == 1: # Most categories: a single alias table
+            probability, alias = blocks[0]
+            size = len(probability)
+
+            def sampler(uniform):
+                draw = uniform() * size
+                index = int(draw)
+                return words[index if draw - index < probability[index] else alias[index]]
+        else:
+            block_count = len(blocks)
+
+            def sampler(uniform):
+                draw = uniform() * block_count
+                block = int(draw)
+                if draw - block >= top_probability[block]:
+                    block = top_alias[block]
+                probability, alias = blocks[block]
+                draw = uniform() * len(probability)
+                index = int(draw)
+                return words[block * BLOCK_SIZE + (index if draw - index < probability[index] else alias[index])]
+        self.samplers[level] = sampler
+        return sampler
+
+
+class WordSelector:
+    # Weighted picks from a category -> words mapping, favouring words whose
+    # difficulty score matches the level. A category's tables are built on
+    # its first pick; add_words extends them in place.
+    def __init__(self, source, tries=8):
+        self.source = source
+        self.tries = tries
+        self.categories = {}
+
+    def category(self, name):
+        tables = self.categories.get(name)
+        if tables is None:
+            tables = self.categories[name] = CategoryTables(self.source[name])
+        return tables
+
+    def add_words(self, name, words):
+        if name not in self.categories and name not in self.source:
+            self.categories[name] = CategoryTables()
+        return self.category(name).add(words)
+
+    def pick(self, name, level='Moyen', recent=None, rng=random):
+        category = self.categories.get(name) or self.category(name)
+        draw = category.sampler(level if level in LEVELS else 'Moyen')
+        if recent is None:
+            return draw(rng.random)
+        # A small category cannot avoid its whole history: only its last
+        # n // 2 picks are excluded then
+        window = min(recent.maxlen, len(category.words) // 2)
+        best, best_age = None, -1
+        for _ in range(self.tries):
+            word = draw(rng.random)
+            age = recent.age(word)
+            if age >= window:
+                best = word
+                break
+            if age > best_age: # Otherwise the least recent of the draws
+                best, best_age = word, age
+        recent.add(best)
+        return best
+
+    def pick_many(self, name, count, level='Moyen', rng=random):
+        # Independent picks without repeat avoidance, e.g. for simulations
+        category = self.categories.get(name) or self.category(name)
+        draw = category.sampler(level if level in LEVELS else 'Moyen')
+        uniform = rng.random
+        return [draw(uniform) for _ in range(count)]
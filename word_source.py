@@ -0,0 +1,176 @@
+import json
+import logging
+import os
+import random
+import threading
+import time
+from collections import deque
+
+import requests
+
+import metrics
+
+API_URL = "https://random-word-api.herokuapp.com/word"
+WORD_CACHE_FILE = 'online_words.json'
+
+logger = logging.getLogger(__name__)
+
+
+def is_valid_word(word):
+    return bool(word) and all('a' <= c <= 'z' for c in word)
+
+
+class OnlineWordSource:
+    # Keeps a bounded buffer of online words filled by a background thread so
+    # that get_word never waits on the network. Words already fetched are kept
+    # in an on-disk cache used when the buffer runs dry.
+    def __init__(self, url=API_URL, batch_size=20, buffer_size=100, low_water=20,
+                 cache_file=WORD_CACHE_FILE, cache_size=5000, connect_timeout=3.05, read_timeout=5,
+                 max_backoff=60, failure_threshold=3, reset_timeout=30, session=None, rng=None):
+        self.url = url
+        self.batch_size = batch_size
+        self.buffer = deque(maxlen=buffer_size)
+        self.low_water = low_water
+        self.cache_file = cache_file
+        self.cache_size = cache_size
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_backoff = max_backoff
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.session = session or requests.Session()
+        self.rng = rng or random.Random()
+
+        self.lock = threading.Lock()
+        self.wake = threading.Event()
+        self.stopped = threading.Event()
+        self.thread = None
+        self.consecutive_failures = 0
+        self.open_until = 0.0
+        self.counters = {
+            'hits': 0, 'cache_hits': 0, 'misses': 0,
+            'requests': 0, 'failures': 0, 'words_fetched': 0, 'circuit_opened': 0,
+            'latency_count': 0, 'latency_total': 0.0, 'latency_max': 0.0,
+        }
+        self.cache = self.load_cache()
+        self.ready = threading.Event() # Set once get_word has something to return
+        if self.cache:
+            self.ready.set()
+
+    def load_cache(self):
+        if self.cache_file and os.path.exists(self.cache_file):
+            with open(self.cache_file, 'r') as f:
+                try: return [word for word in json.load(f) if is_valid_word(word)]
+                except (json.JSONDecodeError, TypeError): return []
+        return []
+
+    def save_cache(self):
+        if not self.cache_file:
+            return
+        with self.lock:
+            words = list(self.cache)
+        tmp_file = f'{self.cache_file}.tmp'
+        with open(tmp_file, 'w') as f:
+            json.dump(words, f)
+        os.replace(tmp_file, self.cache_file)
+
+    def start(self):
+        if self.thread is None:
+            self.thread = threading.Thread(target=self.run, name='online-word-source', daemon=True)
+            self.thread.start()
+        return self
+
+    def close(self):
+        self.stopped.set()
+        self.wake.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+        self.session.close()
+
+    def get_word(self):
+        with self.lock:
+            if self.buffer:
+                word = self.buffer.popleft()
+                self.counters['hits'] += 1
+            elif self.cache:
+                word = self.rng.choice(self.cache)
+                self.counters['cache_hits'] += 1
+            else:
+                word = None
+                self.counters['misses'] += 1
+            refill = len(self.buffer) < self.low_water
+        if refill:
+            self.wake.set()
+        return word
+
+    def stats(self):
+        with self.lock:
+            stats = dict(self.counters)
+            stats['buffered'] = len(self.buffer)
+            stats['cached'] = len(self.cache)
+        stats['circuit_open'] = time.monotonic() < self.open_until
+        stats['latency_avg'] = stats['latency_total'] / stats['latency_count'] if stats['latency_count'] else 0.0
+        return stats
+
+    def fetch_batch(self):
+        start = time.perf_counter()
+        try:
+            response = self.session.get(self.url, params={'lang': 'fr', 'number': self.batch_size}, timeout=self.timeout)
+            response.raise_for_status()
+            words = response.json()
+            if not isinstance(words, list): # e.g. an error object: a failed fetch
+                raise ValueError(f'réponse inattendue ({type(words).__name__})')
+            words = [word.lower() for word in words if isinstance(word, str)]
+        finally:
+            latency = time.perf_counter() - start
+            with self.lock:
+                self.counters['requests'] += 1
+                self.counters['latency_count'] += 1
+                self.counters['latency_total'] += latency
+                self.counters['latency_max'] = max(self.counters['latency_max'], latency)
+            if metrics.enabled(): # Imported after metrics were enabled, so never wrapped
+                metrics.registry.record(metrics.ONLINE_REQUEST, latency)
+        return [word for word in words if is_valid_word(word)]
+
+    def run(self):
+        backoff = 0.0
+        while not self.stopped.is_set():
+            with self.lock:
+                full = len(self.buffer) >= self.buffer.maxlen - self.batch_size
+            if full:
+                self.wake.wait()
+                self.wake.clear()
+                continue
+
+            wait = max(backoff, self.open_until - time.monotonic())
+            if wait > 0 and self.stopped.wait(wait):
+                break
+
+            try:
+                words = self.fetch_batch()
+            except (requests.exceptions.RequestException, ValueError) as e:
+                logger.info("Échec de récupération des mots en ligne : %s", e)
+                with self.lock:
+                    self.counters['failures'] += 1
+                self.consecutive_failures += 1
+                backoff = min(self.max_backoff, max(0.5, backoff * 2)) * self.rng.uniform(0.8, 1.2)
+                if self.consecutive_failures >= self.failure_threshold:
+                    # Open: no request until reset_timeout, then a single trial
+                    self.open_until = time.monotonic() + self.reset_timeout
+                    self.consecutive_failures = self.failure_threshold - 1
+                    with self.lock:
+                        self.counters['circuit_opened'] += 1
+                continue
+
+            # An answer with no usable word still backs off, just without
+            # counting towards the circuit breaker.
+            backoff = 0.0 if words else min(self.max_backoff, max(0.5, backoff * 2))
+            self.consecutive_failures = 0
+            self.open_until = 0.0
+            with self.lock:
+                self.buffer.extend(words)
+                self.counters['words_fetched'] += len(words)
+                self.cache = list(dict.fromkeys(self.cache + words))[-self.cache_size:]
+            if words:
+                self.ready.set()
+                self.save_cache()
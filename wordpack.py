@@ -0,0 +1,212 @@
+import bisect
+import mmap
+import random
+import struct
+import sys
+import unicodedata
+
+MAGIC = b'HWPK'
+VERSION = 2                              # 2 drops the per-word letter masks; version 1 is still read
+HEADER = struct.Struct('<4sHH')          # magic, version, category count
+CATEGORY = struct.Struct('<HIH')         # name length, word count, bucket count
+BUCKET = struct.Struct('<HIQQQ')         # length, count, offsets, normalized, display
+BUCKET_FORMATS = {1: struct.Struct('<HIQQQQ'), 2: BUCKET} # Version 1 has a masks offset after the offsets
+OFFSET = struct.Struct('<I')
+ALLOWED_SYMBOLS = "-' "                  # Kept in normalized words, revealed from the start
+MAX_WORD_LENGTH = 64                     # Longer words are not played, nor guessed whole
+LIGATURES = {'œ': 'oe', 'æ': 'ae'}
+
+
+def normalize_word(word):
+    # 'Âne' -> 'ane', 'chauve-souris' keeps its hyphen
+    if word.isascii():
+        return word.strip().lower()
+    word = ''.join(LIGATURES.get(c, c) for c in word.strip().lower())
+    return ''.join(c for c in unicodedata.normalize('NFD', word) if not unicodedata.combining(c))
+
+
+def is_playable(normalized, max_length=MAX_WORD_LENGTH):
+    # No max_length for two-player words, which may be any length
+    return 0 < len(normalized) and (max_length is None or len(normalized) <= max_length) \
+        and all('a' <= c <= 'z' or c in ALLOWED_SYMBOLS for c in normalized) \
+        and any('a' <= c <= 'z' for c in normalized)
+
+
+def compile_pack(categories, path):
+    # categories: {name: iterable of words}. Words are grouped per category by
+    # normalized length; each bucket stores fixed-width normalized forms and
+    # the original spelling behind an offset table. A category with no
+    # playable word is left out.
+    tables = []
+    skipped = 0
+    for name, words in categories.items():
+        by_length = {}
+        for word in words:
+            normalized = normalize_word(word)
+            if not is_playable(normalized):
+                skipped += 1
+                continue
+            by_length.setdefault(len(normalized), {}).setdefault(normalized, word.strip())
+        if by_length:
+                tables.append((name, {length: by_length[length] for length in sorted(by_length)}))
+    if not tables:
+        raise ValueError("aucun mot jouable à compiler")
+
+    header_size = HEADER.size
+    for name, buckets in tables:
+        header_size += CATEGORY.size + len(name.encode('utf-8')) + BUCKET.size * len(buckets)
+
+    with open(path, 'wb') as f:
+        f.seek(header_size)
+        entries = []
+        for name, buckets in tables:
+            bucket_entries = []
+            for length, words in buckets.items():
+                displays = [display.encode('utf-8') for display in words.values()]
+                offsets_pos = f.tell()
+                position = 0
+                offsets = bytearray()
+                for display in displays:
+                    offsets += OFFSET.pack(position)
+                    position += len(display)
+                offsets += OFFSET.pack(position)
+                f.write(offsets)
+                normalized_pos = f.tell()
+                f.write(''.join(words).encode('ascii'))
+                display_pos = f.tell()
+                f.write(b''.join(displays))
+                bucket_entries.append(BUCKET.pack(length, len(words), offsets_pos, normalized_pos, display_pos))
+            count = sum(len(words) for words in buckets.values())
+            entries.append((name.encode('utf-8'), count, bucket_entries))
+
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, VERSION, len(entries)))
+        for name, count, bucket_entries in entries:
+            f.write(CATEGORY.pack(len(name), count, len(bucket_entries)))
+            f.write(name)
+            f.write(b''.join(bucket_entries))
+    return skipped
+
+
+class PackCategory:
+    def __init__(self, name, buckets):
+        self.name = name
+        self.buckets = buckets
+        self.by_length = {bucket[0]: bucket for bucket in buckets}
+        self.cumulative = []
+        total = 0
+        for bucket in buckets:
+            total += bucket[1]
+            self.cumulative.append(total)
+        self.count = total
+
+
+class WordPack:
+    # Read-only view over a compiled pack: only the category and bucket tables
+    # are parsed, words are decoded from the memory map on demand.
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, category_count = HEADER.unpack_from(self.data, 0)
+        if magic != MAGIC or version not in BUCKET_FORMATS:
+            raise ValueError(f"{path} n'est pas un paquet de mots valide.")
+        bucket_format = BUCKET_FORMATS[version]
+
+        self.categories_by_name = {}
+        position = HEADER.size
+        for _ in range(category_count):
+            name_length, count, bucket_count = CATEGORY.unpack_from(self.data, position)
+            position += CATEGORY.size
+            name = self.data[position:position + name_length].decode('utf-8')
+            position += name_length
+            buckets = [bucket_format.unpack_from(self.data, position + i * bucket_format.size)
+                       for i in range(bucket_count)]
+            if version == 1:
+                buckets = [bucket[:3] + bucket[4:] for bucket in buckets]
+            position += bucket_count * bucket_format.size
+            self.categories_by_name[name] = PackCategory(name, buckets)
+        self.indexes = {} # Solver indexes of the games playing this pack
+
+    def close(self):
+        self.data.close()
+
+    def categories(self):
+        return list(self.categories_by_name)
+
+    def __len__(self):
+        return sum(category.count for category in self.categories_by_name.values())
+
+    def word_at(self, bucket, i):
+        length, count, offsets_pos, normalized_pos, display_pos = bucket
+        start, end = struct.unpack_from('<II', self.data, offsets_pos + i * OFFSET.size)
+        display = self.data[display_pos + start:display_pos + end].decode('utf-8')
+        normalized = self.data[normalized_pos + i * length:normalized_pos + (i + 1) * length].decode('ascii')
+        return display, normalized
+
+    def random_word(self, category, length=None, rng=random):
+        category = self.categories_by_name[category]
+        if length is not None:
+            bucket = category.by_length[length]
+            return self.word_at(bucket, rng.randrange(bucket[1]))
+        r = rng.randrange(category.count)
+        index = bisect.bisect_right(category.cumulative, r)
+        previous = category.cumulative[index - 1] if index else 0
+        return self.word_at(category.buckets[index], r - previous)
+
+    def iter_words(self, category):
+        for bucket in self.categories_by_name[category].buckets:
+            for i in range(bucket[1]):
+                yield self.word_at(bucket, i)
+
+
+def read_word_list(path):
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield line.strip()
+
+
+def main():
+    import argparse # Only the command line needs it, not the game importing this module
+
+    parser = argparse.ArgumentParser(description="Compilation et inspection des paquets de mots.")
+    commands = parser.add_subparsers(dest='command', required=True)
+    compile_parser = commands.add_parser('compile', help="Compiler des listes de mots (un mot par ligne).")
+    compile_parser.add_argument('output')
+    compile_parser.add_argument('lists', nargs='*', metavar='CATÉGORIE=FICHIER')
+    compile_parser.add_argument('--builtin', action='store_true', help="Inclure les mots intégrés du jeu.")
+    info_parser = commands.add_parser('info', help="Afficher le contenu d'un paquet.")
+    info_parser.add_argument('pack')
+    args = parser.parse_args()
+
+    if args.command == 'info':
+        pack = WordPack(args.pack)
+        for name in pack.categories():
+            category = pack.categories_by_name[name]
+            print(f"{name}: {category.count} mots, longueurs {min(category.by_length)}-{max(category.by_length)}")
+        print(f"Total : {len(pack)} mots")
+        return
+
+    categories = {}
+    if args.builtin:
+        from game_logic import HangmanGame
+        categories.update(HangmanGame().words)
+    for item in args.lists:
+        name, sep, path = item.partition('=')
+        if not sep:
+            parser.error(f"'{item}' doit être de la forme CATÉGORIE=FICHIER")
+        categories[name] = read_word_list(path)
+    if not categories:
+        parser.error("aucune liste de mots à compiler")
+
+    try:
+        skipped = compile_pack(categories, args.output)
+    except ValueError as e:
+        parser.error(str(e))
+    pack = WordPack(args.output)
+    print(f"{args.output} : {len(pack)} mots dans {len(pack.categories())} catégories ({skipped} ignorés)", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()